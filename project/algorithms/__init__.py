@@ -1 +1,37 @@
-# Algorithm package
\ No newline at end of file
+# Algorithm package
+import importlib
+
+# 算法名 -> (模块, 入口函数)。按需导入, 只加载实际运行的算法及其依赖 (DEAP 等)
+ALGORITHMS = {
+    'NSGA-II': ('algorithms.nsga2', 'run_nsga2'),
+    'NSGA-III': ('algorithms.nsga3', 'run_nsga3'),
+    'GDE3': ('algorithms.gde3', 'run_gde3'),
+    'MOPSO': ('algorithms.mopso', 'run_mopso'),
+    'MOEA/D': ('algorithms.moead', 'run_moead'),
+}
+
+# 算法名 -> (模块, ask / tell 优化器类), 供外部调度评估 (见 algorithms/ask_tell.py)
+OPTIMIZERS = {
+    'NSGA-II': ('algorithms.nsga2', 'NSGA2'),
+    'NSGA-III': ('algorithms.nsga3', 'NSGA3'),
+    'GDE3': ('algorithms.gde3', 'GDE3'),
+    'MOPSO': ('algorithms.mopso', 'MOPSO'),
+    'MOEA/D': ('algorithms.moead', 'MOEAD'),
+}
+
+
+def _load(table, name):
+    if name not in table:
+        raise ValueError(f"未知算法: {name} (可选 {', '.join(table)})")
+    module_name, attr = table[name]
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def get_runner(name):
+    """按算法名返回 run_* 入口函数。"""
+    return _load(ALGORITHMS, name)
+
+
+def get_optimizer(name):
+    """按算法名返回 ask / tell 优化器类, 构造参数为 (case, seeds, init, ...)。"""
+    return _load(OPTIMIZERS, name)
@@ -0,0 +1,161 @@
+"""
+ask / tell 优化器接口。
+
+每个算法是一个有状态的优化器对象:
+    X = opt.ask()                      # 候选基因矩阵 (n, 20), 首次调用返回初始种群
+    opt.tell(objectives, penalties)    # 前 k 行候选的目标 (c, m, s) 与惩罚值 (k <= n)
+评估的调度完全在外部: 可跨运行合批、交给集群计算, 或交替推进多个优化器。
+tell 只收到前 k 行时 (如预算耗尽), 其余候选视为未评估而丢弃。
+tell 的可选参数 records 为每行的 constraints.EvaluationRecord, 附到个体的 evaluation 属性上供阶段一核查读取。
+
+run_* 入口是 drive() 之上的薄封装: 逐行评估 (计入 EvaluationBudget), 并在每代之后调用
+迁移 / 局部精修钩子 (钩子通过 members / ind_class / insert 与优化器交互)。
+drive 的 evaluate 参数可替换评估函数 (如 cluster.Coordinator.evaluate_candidates, 交给远程工作进程)。
+"""
+import numpy as np
+from deap import base, creator
+
+from case_config import *
+from constraints import check_constraints, evaluation_record
+from objectives import calculate_objectives
+from algorithms.budget import EvaluationBudget
+
+
+def ensure_creator():
+    """创建共享的 DEAP 适应度与个体类型 (evaluate 返回 (c, m, -s), 统一最小化)。"""
+    if not hasattr(creator, "FitnessMulti"):
+        creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0))
+    if not hasattr(creator, "Individual"):
+        creator.create("Individual", list, fitness=creator.FitnessMulti)
+
+
+def fitness_values(objectives, penalties):
+    """目标 (c, m, s) 与惩罚值 -> 适应度元组列表, 与 constraints.evaluate 相同。"""
+    fits = []
+    for (c, m, s), p in zip(objectives, penalties):
+        fits.append((c + p, m + p, -s + p) if p > 0 else (c, m, -s))
+    return fits
+
+
+def candidate_matrix(inds):
+    return np.array([list(ind) for ind in inds], dtype=float).reshape(-1, NDIM)
+
+
+def evaluate_candidates(X, case=DEFAULT_CASE, budget=None, records=False):
+    """
+    逐行计算目标 (c, m, s) 与惩罚值, 返回 (objectives (k, 3), penalties (k,))。
+    给定 budget 时每行计入预算, 预算耗尽时只返回已评估的前缀。
+    records=True 时另返回每行的 EvaluationRecord 列表 (约束明细与解码变量在同一次评估中得到)。
+    """
+    objectives, penalties, recs = [], [], []
+    for row in np.asarray(X, dtype=float).tolist():
+        if budget is not None and budget.exhausted():
+            break
+        for j in INT_GENES:
+            row[j] = int(row[j])
+        if records:
+            rec = evaluation_record(row, case)
+            recs.append(rec)
+            p = rec.penalty
+            objectives.append(rec.objectives)
+        else:
+            p = check_constraints(row, case=case)
+            objectives.append(calculate_objectives(row, case))
+        penalties.append(p)
+        if budget is not None:
+            budget.record(fitness_values(objectives[-1:], [p])[0])
+    result = (np.array(objectives, dtype=float).reshape(-1, 3), np.array(penalties, dtype=float))
+    return result + (recs,) if records else result
+
+
+class Optimizer:
+    """
+    ask / tell 优化器基类。子类实现:
+        _initialise(evaluated)  初始种群评估完成
+        _propose()              生成一代候选个体 (列表)
+        _update(evaluated)      按已评估的候选更新状态
+        insert(inds, final)     并入外部已评估个体 (迁移 / 精修); final 为运行结束时的并入
+        members                 当前结果集 (传给钩子, 也是最终返回的种群)
+    """
+    ind_class = None
+
+    def __init__(self, case=DEFAULT_CASE):
+        ensure_creator()
+        self.case = case
+        self.started = False
+        self.gen = 0
+        self._pending = []
+
+    def ask(self):
+        if self.started:
+            self._pending = self._propose()
+        return candidate_matrix(self._pending)
+
+    def tell(self, objectives, penalties, records=None):
+        evaluated = self._pending[:len(objectives)]
+        for ind, fit in zip(evaluated, fitness_values(objectives, penalties)):
+            ind.fitness.values = fit
+        if records is not None:
+            for ind, rec in zip(evaluated, records):
+                ind.evaluation = rec
+        self._pending = []
+        if self.started:
+            self._update(evaluated)
+            self.gen += 1
+        else:
+            self._initialise(evaluated)
+            self.started = True
+
+    def result(self):
+        """(res, members), res 为 (c, m, s) 列表。"""
+        members = self.members
+        res = []
+        for ind in members:
+            f = ind.fitness.values
+            res.append((f[0], f[1], -f[2]))
+        return res, members
+
+    def run_stats(self):
+        """写入运行统计的附加项。"""
+        return {}
+
+
+def drive(opt, n_gen, case=DEFAULT_CASE, migration=None, max_evals=None, time_limit=None,
+          stats=None, refine=None, evaluate=None):
+    """
+    逐行评估并推进优化器, 返回 (res, members)。
+    未设置预算时运行 n_gen 代, 设置 max_evals / time_limit 时以预算代替代数。
+    evaluate 与 evaluate_candidates 签名相同, 默认在当前进程中评估。
+    """
+    evaluate = evaluate or evaluate_candidates
+    budget = EvaluationBudget(max_evals, time_limit, case=case)
+    opt.tell(*evaluate(opt.ask(), case, budget, EVAL_DETAILS))
+
+    gen = 0
+    while budget.running(gen, n_gen):
+        opt.tell(*evaluate(opt.ask(), case, budget, EVAL_DETAILS))
+        # 岛屿模式: 迁入个体按各算法的规则并入
+        if migration is not None:
+            immigrants = migration(gen, opt.members, opt.ind_class)
+            if immigrants:
+                opt.insert(immigrants)
+        # 局部精修: refine 为 MemeticRefiner 时按其间隔对前沿个体做梯度精修, 结果参与选择;
+        # 精修评估数以剩余预算为上限, 预算耗尽后不再精修
+        if refine is not None:
+            refined = refine(gen, opt.members, opt.ind_class, budget)
+            budget.charge(refine.last_evaluations)
+            if refined:
+                opt.insert(refined)
+        gen += 1
+
+    if refine is not None:
+        refined = refine.finish(opt.members, opt.ind_class, budget)
+        budget.charge(refine.last_evaluations)
+        if refined:
+            opt.insert(refined, final=True)
+
+    res, members = opt.result()
+    if stats is not None:
+        stats.update(budget.summary())
+        stats.update(opt.run_stats())
+    return res, members
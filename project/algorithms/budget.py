@@ -0,0 +1,77 @@
+"""
+评估预算: 最大评估次数 / 墙钟时间上限, 并记录到达目标所需的评估数与用时。
+
+各 run_* 的评估由 algorithms.ask_tell.evaluate_candidates 逐个计入 EvaluationBudget (record), 预算耗尽时立即停止评估,
+算法以当前种群 (或归档) 作为随时可用的结果返回。
+"""
+import time
+from case_config import *
+
+
+class EvaluationBudget:
+    def __init__(self, max_evals=None, time_limit=None, target=BUDGET_TARGET, case=DEFAULT_CASE):
+        self.max_evals = max_evals
+        self.time_limit = time_limit
+        self.target = target
+        self.penalty_value = case.penalty_value
+        self.start = time.time()
+        self.evals = 0
+        self.generations = 0
+        self.evals_to_target = None
+        self.time_to_target = None
+
+    @property
+    def limited(self):
+        return self.max_evals is not None or self.time_limit is not None
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def exhausted(self):
+        if self.max_evals is not None and self.evals >= self.max_evals:
+            return True
+        if self.time_limit is not None and self.elapsed() >= self.time_limit:
+            return True
+        return False
+
+    def running(self, gen, n_gen):
+        """
+        是否继续第 gen 代: 未设置预算时按代数 n_gen 运行,
+        设置了评估数或时间预算时以预算代替代数。
+        """
+        if self.limited:
+            keep = not self.exhausted()
+        else:
+            keep = gen < n_gen
+        if keep:
+            self.generations = gen + 1
+        return keep
+
+    def charge(self, n):
+        """计入 record 之外完成的评估 (如局部精修中的差分评估)。"""
+        self.evals += n
+
+    def _reached_target(self, fit):
+        # 不可行解的适应度叠加了惩罚值, 成本项必然不小于惩罚值
+        if fit[0] >= self.penalty_value:
+            return False
+        if self.target is None:
+            return True
+        c, m, s = fit[0], fit[1], -fit[2]
+        return c <= self.target[0] and m <= self.target[1] and s >= self.target[2]
+
+    def record(self, fit):
+        """计入一次已完成的评估 (fit 为适应度 (c, m, -s), 含惩罚)。"""
+        self.evals += 1
+        if self.evals_to_target is None and self._reached_target(fit):
+            self.evals_to_target = self.evals
+            self.time_to_target = self.elapsed()
+
+    def summary(self):
+        return {
+            'evaluations': self.evals,
+            'generations': self.generations,
+            'elapsed': self.elapsed(),
+            'evals_to_target': self.evals_to_target,
+            'time_to_target': self.time_to_target,
+        }
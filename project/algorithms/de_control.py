@@ -0,0 +1,124 @@
+"""
+GDE3 的差分进化参数控制 (F: 缩放因子, CR: 交叉率)。
+
+- FixedControl: 固定 GDE3_F / GDE3_CR (原行为, 不消耗随机数)
+- JDEControl:   jDE 自适应, 每个个体携带自己的 F/CR, 以概率 tau 重新采样, 试验个体存活则继承
+- SHADEControl: SHADE 成功历史记忆, 按成功试验的改进量加权更新 M_F (Lehmer 均值) 与 M_CR
+
+多目标下的 "成功" 指试验个体被保留 (支配目标个体, 或与之互不支配)。
+每代结束时记录 F/CR 的均值、标准差与成功数, 作为参数轨迹输出。
+"""
+import math
+import random
+
+import numpy as np
+
+from case_config import *
+
+
+class FixedControl:
+    def __init__(self, F=GDE3_F, CR=GDE3_CR):
+        self.F = F
+        self.CR = CR
+        self.trajectory = []
+        self._used = []
+        self._success = 0
+
+    def sample(self, target):
+        self._used.append((self.F, self.CR))
+        return self.F, self.CR
+
+    def discard(self, n):
+        """撤销最近 n 次 sample 的记录 (预算在本代中途耗尽, 对应目标个体未处理)。"""
+        if n > 0:
+            del self._used[-n:]
+
+    def report(self, target, trial, F, CR, outcome):
+        """outcome: 'replace' (试验个体支配目标) / 'both' (互不支配) / 'discard'。"""
+        if outcome != 'discard':
+            self._success += 1
+            self._on_success(target, trial, F, CR)
+
+    def _on_success(self, target, trial, F, CR):
+        pass
+
+    def end_generation(self, gen, pop):
+        if self._used:
+            used = np.array(self._used)
+            self.trajectory.append((gen, used[:, 0].mean(), used[:, 0].std(),
+                                    used[:, 1].mean(), used[:, 1].std(), len(used), self._success))
+        self._used = []
+        self._success = 0
+
+
+class JDEControl(FixedControl):
+    """Brest 等 (2006) 的 jDE: F ∈ [F_l, F_l + F_u], CR ∈ [0, 1], 参数随个体遗传。"""
+    def __init__(self, tau_F=0.1, tau_CR=0.1, F_l=0.1, F_u=0.9):
+        super().__init__()
+        self.tau_F = tau_F
+        self.tau_CR = tau_CR
+        self.F_l = F_l
+        self.F_u = F_u
+
+    def sample(self, target):
+        F, CR = getattr(target, 'de_params', (GDE3_F, GDE3_CR))
+        if random.random() < self.tau_F:
+            F = self.F_l + random.random() * self.F_u
+        if random.random() < self.tau_CR:
+            CR = random.random()
+        self._used.append((F, CR))
+        return F, CR
+
+    def _on_success(self, target, trial, F, CR):
+        trial.de_params = (F, CR)
+
+
+class SHADEControl(FixedControl):
+    """Tanabe & Fukunaga (2013) 的 SHADE 参数记忆 (不含外部存档与 current-to-pbest 变异)。"""
+    def __init__(self, memory_size=GDE3_SHADE_MEMORY):
+        super().__init__()
+        self.M_F = [0.5] * memory_size
+        self.M_CR = [0.5] * memory_size
+        self.k = 0
+        self._S = []
+
+    def sample(self, target):
+        r = random.randrange(len(self.M_F))
+        CR = min(1.0, max(0.0, random.gauss(self.M_CR[r], 0.1)))
+        F = 0.0
+        while F <= 0.0:
+            F = self.M_F[r] + 0.1 * math.tan(math.pi * (random.random() - 0.5))
+        F = min(F, 1.0)
+        self._used.append((F, CR))
+        return F, CR
+
+    def _on_success(self, target, trial, F, CR):
+        # 改进量: 各目标按目标个体量级归一化后的正向改进之和 (互不支配时也大于 0)
+        t = np.array(target.fitness.values)
+        s = np.array(trial.fitness.values)
+        gain = np.sum(np.maximum(0.0, (t - s) / np.maximum(np.abs(t), 1e-12)))
+        self._S.append((F, CR, gain))
+
+    def end_generation(self, gen, pop):
+        if self._S:
+            S = np.array(self._S)
+            w = S[:, 2]
+            w = w / w.sum() if w.sum() > 0 else np.full(len(S), 1.0 / len(S))
+            self.M_F[self.k] = float(np.sum(w * S[:, 0] ** 2) / max(np.sum(w * S[:, 0]), 1e-12))
+            self.M_CR[self.k] = float(np.sum(w * S[:, 1]))
+            self.k = (self.k + 1) % len(self.M_F)
+        self._S = []
+        super().end_generation(gen, pop)
+
+
+DE_CONTROLS = {
+    'fixed': FixedControl,
+    'jde': JDEControl,
+    'shade': SHADEControl,
+}
+
+
+def make_control(name):
+    if name not in DE_CONTROLS:
+        raise ValueError(f"未知 DE 参数控制方式: {name} (可选 {', '.join(DE_CONTROLS)})")
+    return DE_CONTROLS[name]()
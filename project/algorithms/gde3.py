@@ -2,97 +2,139 @@ import random
 import numpy as np
 from deap import base, creator, tools
 from case_config import *
-from constraints import evaluate
-
-def run_gde3():
-    if not hasattr(creator, "FitnessMulti"):
-        creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0))
-        creator.create("Individual", list, fitness=creator.FitnessMulti)
-
-    # 1. 初始化种群
-    pop = []
-    for _ in range(GDE3_POP):
-        ind_data = []
-        for r in VAR_RANGES_GEO: ind_data.append(random.uniform(r[0], r[1]))
-        ind_data.append(random.uniform(0, len(VAL_FC)-0.01))
-        ind_data.append(random.uniform(0, len(VAL_FY)-0.01))
-        ind_data.append(random.uniform(*VAR_RANGES_MAT[0]))
-        ind_data.append(random.uniform(*VAR_RANGES_MAT[1]))
-        ind_data.append(random.uniform(0, len(VAL_NPB)-0.01))
-        ind_data.append(random.uniform(0, len(VAL_NPW)-0.01))
-        ind_data.append(random.uniform(*VAR_RANGES_MAT[2]))
-        ind_data.append(random.uniform(*VAR_RANGES_MAT[3]))
-        
-        ind = creator.Individual(ind_data)
-        ind.fitness.values = evaluate(ind)
-        pop.append(ind)
-
-    # 构造边界列表
-    LOW = [r[0] for r in VAR_RANGES_GEO] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[0][0], VAR_RANGES_MAT[1][0]] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[2][0], VAR_RANGES_MAT[3][0]]
-          
-    UP = [r[1] for r in VAR_RANGES_GEO] + \
-         [len(VAL_FC)-0.01, len(VAL_FY)-0.01] + \
-         [VAR_RANGES_MAT[0][1], VAR_RANGES_MAT[1][1]] + \
-         [len(VAL_NPB)-0.01, len(VAL_NPW)-0.01] + \
-         [VAR_RANGES_MAT[2][1], VAR_RANGES_MAT[3][1]]
-
-    # 2. 进化循环
-    for gen in range(GDE3_GEN):
-        offspring = []
-        for i in range(GDE3_POP):
+from seeding import warm_start_genes
+from sampling import initial_population, gene_lists
+from algorithms.mixed_integer import repair_integers, remove_duplicates
+from algorithms.de_control import make_control
+from algorithms.ask_tell import Optimizer, drive
+
+
+class GDE3(Optimizer):
+    """
+    GDE3 的 ask / tell 优化器: 每次 ask 为每个目标个体生成一个试验个体,
+    与目标个体解码后相同的试验个体不返回 (无需评估, 目标个体原样保留)。
+    """
+    def __init__(self, case=DEFAULT_CASE, seeds=None, init=INIT_METHOD, adapt=GDE3_ADAPT):
+        super().__init__(case)
+        self.ind_class = creator.Individual
+        self.n_gen = GDE3_GEN
+        self.pop_size = GDE3_POP
+
+        # 1. 初始化种群 (sampling.initial_population)
+        genes = gene_lists(initial_population(self.pop_size, case, init))
+        # 热启动: 前若干个体取历史前沿设计
+        warm = warm_start_genes(self.pop_size, seeds, case=case)
+        genes[:len(warm)] = warm
+        self._pending = [creator.Individual(g) for g in genes]
+        self.pop = []
+
+        # 构造边界列表
+        self.LOW, self.UP = list(case.low), list(case.up)
+        # F/CR 参数控制 (固定值或 jDE / SHADE 自适应)
+        self.control = make_control(adapt)
+        self._plan = []
+
+    @property
+    def members(self):
+        return self.pop
+
+    def _initialise(self, evaluated):
+        self.pop = evaluated
+
+    def _propose(self):
+        pop, LOW, UP = self.pop, self.LOW, self.UP
+        n = len(pop)
+        # 每个目标个体对应 (目标, 试验个体或 None, F, CR)
+        self._plan = []
+        for i in range(n):
             target = pop[i]
-            
+
             # 选择 3 个不同的随机个体
-            idxs = [idx for idx in range(GDE3_POP) if idx != i]
+            idxs = [idx for idx in range(n) if idx != i]
             r1, r2, r3 = random.sample(idxs, 3)
             x1, x2, x3 = pop[r1], pop[r2], pop[r3]
-            
+            F, CR = self.control.sample(target)
+
             # 差分变异 + 交叉 (DE/rand/1/bin)
             trial_ind_data = []
             j_rand = random.randint(0, NDIM-1)
-            
+
             for j in range(NDIM):
-                if random.random() < GDE3_CR or j == j_rand:
-                    val = x1[j] + GDE3_F * (x2[j] - x3[j])
+                if random.random() < CR or j == j_rand:
+                    val = x1[j] + F * (x2[j] - x3[j])
                     # 边界处理 (Clamping)
                     if val < LOW[j]: val = LOW[j]
                     if val > UP[j]: val = UP[j]
                     trial_ind_data.append(val)
                 else:
                     trial_ind_data.append(target[j])
-            
+
             trial = creator.Individual(trial_ind_data)
-            trial.fitness.values = evaluate(trial)
-            
+            repair_integers(trial, LOW, UP)
+            # 离散基因取整后与目标个体为同一设计: 无需评估
+            if not remove_duplicates([trial], [target], case=self.case):
+                trial = None
+            self._plan.append((target, trial, F, CR))
+        return [trial for _, trial, _, _ in self._plan if trial is not None]
+
+    def _update(self, evaluated):
+        control = self.control
+        n_eval = len(evaluated)
+        offspring = []
+        done = 0
+        last = -1
+        for k, (target, trial, F, CR) in enumerate(self._plan):
+            # 无需评估或未评估 (预算在本代中途耗尽) 的试验个体: 目标个体原样保留
+            if trial is None or done >= n_eval:
+                offspring.append(target)
+                continue
+            done += 1
+            last = k
+
             # GDE3 选择策略 (支配关系)
             # 1. Trial 支配 Target -> 替换
             # 2. Target 支配 Trial -> 丢弃
             # 3. 互不支配 -> 两者都保留 (稍后截断)
-            
             if trial.fitness.dominates(target.fitness):
                 offspring.append(trial)
+                control.report(target, trial, F, CR, 'replace')
             elif target.fitness.dominates(trial.fitness):
                 offspring.append(target)
+                control.report(target, trial, F, CR, 'discard')
             else:
                 offspring.append(target)
                 offspring.append(trial)
-        
-        # 截断操作 (使用 NSGA-II 的非支配排序和拥挤度距离)
-        if len(offspring) > GDE3_POP:
-            pop = tools.selNSGA2(offspring, GDE3_POP)
+                control.report(target, trial, F, CR, 'both')
+        # 预算耗尽: 最后一个已评估试验个体之后的目标个体不计入参数轨迹
+        if n_eval < sum(trial is not None for _, trial, _, _ in self._plan):
+            control.discard(len(self._plan) - (last + 1))
+
+        # 剔除重复设计后截断 (使用 NSGA-II 的非支配排序和拥挤度距离)
+        offspring = remove_duplicates(offspring, case=self.case)
+        if len(offspring) > self.pop_size:
+            pop = tools.selNSGA2(offspring, self.pop_size)
         else:
             pop = offspring
             # 如果数量不足(罕见)，随机补充
-            while len(pop) < GDE3_POP:
+            while len(pop) < self.pop_size:
                  # 简单复制补充
                  pop.append(random.choice(pop))
+        self.pop = pop
+        control.end_generation(self.gen, pop)
+
+    def insert(self, inds, final=False):
+        # 迁入 / 精修个体与当前种群一起按 NSGA-II 规则截断
+        k = len(self.pop) if final else self.pop_size
+        self.pop = tools.selNSGA2(self.pop + inds, k)
+
+    def run_stats(self):
+        # 每代 (gen, F 均值, F 标准差, CR 均值, CR 标准差, 试验数, 成功数)
+        return {'de_trajectory': self.control.trajectory}
+
 
-    res = []
-    for ind in pop:
-        f = ind.fitness.values
-        res.append((f[0], f[1], -f[2]))
-    return res, pop
\ No newline at end of file
+def run_gde3(migration=None, seeds=None, case=DEFAULT_CASE,
+             max_evals=None, time_limit=None, stats=None, refine=None, adapt=GDE3_ADAPT,
+             init=INIT_METHOD, evaluate=None):
+    # 评估预算 (未设置时按 GDE3_GEN 代运行)
+    opt = GDE3(case, seeds, init, adapt)
+    return drive(opt, opt.n_gen, case, migration, max_evals, time_limit, stats, refine, evaluate)
@@ -0,0 +1,164 @@
+"""
+混合整数编码的变异算子与重复设计剔除。
+
+离散基因 (case_config.INT_GENES) 直接取整数索引; 连续部分沿用 SBX / 多项式变异,
+离散部分在交叉后取整修复、变异时随机重置到其他档位。
+
+逐个体算子 (cx_sbx_mixed / mut_polynomial_mixed, 配合 deap.algorithms.varAnd) 之外,
+另有作用于整个 (N, 20) 基因矩阵的同语义算子 (sbx_matrix / mutate_matrix / vary_matrix):
+一次生成全部随机数并做数组运算, 不克隆个体, 返回子代矩阵与 "已修改" 掩码。
+"""
+import random
+import numpy as np
+from deap import tools
+from case_config import INT_GENES, DEFAULT_CASE
+from objectives import decode_matrix
+
+
+def repair_integers(ind, low, up):
+    """将离散基因取整并截断到 [low, up]。"""
+    for j in INT_GENES:
+        ind[j] = int(min(max(round(ind[j]), low[j]), up[j]))
+    return ind
+
+
+def cx_sbx_mixed(ind1, ind2, low, up, eta):
+    """SBX 交叉, 离散基因交叉后取整 (整数 SBX)。"""
+    tools.cxSimulatedBinaryBounded(ind1, ind2, eta=eta, low=low, up=up)
+    repair_integers(ind1, low, up)
+    repair_integers(ind2, low, up)
+    return ind1, ind2
+
+
+def mut_polynomial_mixed(ind, low, up, eta, indpb):
+    """
+    连续基因做有界多项式变异; 离散基因以 indpb 概率重置为其他档位,
+    保证被选中的离散基因确实改变设计。
+    """
+    levels = [ind[j] for j in INT_GENES]
+    tools.mutPolynomialBounded(ind, eta=eta, low=low, up=up, indpb=indpb)
+    for j, old in zip(INT_GENES, levels):
+        if random.random() < indpb and up[j] > low[j]:
+            ind[j] = random.choice([v for v in range(int(low[j]), int(up[j]) + 1) if v != old])
+        else:
+            ind[j] = old
+    return ind,
+
+
+def design_keys(inds, case=DEFAULT_CASE):
+    """按解码后的物理设计生成可哈希键。"""
+    if len(inds) == 0:
+        return []
+    P = np.round(decode_matrix([list(ind) for ind in inds], case), 12) + 0.0
+    return [row.tobytes() for row in P]
+
+
+def remove_duplicates(candidates, existing=(), case=DEFAULT_CASE):
+    """剔除解码后与 existing 或彼此重复的候选个体, 保持原顺序。"""
+    seen = set(design_keys(existing, case))
+    unique = []
+    for ind, key in zip(candidates, design_keys(candidates, case)):
+        if key not in seen:
+            seen.add(key)
+            unique.append(ind)
+    return unique
+
+
+# ---------- 矩阵算子 ----------
+def round_integers(X, low, up):
+    """repair_integers 的矩阵版本 (原地修改)。"""
+    for j in INT_GENES:
+        X[:, j] = np.clip(np.rint(X[:, j]), low[j], up[j])
+    return X
+
+
+def polynomial_step(Y, low, up, eta, mask, u):
+    """
+    有界多项式变异 (Deb) 的数组形式: mask 为真的元素按均匀随机数 u 变异并截断到 [low, up]。
+    公式同 tools.mutPolynomialBounded。
+    """
+    span = up - low
+    d1, d2 = (Y - low) / span, (up - Y) / span
+    mpow = 1.0 / (eta + 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dq = np.where(u < 0.5,
+                      (2 * u + (1 - 2 * u) * (1 - d1) ** (eta + 1)) ** mpow - 1,
+                      1 - (2 * (1 - u) + 2 * (u - 0.5) * (1 - d2) ** (eta + 1)) ** mpow)
+    return np.where(mask, np.clip(Y + dq * span, low, up), Y)
+
+
+def reset_levels(Y, low, up, reset, shift):
+    """离散基因 j 在 reset[:, k] 为真的行重置为其他档位: 当前档位向后平移 shift (1 ~ 档位数 - 1) 个并取模。"""
+    for k, j in enumerate(INT_GENES):
+        n_levels = int(up[j] - low[j]) + 1
+        rows = reset[:, k] & (n_levels > 1)
+        Y[rows, j] = low[j] + (Y[rows, j] - low[j] + shift[rows, k]) % n_levels
+    return Y
+
+
+def _shifts(rng, n, low, up):
+    return np.column_stack([rng.integers(1, max(int(up[j] - low[j]) + 1, 2), size=n) for j in INT_GENES])
+
+
+def sbx_matrix(X, low, up, eta, rng, cxpb=1.0):
+    """
+    相邻行 (0, 1), (2, 3), ... 配对的有界 SBX, 语义同 cx_sbx_mixed (tools.cxSimulatedBinaryBounded):
+    每对以 cxpb 概率交叉, 每个基因以 0.5 概率参与 (两亲本相同的基因不变), 两个子代以 0.5 概率交换;
+    离散基因交叉后取整截断。行数为奇数时最后一行不参与。返回 (子代矩阵, 参与交叉的行掩码)。
+    """
+    low, up = np.asarray(low, dtype=float), np.asarray(up, dtype=float)
+    Y = np.array(X, dtype=float)
+    n = len(Y) // 2 * 2
+    a, b = Y[0:n:2], Y[1:n:2]
+    pair = rng.random(len(a)) < cxpb
+    gene = (rng.random(a.shape) <= 0.5) & (np.abs(a - b) > 1e-14) & pair[:, None]
+    u = rng.random(a.shape)
+    swap = rng.random(a.shape) <= 0.5
+
+    x1, x2 = np.minimum(a, b), np.maximum(a, b)
+    dx = np.where(gene, x2 - x1, 1.0)
+
+    def spread(beta):
+        alpha = 2.0 - beta ** -(eta + 1)
+        return np.where(u <= 1.0 / alpha, (u * alpha) ** (1.0 / (eta + 1)),
+                        (1.0 / (2.0 - u * alpha)) ** (1.0 / (eta + 1)))
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        c1 = np.clip(0.5 * (x1 + x2 - spread(1.0 + 2.0 * (x1 - low) / dx) * (x2 - x1)), low, up)
+        c2 = np.clip(0.5 * (x1 + x2 + spread(1.0 + 2.0 * (up - x2) / dx) * (x2 - x1)), low, up)
+    Y[0:n:2] = np.where(gene, np.where(swap, c2, c1), a)
+    Y[1:n:2] = np.where(gene, np.where(swap, c1, c2), b)
+    round_integers(Y, low, up)
+
+    crossed = np.zeros(len(Y), dtype=bool)
+    crossed[0:n:2] = crossed[1:n:2] = pair
+    return Y, crossed
+
+
+def mutate_matrix(X, low, up, eta, indpb, rng, mutpb=1.0):
+    """
+    逐行以 mutpb 概率变异, 语义同 mut_polynomial_mixed: 连续基因各以 indpb 概率做有界多项式变异,
+    离散基因各以 indpb 概率重置为其他档位。返回 (子代矩阵, 参与变异的行掩码)。
+    """
+    low, up = np.asarray(low, dtype=float), np.asarray(up, dtype=float)
+    Y = np.array(X, dtype=float)
+    N, D = Y.shape
+    rows = rng.random(N) < mutpb
+    cont = np.ones(D, dtype=bool)
+    cont[list(INT_GENES)] = False
+    mask = (rng.random((N, D)) <= indpb) & rows[:, None] & cont
+    Y = polynomial_step(Y, low, up, eta, mask, rng.random((N, D)))
+    reset = (rng.random((N, len(INT_GENES))) < indpb) & rows[:, None]
+    return reset_levels(Y, low, up, reset, _shifts(rng, N, low, up)), rows
+
+
+def vary_matrix(X, low, up, rng, cxpb, mutpb, eta_cx=20.0, eta_mut=20.0, indpb=None):
+    """
+    deap.algorithms.varAnd 的矩阵版本: 相邻行以 cxpb 概率 SBX 交叉, 随后每行以 mutpb 概率变异。
+    返回 (子代矩阵, modified); modified 标记基因确实改变的行, 其余子代与父代相同, 无需评估。
+    """
+    X = np.asarray(X, dtype=float)
+    indpb = 1.0 / X.shape[1] if indpb is None else indpb
+    Y, _ = sbx_matrix(X, low, up, eta_cx, rng, cxpb)
+    Y, _ = mutate_matrix(Y, low, up, eta_mut, indpb, rng, mutpb)
+    return Y, (Y != X).any(axis=1)
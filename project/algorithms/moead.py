@@ -0,0 +1,192 @@
+"""
+MOEA/D (Zhang & Li, 2007), 变异采用 MOEA/D-DE (Li & Zhang, 2009) 的 DE/rand/1 + 多项式变异。
+
+- 权重向量: 与 NSGA-III 相同的 Das-Dennis 均匀点 (tools.uniform_reference_points), 每个权重一个子问题
+- 邻域: 权重空间中最近的 MOEAD_T 个子问题; 以概率 MOEAD_DELTA 在邻域内选父代并更新, 否则在整个种群中
+- 标量化: Tchebycheff 或 PBI, 在按当前种群范围归一化的目标空间中计算
+- 约束: 违反约束组数少者优先 (由惩罚适应度还原), 组数相同时比较标量化值
+
+种群以 (N, 20) 基因矩阵与 (N, 3) 目标矩阵保存; 每代一次生成全部子代 (ask),
+评估后逐个子代在其邻域上做向量化的标量化比较与替换 (tell)。
+"""
+import random
+
+import numpy as np
+from deap import creator, tools
+
+from case_config import *
+from seeding import warm_start_genes
+from sampling import initial_population, gene_lists
+from algorithms.mixed_integer import design_keys, remove_duplicates, polynomial_step, round_integers, reset_levels
+from algorithms.ask_tell import Optimizer, drive
+
+AGGREGATIONS = ('tchebycheff', 'pbi')
+
+
+def weight_vectors(p=MOEAD_P):
+    """Das-Dennis 权重 (与 NSGA-III 参考点同一生成方式), 形状 (C(p + 2, 2), 3)。"""
+    return tools.uniform_reference_points(nobj=3, p=p)
+
+
+def neighbourhoods(W, T=MOEAD_T):
+    """每个权重最近的 T 个权重的下标 (含自身), 形状 (N, T)。"""
+    d = np.linalg.norm(W[:, None, :] - W[None, :, :], axis=2)
+    return np.argsort(d, axis=1, kind='stable')[:, :min(T, len(W))]
+
+
+def aggregate(F, W, z, scale, method=MOEAD_AGG, theta=MOEAD_THETA):
+    """
+    标量化值: F (..., 3) 与 W (..., 3) 逐行对应 (可广播)。
+    目标先按 (F - z) / scale 归一化; Tchebycheff 中为 0 的权重以 1e-6 代替。
+    """
+    d = (F - z) / scale
+    if method == 'tchebycheff':
+        return np.max(np.maximum(W, 1e-6) * np.abs(d), axis=-1)
+    u = W / np.linalg.norm(W, axis=-1, keepdims=True)
+    d1 = np.sum(d * u, axis=-1)
+    d2 = np.linalg.norm(d - d1[..., None] * u, axis=-1)
+    return d1 + theta * d2
+
+
+def _violations(F, penalty_value):
+    """惩罚适应度 -> (违反约束组数, 原始目标)。evaluate 对每组违反在各目标上叠加一次惩罚值。"""
+    v = np.floor(F[:, 0] / penalty_value).clip(min=0.0)
+    return v, F - v[:, None] * penalty_value
+
+
+def _variation(X, B, low, up, rng, delta=MOEAD_DELTA, F=MOEAD_F, CR=MOEAD_CR, eta=20.0):
+    """
+    对全部子问题一次生成子代 (N, 20): DE/rand/1/bin (父代取自邻域或全种群) + 多项式变异,
+    离散基因取整截断后以 1/NDIM 概率重置为其他档位。返回子代与 "在邻域内" 标志。
+    """
+    N, D = X.shape
+    local = rng.random(N) < delta
+    r = np.where(local[:, None], B[np.arange(N)[:, None], rng.integers(B.shape[1], size=(N, 2))],
+                 rng.integers(N, size=(N, 2)))
+    trial = X + F * (X[r[:, 0]] - X[r[:, 1]])
+    cross = rng.random((N, D)) < CR
+    cross[np.arange(N), rng.integers(D, size=N)] = True
+    Y = np.clip(np.where(cross, trial, X), low, up)
+
+    # 有界多项式变异 (Deb), 每个基因以 1/NDIM 概率变异; 离散基因随后取整, 并以 1/NDIM 概率重置为其他档位
+    Y = polynomial_step(Y, low, up, eta, rng.random((N, D)) < 1.0 / D, rng.random((N, D)))
+    round_integers(Y, low, up)
+    draws = [(rng.random(N) < 1.0 / D, rng.integers(1, max(int(up[j] - low[j]) + 1, 2), size=N)) for j in INT_GENES]
+    Y = reset_levels(Y, low, up, np.column_stack([r for r, _ in draws]), np.column_stack([k for _, k in draws]))
+    return Y, local
+
+
+class MOEAD(Optimizer):
+    """
+    MOEA/D 的 ask / tell 优化器: 每次 ask 为全部子问题生成子代 (与父代解码后相同的子代不返回),
+    tell 时按子问题的随机顺序逐个子代更新邻域。
+    """
+    def __init__(self, case=DEFAULT_CASE, seeds=None, init=INIT_METHOD, aggregation=MOEAD_AGG):
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"未知标量化方式: {aggregation} (可选 {', '.join(AGGREGATIONS)})")
+        super().__init__(case)
+        self.ind_class = creator.Individual
+        self.n_gen = MOEAD_GEN
+        self.aggregation = aggregation
+
+        # 子问题权重与邻域
+        self.W = weight_vectors(MOEAD_P)
+        self.N = len(self.W)
+        self.B = neighbourhoods(self.W, MOEAD_T)
+        self.low, self.up = np.array(case.low, dtype=float), np.array(case.up, dtype=float)
+        # 变异所用随机数由全局 random 状态派生, random.seed(SEED) 可复现
+        self.rng = np.random.default_rng(random.getrandbits(64))
+
+        # 1. 初始化种群 (sampling.initial_population + 热启动)
+        genes = gene_lists(initial_population(self.N, case, init))
+        warm = warm_start_genes(self.N, seeds, case=case)
+        genes[:len(warm)] = warm
+        self._pending = [creator.Individual(g) for g in genes]
+        self.pop = []
+
+    @property
+    def members(self):
+        # 多个子问题可能共享同一个解: 去重后作为结果集
+        return remove_duplicates(_unique(self.pop), case=self.case)
+
+    def _initialise(self, evaluated):
+        N = self.N
+        # 预算不足以评估全部初始个体时, 未评估的子问题暂由已评估个体循环占据
+        self.pop = [evaluated[i % len(evaluated)] for i in range(N)] if evaluated else []
+        self.X = np.array([list(ind) for ind in self.pop], dtype=float)
+        self.V, self.R = _violations(np.array([ind.fitness.values for ind in self.pop]).reshape(-1, 3),
+                                     self.case.penalty_value)
+        self.z = self.R.min(axis=0) if len(self.R) else np.zeros(3)
+
+    def _scale(self):
+        z = self.z
+        return np.maximum(self.R.max(axis=0) - z, 1e-12 * np.maximum(1.0, np.abs(z)))
+
+    def _offer(self, genes, child, subproblems, limit, scale):
+        """以子代 child 尝试替换 subproblems 中的解 (最多 limit 个), 返回替换数。"""
+        W = self.W[subproblems]
+        v, r = _violations(np.array([child.fitness.values]), self.case.penalty_value)
+        self.z = np.minimum(self.z, r[0])
+        g_new = aggregate(r[0], W, self.z, scale, self.aggregation)
+        g_old = aggregate(self.R[subproblems], W, self.z, scale, self.aggregation)
+        better = (v[0] < self.V[subproblems]) | ((v[0] == self.V[subproblems]) & (g_new < g_old))
+        hit = subproblems[better][:limit]
+        for j in hit:
+            self.pop[j] = child
+        self.X[hit], self.V[hit], self.R[hit] = genes, v[0], r[0]
+        return len(hit)
+
+    def _propose(self):
+        N = self.N
+        Y, self._local = _variation(self.X, self.B, self.low, self.up, self.rng)
+        self._order = self.rng.permutation(N)
+        children = []
+        for i in self._order:
+            child = creator.Individual(Y[i].tolist())
+            for j in INT_GENES:
+                child[j] = int(child[j])
+            children.append(child)
+        # 与父代解码后相同的子代不评估 (对应子问题本代不更新)
+        parents = design_keys([self.pop[i] for i in self._order], self.case)
+        self._fresh = [a != b for a, b in zip(design_keys(children, self.case), parents)]
+        self._Y = Y
+        self._children = children
+        return [c for c, f in zip(children, self._fresh) if f]
+
+    def _update(self, evaluated):
+        N = self.N
+        scale = self._scale()
+        n_done = len(evaluated)
+        for child, i, f in zip(self._children, self._order, self._fresh):
+            if not f:
+                continue
+            if n_done == 0:
+                break
+            n_done -= 1
+            pool = self.B[i] if self._local[i] else np.arange(N)
+            self._offer(self._Y[i], child, self.rng.permutation(pool), MOEAD_NR, scale)
+
+    def insert(self, inds, final=False):
+        """
+        迁入 / 精修个体: 找到其标量化值最优的子问题 j, 在 j 的邻域 B[j] (随机顺序) 上尝试替换,
+        与普通子代一样最多替换 MOEAD_NR 个解, 避免少数精修解占满整个种群。
+        """
+        scale = self._scale()
+        for ind in inds:
+            _, r = _violations(np.array([ind.fitness.values]), self.case.penalty_value)
+            z = np.minimum(self.z, r[0])
+            j = int(np.argmin(aggregate(r[0], self.W, z, scale, self.aggregation)))
+            self._offer(np.array(ind, dtype=float), ind, self.rng.permutation(self.B[j]), MOEAD_NR, scale)
+
+
+def _unique(pop):
+    """按对象去重, 保持顺序。"""
+    seen = set()
+    return [ind for ind in pop if not (id(ind) in seen or seen.add(id(ind)))]
+
+
+def run_moead(migration=None, seeds=None, case=DEFAULT_CASE,
+              max_evals=None, time_limit=None, stats=None, refine=None, init=INIT_METHOD,
+              aggregation=MOEAD_AGG, evaluate=None):
+    opt = MOEAD(case, seeds, init, aggregation)
+    return drive(opt, opt.n_gen, case, migration, max_evals, time_limit, stats, refine, evaluate)
@@ -2,77 +2,74 @@ import random
 import numpy as np
 from deap import base, creator, tools
 from case_config import *
-from constraints import evaluate
-
-def run_mopso():
-    # 定义粒子
-    if not hasattr(creator, "FitnessMulti"):
-        creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0))
-        
-    if not hasattr(creator, "Particle"):
-        # 粒子具有速度、个体最优位置、个体最优适应度
-        creator.create("Particle", list, fitness=creator.FitnessMulti, 
-                       speed=list, best=list, bestfit=creator.FitnessMulti)
-
-    def generate_particle():
-        ind = []
-        # 初始化位置
-        for r in VAR_RANGES_GEO: ind.append(random.uniform(r[0], r[1]))
-        ind.append(random.uniform(0, len(VAL_FC)-0.01))
-        ind.append(random.uniform(0, len(VAL_FY)-0.01))
-        ind.append(random.uniform(*VAR_RANGES_MAT[0]))
-        ind.append(random.uniform(*VAR_RANGES_MAT[1]))
-        ind.append(random.uniform(0, len(VAL_NPB)-0.01))
-        ind.append(random.uniform(0, len(VAL_NPW)-0.01))
-        ind.append(random.uniform(*VAR_RANGES_MAT[2]))
-        ind.append(random.uniform(*VAR_RANGES_MAT[3]))
-        
-        part = creator.Particle(ind)
-        # 初始化速度
-        part.speed = [random.uniform(-1, 1) for _ in range(NDIM)]
-        return part
-
-    pop = [generate_particle() for _ in range(MOPSO_POP)]
-    archive = []
-
-    # 初始评估
-    for part in pop:
-        fit = evaluate(part)
-        part.fitness.values = fit
-        # 初始化 pbest
-        part.best = list(part)
-        part.bestfit.values = fit
-        archive.append(part)
-
-    # 构造边界列表
-    LOW = [r[0] for r in VAR_RANGES_GEO] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[0][0], VAR_RANGES_MAT[1][0]] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[2][0], VAR_RANGES_MAT[3][0]]
-          
-    UP = [r[1] for r in VAR_RANGES_GEO] + \
-         [len(VAL_FC)-0.01, len(VAL_FY)-0.01] + \
-         [VAR_RANGES_MAT[0][1], VAR_RANGES_MAT[1][1]] + \
-         [len(VAL_NPB)-0.01, len(VAL_NPW)-0.01] + \
-         [VAR_RANGES_MAT[2][1], VAR_RANGES_MAT[3][1]]
+from seeding import warm_start_genes
+from sampling import initial_population, gene_lists
+from algorithms.mixed_integer import repair_integers, remove_duplicates
+from algorithms.ask_tell import Optimizer, drive
+
+
+class MOPSO(Optimizer):
+    """
+    MOPSO 的 ask / tell 优化器: 每次 ask 由当前位置、速度与归档集同步计算整个粒子群的新位置,
+    tell 时已评估的粒子移动到新位置并更新个体最优, 之后更新归档集。
+    """
+    def __init__(self, case=DEFAULT_CASE, seeds=None, init=INIT_METHOD):
+        super().__init__(case)
+        # 定义粒子
+        if not hasattr(creator, "Particle"):
+            # 粒子具有速度、个体最优位置、个体最优适应度
+            creator.create("Particle", list, fitness=creator.FitnessMulti,
+                           speed=list, best=list, bestfit=creator.FitnessMulti)
+        self.ind_class = creator.Particle
+        self.n_gen = MOPSO_GEN
+        self.pop_size = MOPSO_POP
+
+        def generate_particle(genes):
+            # 初始位置来自 sampling.initial_population
+            part = creator.Particle(genes)
+            # 初始化速度
+            part.speed = [random.uniform(-1, 1) for _ in range(NDIM)]
+            return part
+
+        pop = [generate_particle(g) for g in gene_lists(initial_population(self.pop_size, case, init))]
+        for part, genes in zip(pop, warm_start_genes(self.pop_size, seeds, case=case)):
+            part[:] = genes
+        self._pending = pop
+        self.pop = []
+        self.archive = []
+        # 构造边界列表
+        self.LOW, self.UP = list(case.low), list(case.up)
+        self._moves = []
+
+    @property
+    def members(self):
+        return self.archive
 
     # 归档集维护函数
-    def update_archive(arch, new_parts):
-        combined = arch + new_parts
+    def update_archive(self, arch, new_parts):
+        # 解码后相同的设计只保留一个
+        combined = remove_duplicates(arch + new_parts, case=self.case)
         # 使用 NSGA-II 排序筛选非支配解
         non_dominated = tools.selNSGA2(combined, len(combined))
         # 实际上 selNSGA2 返回的是排序好的，前沿面在最前
         # 这里为了简化，我们假设归档集大小限制为 POP 大小
-        if len(non_dominated) > MOPSO_POP:
-            return tools.selNSGA2(non_dominated, MOPSO_POP)
+        if len(non_dominated) > self.pop_size:
+            return tools.selNSGA2(non_dominated, self.pop_size)
         return non_dominated
 
-    # 初始归档
-    archive = update_archive([], pop)
+    def _initialise(self, evaluated):
+        self.pop = evaluated
+        for part in self.pop:
+            # 初始化 pbest
+            part.best = list(part)
+            part.bestfit.values = part.fitness.values
+        # 初始归档
+        self.archive = self.update_archive([], self.pop)
 
-    for gen in range(MOPSO_GEN):
-        for part in pop:
+    def _propose(self):
+        archive, LOW, UP = self.archive, self.LOW, self.UP
+        self._moves = []
+        for part in self.pop:
             # 选择全局最优 gbest
             # 从归档集中随机选择一个优良个体 (Top 10%)
             if not archive:
@@ -80,27 +77,37 @@ def run_mopso():
             else:
                 top_k = max(1, int(len(archive) * 0.1))
                 gbest = random.choice(archive[:top_k])
-            
-            # 更新速度和位置
+
+            # 更新速度和位置 (先记录在候选中, 评估后才移动粒子)
+            pos, speed = list(part), list(part.speed)
             for i in range(NDIM):
                 r1, r2 = random.random(), random.random()
-                part.speed[i] = (MOPSO_W * part.speed[i] + 
-                                 MOPSO_C1 * r1 * (part.best[i] - part[i]) + 
-                                 MOPSO_C2 * r2 * (gbest[i] - part[i]))
-                part[i] += part.speed[i]
-                
+                speed[i] = (MOPSO_W * speed[i] +
+                            MOPSO_C1 * r1 * (part.best[i] - pos[i]) +
+                            MOPSO_C2 * r2 * (gbest[i] - pos[i]))
+                pos[i] += speed[i]
+
                 # 边界处理 (Clamping)
-                if part[i] < LOW[i]: 
-                    part[i] = LOW[i]
-                    part.speed[i] *= -0.5 # 碰壁反弹/减速
-                if part[i] > UP[i]: 
-                    part[i] = UP[i]
-                    part.speed[i] *= -0.5
-            
-            # 评估
-            fit = evaluate(part)
-            part.fitness.values = fit
-            
+                if pos[i] < LOW[i]:
+                    pos[i] = LOW[i]
+                    speed[i] *= -0.5 # 碰壁反弹/减速
+                if pos[i] > UP[i]:
+                    pos[i] = UP[i]
+                    speed[i] *= -0.5
+            # 离散基因位置取整到档位索引
+            repair_integers(pos, LOW, UP)
+            self._moves.append((part, speed, creator.Particle(pos)))
+        return [candidate for _, _, candidate in self._moves]
+
+    def _update(self, evaluated):
+        # 预算在本代中途耗尽: 其余粒子保持原位置与适应度
+        for (part, speed, candidate) in self._moves[:len(evaluated)]:
+            part[:] = candidate
+            part.speed = speed
+            part.fitness.values = candidate.fitness.values
+            part.evaluation = getattr(candidate, 'evaluation', None)
+            fit = part.fitness.values
+
             # 更新个体最优 pbest (支配关系)
             if part.fitness.dominates(part.bestfit):
                 part.best = list(part)
@@ -110,12 +117,17 @@ def run_mopso():
                 if random.random() < 0.5:
                     part.best = list(part)
                     part.bestfit.values = fit
-            
+
         # 更新归档集
-        archive = update_archive(archive, pop)
+        self.archive = self.update_archive(self.archive, self.pop)
+
+    def insert(self, inds, final=False):
+        # 迁入 / 精修个体直接进入归档集, 作为后续 gbest 候选
+        self.archive = self.update_archive(self.archive, inds)
+
 
-    res = []
-    for ind in archive:
-        f = ind.fitness.values
-        res.append((f[0], f[1], -f[2]))
-    return res, archive
\ No newline at end of file
+def run_mopso(migration=None, seeds=None, case=DEFAULT_CASE,
+              max_evals=None, time_limit=None, stats=None, refine=None, init=INIT_METHOD, evaluate=None):
+    # 评估预算未设置时按 MOPSO_GEN 代运行
+    opt = MOPSO(case, seeds, init)
+    return drive(opt, opt.n_gen, case, migration, max_evals, time_limit, stats, refine, evaluate)
@@ -2,96 +2,74 @@ from deap import base, creator, tools, algorithms
 import random
 import numpy as np
 from case_config import *
-from constraints import evaluate
+from seeding import warm_start_genes
+from sampling import initial_population, gene_lists
+from algorithms.mixed_integer import cx_sbx_mixed, mut_polynomial_mixed, remove_duplicates, vary_matrix
+from algorithms.ask_tell import Optimizer, drive, candidate_matrix
 
-def run_nsga2():
-    # 1. 设置 DEAP 环境
-    # 如果已存在则不重复创建
-    if not hasattr(creator, "FitnessMulti"):
-        # 权重统一最小化: evaluate 返回 (c, m, -s)
-        creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0))
-        creator.create("Individual", list, fitness=creator.FitnessMulti)
-    
-    toolbox = base.Toolbox()
-    
-    # 2. 个体生成器
-    def random_ind():
-        ind = []
-        # 连续几何变量
-        for r in VAR_RANGES_GEO:
-            ind.append(random.uniform(r[0], r[1]))
-        
-        # 离散变量 (映射为连续索引)
-        ind.append(random.uniform(0, len(VAL_FC)-0.01)) # fc
-        ind.append(random.uniform(0, len(VAL_FY)-0.01)) # fy
-        
-        # 材料连续变量
-        ind.append(random.uniform(*VAR_RANGES_MAT[0])) # dr
-        ind.append(random.uniform(*VAR_RANGES_MAT[1])) # dp
-        
-        # 离散预应力
-        ind.append(random.uniform(0, len(VAL_NPB)-0.01)) # npb
-        ind.append(random.uniform(0, len(VAL_NPW)-0.01)) # npw
-        
-        # 预应力连续
-        ind.append(random.uniform(*VAR_RANGES_MAT[2])) # sigma
-        ind.append(random.uniform(*VAR_RANGES_MAT[3])) # hp_ratio
-        
-        return creator.Individual(ind)
 
-    toolbox.register("individual", random_ind)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-    
-    # 构造边界列表
-    LOW = [r[0] for r in VAR_RANGES_GEO] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[0][0], VAR_RANGES_MAT[1][0]] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[2][0], VAR_RANGES_MAT[3][0]]
-          
-    UP = [r[1] for r in VAR_RANGES_GEO] + \
-         [len(VAL_FC)-0.01, len(VAL_FY)-0.01] + \
-         [VAR_RANGES_MAT[0][1], VAR_RANGES_MAT[1][1]] + \
-         [len(VAL_NPB)-0.01, len(VAL_NPW)-0.01] + \
-         [VAR_RANGES_MAT[2][1], VAR_RANGES_MAT[3][1]]
+class NSGA2(Optimizer):
+    """NSGA-II 的 ask / tell 优化器: 每次 ask 返回一代 (去重后的) 子代。"""
+    def __init__(self, case=DEFAULT_CASE, seeds=None, init=INIT_METHOD):
+        # 1. 设置 DEAP 环境 (权重统一最小化: 适应度为 (c, m, -s))
+        super().__init__(case)
+        self.ind_class = creator.Individual
+        self.n_gen = NSGA2_GEN
+        self.pop_size = NSGA2_POP
 
-    # 3. 注册算子
-    toolbox.register("evaluate", evaluate)
-    # 模拟二进制交叉 (传入正确边界)
-    toolbox.register("mate", tools.cxSimulatedBinaryBounded, 
-                     low=LOW, up=UP, eta=20.0) 
-    # 多项式变异 (传入正确边界)
-    toolbox.register("mutate", tools.mutPolynomialBounded, 
-                     low=LOW, up=UP, eta=20.0, indpb=1.0/NDIM)
-    toolbox.register("select", tools.selNSGA2)
-    
-    # 4. 运行主循环
-    pop = toolbox.population(n=NSGA2_POP)
-    
-    # 初始评估
-    invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    fitnesses = map(toolbox.evaluate, invalid_ind)
-    for ind, fit in zip(invalid_ind, fitnesses):
-        ind.fitness.values = fit
-        
-    for gen in range(NSGA2_GEN):
-        # 育种
-        offspring = algorithms.varAnd(pop, toolbox, cxpb=NSGA2_CXPB, mutpb=NSGA2_MUTPB)
-        
-        # 评估
-        fits = map(toolbox.evaluate, offspring)
-        for ind, fit in zip(offspring, fits):
-            ind.fitness.values = fit
-            
-        # 选择 (精英保留)
-        pop = toolbox.select(pop + offspring, k=NSGA2_POP)
-        
-    # 5. 提取结果
-    res = []
-    for ind in pop:
-        # fitness 是 (c, m, -s)
-        f = ind.fitness.values
-        # 还原为 (c, m, s)
-        res.append((f[0], f[1], -f[2]))
-        
-    return res, pop
\ No newline at end of file
+        toolbox = base.Toolbox()
+        # 构造边界列表
+        LOW, UP = list(case.low), list(case.up)
+        # 2. 注册算子
+        # 模拟二进制交叉 (传入正确边界, 离散基因取整)
+        toolbox.register("mate", cx_sbx_mixed,
+                         low=LOW, up=UP, eta=20.0)
+        # 多项式变异 (传入正确边界, 离散基因随机重置档位)
+        toolbox.register("mutate", mut_polynomial_mixed,
+                         low=LOW, up=UP, eta=20.0, indpb=1.0/NDIM)
+        toolbox.register("select", tools.selNSGA2)
+        self.toolbox = toolbox
+
+        # 3. 初始种群: 一次生成 (N, 20) 基因矩阵 (uniform / lhs / sobol / halton)
+        pop = [creator.Individual(g) for g in gene_lists(initial_population(self.pop_size, case, init))]
+        # 热启动: 用历史前沿设计替换部分随机个体
+        for ind, genes in zip(pop, warm_start_genes(self.pop_size, seeds, case=case)):
+            ind[:] = genes
+        self._pending = pop
+        self.pop = []
+        # 矩阵化变异的随机数由全局 random 状态派生, random.seed(SEED) 可复现
+        self.low, self.up = np.array(case.low, dtype=float), np.array(case.up, dtype=float)
+        self.rng = np.random.default_rng(random.getrandbits(64)) if VECTOR_VARIATION else None
+
+    @property
+    def members(self):
+        return self.pop
+
+    def _initialise(self, evaluated):
+        self.pop = evaluated
+
+    def _propose(self):
+        # 育种; 剔除解码后与父代或彼此重复的设计, 不再重复评估
+        if self.rng is not None:
+            # 整个种群矩阵一次交叉 / 变异, 未改变的子代直接丢弃
+            Y, modified = vary_matrix(candidate_matrix(self.pop), self.low, self.up, self.rng,
+                                      cxpb=NSGA2_CXPB, mutpb=NSGA2_MUTPB, eta_cx=20.0, eta_mut=20.0)
+            offspring = [creator.Individual(g) for g in gene_lists(Y[modified])]
+        else:
+            offspring = algorithms.varAnd(self.pop, self.toolbox, cxpb=NSGA2_CXPB, mutpb=NSGA2_MUTPB)
+        return remove_duplicates(offspring, self.pop, case=self.case)
+
+    def _update(self, evaluated):
+        # 选择 (精英保留); 预算耗尽时只有已评估的子代参与
+        self.pop = self.toolbox.select(self.pop + evaluated, k=self.pop_size)
+
+    def insert(self, inds, final=False):
+        k = len(self.pop) if final else self.pop_size
+        self.pop = self.toolbox.select(self.pop + inds, k=k)
+
+
+def run_nsga2(migration=None, seeds=None, case=DEFAULT_CASE,
+              max_evals=None, time_limit=None, stats=None, refine=None, init=INIT_METHOD, evaluate=None):
+    # 评估预算: 设置 max_evals / time_limit 时以预算代替代数, 耗尽即停
+    opt = NSGA2(case, seeds, init)
+    return drive(opt, opt.n_gen, case, migration, max_evals, time_limit, stats, refine, evaluate)
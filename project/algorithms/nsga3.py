@@ -1,68 +1,69 @@
 from deap import base, creator, tools, algorithms
 import random
+import numpy as np
 from case_config import *
-from constraints import evaluate
+from seeding import warm_start_genes
+from sampling import initial_population, gene_lists
+from algorithms.mixed_integer import cx_sbx_mixed, mut_polynomial_mixed, remove_duplicates, vary_matrix
+from algorithms.ask_tell import Optimizer, drive, candidate_matrix
 
-def run_nsga3():
-    # 确保 Creator 存在 (与 NSGA2 共享定义)
-    if not hasattr(creator, "FitnessMulti"):
-        creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0))
-        creator.create("Individual", list, fitness=creator.FitnessMulti)
-    
-    toolbox = base.Toolbox()
-    
-    # 复制 NSGA2 的个体生成逻辑
-    def random_ind():
-        ind = []
-        for r in VAR_RANGES_GEO: ind.append(random.uniform(r[0], r[1]))
-        ind.append(random.uniform(0, len(VAL_FC)-0.01))
-        ind.append(random.uniform(0, len(VAL_FY)-0.01))
-        ind.append(random.uniform(*VAR_RANGES_MAT[0]))
-        ind.append(random.uniform(*VAR_RANGES_MAT[1]))
-        ind.append(random.uniform(0, len(VAL_NPB)-0.01))
-        ind.append(random.uniform(0, len(VAL_NPW)-0.01))
-        ind.append(random.uniform(*VAR_RANGES_MAT[2]))
-        ind.append(random.uniform(*VAR_RANGES_MAT[3]))
-        return creator.Individual(ind)
 
-    # 构造边界列表
-    LOW = [r[0] for r in VAR_RANGES_GEO] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[0][0], VAR_RANGES_MAT[1][0]] + \
-          [0, 0] + \
-          [VAR_RANGES_MAT[2][0], VAR_RANGES_MAT[3][0]]
-          
-    UP = [r[1] for r in VAR_RANGES_GEO] + \
-         [len(VAL_FC)-0.01, len(VAL_FY)-0.01] + \
-         [VAR_RANGES_MAT[0][1], VAR_RANGES_MAT[1][1]] + \
-         [len(VAL_NPB)-0.01, len(VAL_NPW)-0.01] + \
-         [VAR_RANGES_MAT[2][1], VAR_RANGES_MAT[3][1]]
+class NSGA3(Optimizer):
+    """NSGA-III 的 ask / tell 优化器 (参考点选择, 其余同 NSGA-II)。"""
+    def __init__(self, case=DEFAULT_CASE, seeds=None, init=INIT_METHOD):
+        # 确保 Creator 存在 (与 NSGA2 共享定义)
+        super().__init__(case)
+        self.ind_class = creator.Individual
+        self.n_gen = NSGA3_GEN
+        self.pop_size = NSGA3_POP
 
-    toolbox.register("individual", random_ind)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-    toolbox.register("evaluate", evaluate)
-    toolbox.register("mate", tools.cxSimulatedBinaryBounded, low=LOW, up=UP, eta=30.0)
-    toolbox.register("mutate", tools.mutPolynomialBounded, low=LOW, up=UP, eta=20.0, indpb=1.0/NDIM)
-    
-    # 生成参考点 (Das-Dennis)
-    ref_points = tools.uniform_reference_points(nobj=3, p=NSGA3_P)
-    toolbox.register("select", tools.selNSGA3, ref_points=ref_points)
-    
-    pop = toolbox.population(n=NSGA3_POP)
-    
-    # 初始评估
-    invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    for ind, fit in zip(invalid_ind, map(toolbox.evaluate, invalid_ind)):
-        ind.fitness.values = fit
-        
-    for gen in range(NSGA3_GEN):
-        offspring = algorithms.varAnd(pop, toolbox, cxpb=NSGA3_CXPB, mutpb=NSGA3_MUTPB)
-        for ind, fit in zip(offspring, map(toolbox.evaluate, offspring)):
-            ind.fitness.values = fit
-        pop = toolbox.select(pop + offspring, k=NSGA3_POP)
-        
-    res = []
-    for ind in pop:
-        f = ind.fitness.values
-        res.append((f[0], f[1], -f[2]))
-    return res, pop
\ No newline at end of file
+        toolbox = base.Toolbox()
+        # 构造边界列表
+        LOW, UP = list(case.low), list(case.up)
+        toolbox.register("mate", cx_sbx_mixed, low=LOW, up=UP, eta=30.0)
+        toolbox.register("mutate", mut_polynomial_mixed, low=LOW, up=UP, eta=20.0, indpb=1.0/NDIM)
+
+        # 生成参考点 (Das-Dennis)
+        ref_points = tools.uniform_reference_points(nobj=3, p=NSGA3_P)
+        toolbox.register("select", tools.selNSGA3, ref_points=ref_points)
+        self.toolbox = toolbox
+
+        # 初始种群 (与 NSGA-II 共用 sampling.initial_population)
+        pop = [creator.Individual(g) for g in gene_lists(initial_population(self.pop_size, case, init))]
+        for ind, genes in zip(pop, warm_start_genes(self.pop_size, seeds, case=case)):
+            ind[:] = genes
+        self._pending = pop
+        self.pop = []
+        # 矩阵化变异的随机数由全局 random 状态派生, random.seed(SEED) 可复现
+        self.low, self.up = np.array(case.low, dtype=float), np.array(case.up, dtype=float)
+        self.rng = np.random.default_rng(random.getrandbits(64)) if VECTOR_VARIATION else None
+
+    @property
+    def members(self):
+        return self.pop
+
+    def _initialise(self, evaluated):
+        self.pop = evaluated
+
+    def _propose(self):
+        if self.rng is not None:
+            Y, modified = vary_matrix(candidate_matrix(self.pop), self.low, self.up, self.rng,
+                                      cxpb=NSGA3_CXPB, mutpb=NSGA3_MUTPB, eta_cx=30.0, eta_mut=20.0)
+            offspring = [creator.Individual(g) for g in gene_lists(Y[modified])]
+        else:
+            offspring = algorithms.varAnd(self.pop, self.toolbox, cxpb=NSGA3_CXPB, mutpb=NSGA3_MUTPB)
+        return remove_duplicates(offspring, self.pop, case=self.case)
+
+    def _update(self, evaluated):
+        self.pop = self.toolbox.select(self.pop + evaluated, k=self.pop_size)
+
+    def insert(self, inds, final=False):
+        k = len(self.pop) if final else self.pop_size
+        self.pop = self.toolbox.select(self.pop + inds, k=k)
+
+
+def run_nsga3(migration=None, seeds=None, case=DEFAULT_CASE,
+              max_evals=None, time_limit=None, stats=None, refine=None, init=INIT_METHOD, evaluate=None):
+    # 预算设置同 NSGA-II
+    opt = NSGA3(case, seeds, init)
+    return drive(opt, opt.n_gen, case, migration, max_evals, time_limit, stats, refine, evaluate)
@@ -0,0 +1,271 @@
+"""
+梯度型局部精修 (memetic refinement)。
+
+目标 (Eq15 ~ Eq22) 与 Eq24 ~ Eq29 约束都是连续基因的光滑闭式函数。
+对选中的前沿个体, 在离散基因 (fc, fy, npb, npw) 固定的前提下,
+用批量前向差分求目标与约束裕度的 Jacobian, 沿加权和或成就函数 (ASF)
+标量化的下降方向做投影梯度步, 并在一次批量评估中完成线搜索。
+
+MemeticRefiner 与迁移钩子接口相同: refine(gen, pop, ind_class) -> 新个体列表,
+可每 interval 代调用一次, 或在运行结束时通过 finish() 调用一次。
+传入 EvaluationBudget 时精修不超出剩余评估数: 精修个体数、迭代步数与线搜索批次按剩余预算截断,
+预算已耗尽时不做精修 (评估数仍由调用方 charge 计入预算)。
+"""
+import numpy as np
+from deap import tools
+
+from case_config import *
+from constraints import evaluate, constraint_margins
+from objectives import calculate_objectives
+
+CONT_GENES = np.array([j for j in range(NDIM) if j not in INT_GENES])
+
+
+def _allowance(budget, used=0):
+    """预算内还可做的评估数 (已用 used 次尚未计入预算); 没有评估数上限时为无穷。"""
+    if budget is None:
+        return np.inf
+    if budget.time_limit is not None and budget.elapsed() >= budget.time_limit:
+        return 0
+    if budget.max_evals is None:
+        return np.inf
+    return max(budget.max_evals - budget.evals - used, 0)
+
+
+def _columns(X):
+    """同一离散组合的 (N, 20) 基因矩阵 -> 逐基因列 (连续基因为数组, 离散基因为标量)。"""
+    cols = [X[:, j] for j in range(NDIM)]
+    for j in INT_GENES:
+        cols[j] = int(X[0, j])
+    return cols
+
+
+def batch_objectives(X, case=DEFAULT_CASE):
+    """
+    批量计算目标 (c, m, -s) 与约束裕度 (见 constraints.MARGIN_NAMES)。
+    按离散基因组合分组, 每组一次向量化调用 calculate_objectives / constraint_margins。
+    返回 F (N, 3), G (N, K)。
+    """
+    X = np.asarray(X, dtype=float)
+    keys = np.rint(X[:, list(INT_GENES)]).astype(int)
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    F = np.empty((len(X), 3))
+    G = None
+    for g in range(inverse.max() + 1 if len(X) else 0):
+        rows = np.flatnonzero(inverse == g)
+        cols = _columns(X[rows])
+        c, m, s = calculate_objectives(cols, case)
+        F[rows, 0], F[rows, 1], F[rows, 2] = c, m, -s
+        margins = constraint_margins(cols, case)
+        if G is None:
+            G = np.empty((len(X), len(margins)))
+        G[rows] = margins.T
+    return F, G
+
+
+def batch_jacobian(X, case=DEFAULT_CASE, step=REFINE_FD_STEP):
+    """
+    连续基因上的前向差分 Jacobian, 全部扰动点一次批量评估。
+    步长为变量区间宽度的 step 倍, 靠近上界时改为向下扰动。
+    返回 F (N, 3), G (N, K), JF (N, 3, n), JG (N, K, n), 其中 n 为连续基因数。
+    """
+    X = np.asarray(X, dtype=float)
+    low, up = np.array(case.low), np.array(case.up)
+    n_pts, n = len(X), len(CONT_GENES)
+    h = step * (up - low)[CONT_GENES]
+    sign = np.where(X[:, CONT_GENES] + h > up[CONT_GENES], -1.0, 1.0)
+    dh = sign * h
+
+    P = np.repeat(X[:, None, :], n + 1, axis=1)
+    k = np.arange(n)
+    P[:, k + 1, CONT_GENES] += dh
+    F, G = batch_objectives(P.reshape(-1, NDIM), case)
+    F = F.reshape(n_pts, n + 1, -1)
+    G = G.reshape(n_pts, n + 1, -1)
+
+    JF = ((F[:, 1:, :] - F[:, :1, :]) / dh[:, :, None]).transpose(0, 2, 1)
+    JG = ((G[:, 1:, :] - G[:, :1, :]) / dh[:, :, None]).transpose(0, 2, 1)
+    return F[:, 0], G[:, 0], JF, JG
+
+
+class MemeticRefiner:
+    def __init__(self, case=DEFAULT_CASE, interval=REFINE_INTERVAL, at_end=REFINE_AT_END,
+                 n_members=REFINE_SIZE, n_iter=REFINE_ITERS, scalarization=REFINE_SCALARIZATION,
+                 fd_step=REFINE_FD_STEP, step_sizes=REFINE_STEP_SIZES):
+        if scalarization not in ('weighted', 'asf'):
+            raise ValueError(f"未知标量化方式: {scalarization} (可选 weighted / asf)")
+        self.case = case
+        self.interval = interval
+        self.at_end = at_end
+        self.n_members = n_members
+        self.n_iter = n_iter
+        self.scalarization = scalarization
+        self.fd_step = fd_step
+        self.step_sizes = np.asarray(step_sizes, dtype=float)
+        self.last_evaluations = 0
+        self.evaluations = 0
+        self.log = []
+
+    def __call__(self, gen, pop, ind_class, budget=None):
+        self.last_evaluations = 0
+        if not self.interval or (gen + 1) % self.interval != 0:
+            return []
+        if budget is not None and budget.exhausted():
+            return []
+        return self.refine(pop, ind_class, gen, budget)
+
+    def finish(self, pop, ind_class, budget=None):
+        """运行结束时的一次精修 (at_end 为 False 或预算已耗尽时不做任何事)。"""
+        self.last_evaluations = 0
+        if not self.at_end:
+            return []
+        if budget is not None and budget.exhausted():
+            return []
+        return self.refine(pop, ind_class, 'end', budget)
+
+    # ---------- 标量化 ----------
+    def _scalarize(self, F, z, scale, w):
+        """F (..., 3) 的标量化值; z / scale / w 的前导维度与 F 对齐。"""
+        d = (F - z) / scale
+        if self.scalarization == 'weighted':
+            return np.sum(w * d, axis=-1)
+        return np.max(w * d, axis=-1) + 1e-3 * np.sum(d, axis=-1)
+
+    def _direction(self, F, JF, z, scale, w, span):
+        """
+        归一化基因空间中的下降方向。F (N, 3), JF (N, 3, n)。
+        weighted: 加权和的负梯度。
+        asf: 取值接近最大的各项 (含增广项) 梯度凸包中的最小范数元素, 取负即为
+        max 函数的最速下降方向, 各活动项同时下降 (与 MGDA 相同, 用 Frank-Wolfe 求解)。
+        """
+        grads = JF / scale[None, :, None] * span[None, None, :]
+        if self.scalarization == 'weighted':
+            return -np.einsum('ni,nij->nj', w, grads)
+
+        terms = w * (F - z) / scale
+        grads = w[:, :, None] * grads + 1e-3 * grads.sum(axis=1, keepdims=True)
+        active = terms >= terms.max(axis=1, keepdims=True) - 1e-3
+        lam = active / active.sum(axis=1, keepdims=True)
+        rows = np.arange(len(F))
+        for _ in range(50):
+            v = np.einsum('ni,nij->nj', lam, grads)
+            score = np.where(active, np.einsum('nij,nj->ni', grads, v), np.inf)
+            gs = grads[rows, np.argmin(score, axis=1)]
+            diff = v - gs
+            denom = np.einsum('nj,nj->n', diff, diff)
+            gamma = np.clip(np.einsum('nj,nj->n', v, diff) / np.where(denom > 0, denom, 1.0), 0.0, 1.0)
+            gamma[denom <= 0] = 0.0
+            lam *= (1.0 - gamma)[:, None]
+            lam[rows, np.argmin(score, axis=1)] += gamma
+        return -np.einsum('ni,nij->nj', lam, grads)
+
+    # ---------- 精修 ----------
+    def _select(self, pop):
+        """第一前沿中的可行个体, 按造价排序后等间隔取 n_members 个。"""
+        front = tools.sortNondominated(pop, len(pop), first_front_only=True)[0] if pop else []
+        front = [ind for ind in front if ind.fitness.values[0] < self.case.penalty_value]
+        if len(front) <= self.n_members:
+            return front
+        front.sort(key=lambda ind: ind.fitness.values[0])
+        idx = np.unique(np.linspace(0, len(front) - 1, self.n_members).round().astype(int))
+        return [front[i] for i in idx]
+
+    def refine(self, pop, ind_class, tag=None, budget=None):
+        """
+        对选中的前沿个体做 n_iter 步投影梯度下降, 返回改进后的新个体 (已评估)。
+        给定 budget 时评估总数不超过剩余预算: 每个精修个体至少需要一次差分 Jacobian、
+        一个线搜索点与一次复核, 个体数按此截断; 线搜索批次只评估预算内的前缀 (个体优先, 步长次之)。
+        """
+        n_jac = len(CONT_GENES) + 1
+        members = self._select(pop)
+        allowance = _allowance(budget)
+        if np.isfinite(allowance):
+            members = members[:int(allowance // (n_jac + 2))]
+        if not members:
+            return []
+        case = self.case
+        low, up = np.array(case.low), np.array(case.up)
+        span = (up - low)[CONT_GENES]
+
+        X = np.array([list(ind) for ind in members], dtype=float)
+        F0 = np.array([ind.fitness.values for ind in members])
+        # 以选中个体所在前沿的理想点与范围做归一化; 权重使各个体沿 "理想点 -> 自身" 方向改进
+        z = F0.min(axis=0)
+        scale = np.maximum(F0.max(axis=0) - z, 1e-12 * np.maximum(1.0, np.abs(z)))
+        w = 1.0 / np.maximum((F0 - z) / scale, 1e-3)
+        w = w / w.sum(axis=1, keepdims=True)
+
+        n_evals = 0
+        moved = np.zeros(len(X), dtype=bool)
+        for _ in range(self.n_iter):
+            # 为复核保留 len(X) 次评估; 不够一次 Jacobian 加一个线搜索点时停止
+            room = _allowance(budget, n_evals) - len(X) - len(X) * n_jac
+            if room < 1:
+                break
+            F, G, JF, JG = batch_jacobian(X, case, self.fd_step)
+            n_evals += len(X) * n_jac
+            current = self._scalarize(F, z, scale, w)
+
+            # 归一化基因空间中的下降方向
+            d = self._direction(F, JF, z, scale, w, span)
+            # 已在变量边界上的基因不再向外移动
+            xc = X[:, CONT_GENES]
+            d[(xc <= low[CONT_GENES]) & (d < 0)] = 0.0
+            d[(xc >= up[CONT_GENES]) & (d > 0)] = 0.0
+            # 对近乎紧的约束, 去掉使裕度减小的分量 (逐个投影)
+            JGu = JG * span[None, None, :]
+            for c in range(G.shape[1]):
+                active = G[:, c] < 1e-3
+                dot = np.einsum('nj,nj->n', JGu[:, c, :], d)
+                norm2 = np.einsum('nj,nj->n', JGu[:, c, :], JGu[:, c, :])
+                fix = active & (dot < 0) & (norm2 > 0)
+                d[fix] -= (dot[fix] / norm2[fix])[:, None] * JGu[fix, c, :]
+            length = np.linalg.norm(d, axis=1)
+            ok = length > 0
+            if not ok.any():
+                break
+            d[ok] /= length[ok, None]
+
+            # 批量线搜索: 每个个体 x 每个步长一个候选点
+            S = len(self.step_sizes)
+            C = np.repeat(X[:, None, :], S, axis=1)
+            C[:, :, CONT_GENES] += self.step_sizes[None, :, None] * d[:, None, :] * span
+            C[:, :, CONT_GENES] = np.clip(C[:, :, CONT_GENES], low[CONT_GENES], up[CONT_GENES])
+            # 预算不足以评估全部候选点时只评估前缀, 其余视为无效
+            k = int(min(len(X) * S, room))
+            FC = np.full((len(X) * S, 3), np.inf)
+            GC = np.full((len(X) * S, G.shape[1]), -np.inf)
+            FC[:k], GC[:k] = batch_objectives(C.reshape(-1, NDIM)[:k], case)
+            n_evals += k
+            FC = FC.reshape(len(X), S, -1)
+            GC = GC.reshape(len(X), S, -1)
+            with np.errstate(invalid='ignore'):
+                vals = self._scalarize(FC, z, scale, w[:, None, :])
+            valid = (GC >= 0).all(axis=2) & (vals < current[:, None] - 1e-12) & ok[:, None]
+            vals = np.where(valid, vals, np.inf)
+            best = np.argmin(vals, axis=1)
+            improved = np.isfinite(vals[np.arange(len(X)), best])
+            if not improved.any():
+                break
+            X[improved] = C[improved, best[improved]]
+            moved |= improved
+
+        # 按标准评估函数复核, 只返回仍可行的精修个体
+        refined = []
+        for i in np.flatnonzero(moved):
+            if _allowance(budget, n_evals) < 1:
+                break
+            genes = X[i].tolist()
+            for j in INT_GENES:
+                genes[j] = int(round(genes[j]))
+            ind = ind_class(genes)
+            ind.fitness.values = evaluate(ind, case)
+            n_evals += 1
+            if ind.fitness.values[0] < case.penalty_value:
+                refined.append(ind)
+
+        self.last_evaluations = n_evals
+        self.evaluations += n_evals
+        self.log.append((tag, len(members), len(refined), n_evals))
+        return refined
@@ -0,0 +1,332 @@
+"""
+标准测试问题上的算法引擎基准。
+
+桥梁模型的真实 Pareto 前沿未知, 算法实现的退化 (如 NSGA-III 小生境、MOPSO 归档) 无法在其上察觉。
+本模块提供已知前沿的三目标测试问题 (DTLZ1/2/3/4/7, WFG4/5), 向量化实现, 通过 ask / tell 接口驱动各算法:
+- 基因映射: 前 n_var 个连续基因 (refine.CONT_GENES) 线性映射到 [0, 1] 作为问题变量, 其余基因不参与
+- 目标: 三个目标均最小化; 传给 tell 时第三个目标取负 (优化器约定第三个目标为最大化的刚度)
+- 指标: 每代记录评估数、算法用时 (不含指标计算)、IGD (到参考前沿) 与归一化超体积 (参考点 1.1)
+
+全部 "问题 × 算法 × 运行" 作业在进程池中并行, 输出逐代轨迹 benchmark_trace.csv
+与最终结果汇总 benchmark_summary.csv。
+
+用法:
+    python benchmarks.py --problems DTLZ2 WFG4 --algos NSGA-II MOEA/D --runs 3 --evals 20000
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from deap import tools
+
+from case_config import *
+from results_store import pareto_mask
+from algorithms import OPTIMIZERS, get_optimizer
+from algorithms.refine import CONT_GENES
+
+TRACE_HEADER = ['Problem', 'Algorithm', 'Run', 'Generation', 'Evaluations', 'Time(s)', 'IGD', 'HV']
+SUMMARY_HEADER = ['Problem', 'Algorithm', 'Runs', 'Evaluations', 'MeanTime(s)',
+                  'MedianIGD', 'MeanIGD', 'StdIGD', 'MedianHV', 'MeanHV', 'StdHV', 'FrontHV']
+
+
+def _simplex(p):
+    return np.asarray(tools.uniform_reference_points(nobj=3, p=p))
+
+
+def nondominated(F):
+    """最小化目标矩阵的非支配行。"""
+    return F[pareto_mask(F * [1.0, 1.0, -1.0])]
+
+
+# ---------- 测试问题 ----------
+class Problem:
+    """n_var 个 [0, 1] 变量、三个最小化目标的测试问题。evaluate 对 (N, n_var) 矩阵向量化计算。"""
+    n_obj = 3
+
+    def __init__(self, n_var):
+        self.n_var = n_var
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def evaluate(self, U):
+        raise NotImplementedError
+
+    def pareto_front(self, p=BENCH_FRONT_P):
+        """参考前沿 (均匀分布的点)。"""
+        raise NotImplementedError
+
+
+class DTLZ1(Problem):
+    def __init__(self, k=5):
+        super().__init__(k + 2)
+
+    def g(self, Xm):
+        return 100.0 * (Xm.shape[1] + np.sum((Xm - 0.5) ** 2 - np.cos(20 * np.pi * (Xm - 0.5)), axis=1))
+
+    def evaluate(self, U):
+        x1, x2 = U[:, 0], U[:, 1]
+        h = 0.5 * (1.0 + self.g(U[:, 2:]))
+        return np.column_stack([h * x1 * x2, h * x1 * (1 - x2), h * (1 - x1)])
+
+    def pareto_front(self, p=BENCH_FRONT_P):
+        return 0.5 * _simplex(p)
+
+
+class DTLZ2(Problem):
+    alpha = 1.0
+
+    def __init__(self, k=10):
+        super().__init__(k + 2)
+
+    def g(self, Xm):
+        return np.sum((Xm - 0.5) ** 2, axis=1)
+
+    def evaluate(self, U):
+        t = U[:, :2] ** self.alpha * (np.pi / 2)
+        r = 1.0 + self.g(U[:, 2:])
+        return np.column_stack([r * np.cos(t[:, 0]) * np.cos(t[:, 1]),
+                                r * np.cos(t[:, 0]) * np.sin(t[:, 1]),
+                                r * np.sin(t[:, 0])])
+
+    def pareto_front(self, p=BENCH_FRONT_P):
+        W = _simplex(p)
+        return W / np.linalg.norm(W, axis=1, keepdims=True)
+
+
+class DTLZ3(DTLZ2):
+    g = DTLZ1.g
+
+
+class DTLZ4(DTLZ2):
+    alpha = 100.0
+
+
+class DTLZ7(Problem):
+    def __init__(self, k=14):
+        super().__init__(k + 2)
+
+    def _f3(self, F12, g):
+        h = 3.0 - np.sum(F12 / (1.0 + g[:, None]) * (1.0 + np.sin(3 * np.pi * F12)), axis=1)
+        return (1.0 + g) * h
+
+    def evaluate(self, U):
+        g = 1.0 + 9.0 / (self.n_var - 2) * np.sum(U[:, 2:], axis=1)
+        return np.column_stack([U[:, 0], U[:, 1], self._f3(U[:, :2], g)])
+
+    def pareto_front(self, p=BENCH_FRONT_P):
+        # 不连续前沿: g = 1 时的网格点取非支配部分
+        t = np.linspace(0.0, 1.0, 4 * p + 1)
+        F12 = np.array(np.meshgrid(t, t)).reshape(2, -1).T
+        return nondominated(np.column_stack([F12, self._f3(F12, np.ones(len(F12)))]))
+
+
+class WFG4(Problem):
+    """WFG4 (多峰), k = 4 个位置参数, l 个距离参数; 前沿为半轴 (2, 4, 6) 的椭球面。"""
+    S = np.array([2.0, 4.0, 6.0])
+
+    def __init__(self, k=4, l=12):
+        super().__init__(k + l)
+        self.k = k
+
+    def _transform(self, y):
+        A, B, C = 30.0, 10.0, 0.35
+        d = np.abs(y - C) / (2.0 * (np.floor(C - y) + C))
+        return (1.0 + np.cos((4 * A + 2) * np.pi * (0.5 - d)) + 4 * B * d ** 2) / (B + 2.0)
+
+    def evaluate(self, U):
+        y = self._transform(U)
+        half = self.k // 2
+        # r_sum 归约 (等权均值)
+        t = np.column_stack([y[:, :half].mean(axis=1), y[:, half:self.k].mean(axis=1), y[:, self.k:].mean(axis=1)])
+        x1, x2 = t[:, 0] * (np.pi / 2), t[:, 1] * (np.pi / 2)
+        h = np.column_stack([np.sin(x1) * np.sin(x2), np.sin(x1) * np.cos(x2), np.cos(x1)])
+        return t[:, 2:3] + self.S * h
+
+    def pareto_front(self, p=BENCH_FRONT_P):
+        return self.S * DTLZ2().pareto_front(p)
+
+
+class WFG5(WFG4):
+    """WFG5 (欺骗性), 前沿同 WFG4。"""
+    def _transform(self, y):
+        A, B, C = 0.35, 0.001, 0.05
+        return 1.0 + (np.abs(y - A) - B) * (
+            np.floor(y - A + B) * (1.0 - C + (A - B) / B) / (A - B)
+            + np.floor(A + B - y) * (1.0 - C + (1.0 - A - B) / B) / (1.0 - A - B)
+            + 1.0 / B)
+
+
+PROBLEMS = {cls.__name__: cls for cls in (DTLZ1, DTLZ2, DTLZ3, DTLZ4, DTLZ7, WFG4, WFG5)}
+
+
+def genes_to_unit(X, problem, case=DEFAULT_CASE):
+    """基因矩阵 -> 问题变量矩阵: 前 n_var 个连续基因线性映射到 [0, 1]。"""
+    if problem.n_var > len(CONT_GENES):
+        raise ValueError(f"{problem.name} 需要 {problem.n_var} 个变量, 连续基因只有 {len(CONT_GENES)} 个")
+    cols = CONT_GENES[:problem.n_var]
+    low, up = np.array(case.low)[cols], np.array(case.up)[cols]
+    return np.clip((np.asarray(X, dtype=float)[:, cols] - low) / (up - low), 0.0, 1.0)
+
+
+# ---------- 指标 ----------
+def _hv2d(P, ref):
+    P = P[np.argsort(P[:, 0], kind='stable')]
+    y = np.minimum.accumulate(P[:, 1])
+    x_next = np.append(P[1:, 0], ref[0])
+    return float(np.sum((x_next - P[:, 0]) * (ref[1] - y)))
+
+
+def hypervolume(F, ref):
+    """三目标 (最小化) 超体积: 沿第三个目标分层, 逐层累加二维超体积。"""
+    F = np.asarray(F, dtype=float)
+    F = F[np.all(F < ref, axis=1)]
+    if len(F) == 0:
+        return 0.0
+    F = F[np.argsort(F[:, 2], kind='stable')]
+    z = np.append(F[:, 2], ref[2])
+    return sum(_hv2d(F[:i + 1, :2], ref[:2]) * (z[i + 1] - z[i]) for i in range(len(F)) if z[i + 1] > z[i])
+
+
+def igd(F, front):
+    """参考前沿各点到解集的最近距离的均值。"""
+    d = np.linalg.norm(front[:, None, :] - np.asarray(F)[None, :, :], axis=2)
+    return float(d.min(axis=1).mean())
+
+
+class Metrics:
+    """以参考前沿的理想点 / 最差点归一化计算超体积 (参考点 1.1)。"""
+    def __init__(self, problem):
+        self.front = problem.pareto_front()
+        self.ideal = self.front.min(axis=0)
+        self.scale = np.maximum(self.front.max(axis=0) - self.ideal, 1e-12)
+        self.ref = np.full(3, 1.1)
+        self.front_hv = self.hv(self.front)
+
+    def hv(self, F):
+        return hypervolume((F - self.ideal) / self.scale, self.ref)
+
+    def __call__(self, F):
+        F = nondominated(F)
+        return igd(F, self.front), self.hv(F)
+
+
+# ---------- 运行 ----------
+def run_benchmark(problem_name, algo_name, run=0, max_evals=BENCH_EVALS, case=DEFAULT_CASE):
+    """
+    用 ask / tell 在测试问题上运行一个算法, 返回逐代轨迹
+    [(generation, evaluations, time, IGD, HV), ...], 第 0 行为初始种群。
+    """
+    random.seed(SEED + run)
+    np.random.seed(SEED + run)
+    problem = PROBLEMS[problem_name]()
+    metrics = Metrics(problem)
+    opt = get_optimizer(algo_name)(case)
+
+    trace = []
+    evals = 0
+    elapsed = 0.0
+    gen = 0
+    while evals < max_evals:
+        t0 = time.perf_counter()
+        X = opt.ask()[:max_evals - evals]
+        F = problem.evaluate(genes_to_unit(X, problem, case))
+        # 优化器约定第三个目标为最大化, 取负后传入; 测试问题无约束, 惩罚为 0
+        opt.tell(F * [1.0, 1.0, -1.0], np.zeros(len(F)))
+        elapsed += time.perf_counter() - t0
+        evals += len(X)
+
+        members = opt.members
+        F = np.array([ind.fitness.values for ind in members]).reshape(-1, 3)
+        trace.append((gen, evals, elapsed) + metrics(F))
+        gen += 1
+    return trace
+
+
+def _run_job(job):
+    problem_name, algo_name, run, max_evals = job
+    return problem_name, algo_name, run, run_benchmark(problem_name, algo_name, run, max_evals)
+
+
+def run_suite(problems=None, algo_names=None, n_runs=BENCH_RUNS, max_evals=BENCH_EVALS, workers=BENCH_WORKERS):
+    """并行运行全部作业, 返回 {(问题, 算法): [各运行的轨迹]}。"""
+    problems = list(problems or BENCH_PROBLEMS)
+    algo_names = list(algo_names or OPTIMIZERS)
+    jobs = [(p, a, r, max_evals) for p in problems for a in algo_names for r in range(n_runs)]
+    print(f"问题: {problems}, 算法: {algo_names}, 每组 {n_runs} 次运行 x {max_evals} 次评估, 作业总数: {len(jobs)}",
+          file=sys.stderr)
+
+    traces = {(p, a): [None] * n_runs for p in problems for a in algo_names}
+    start_t = time.time()
+    with mp.Pool(processes=workers) as pool:
+        for done, (p, a, r, trace) in enumerate(pool.imap_unordered(_run_job, jobs), start=1):
+            traces[p, a][r] = trace
+            _, evals, elapsed, d, hv = trace[-1]
+            print(f"  [{done}/{len(jobs)}] {p} {a} run {r + 1}: {elapsed:.1f}s, IGD={d:.4g}, HV={hv:.4f}",
+                  file=sys.stderr)
+    print(f"全部作业完成, 用时 {time.time() - start_t:.1f}s", file=sys.stderr)
+    return traces
+
+
+def summarize(traces):
+    """每个 (问题, 算法) 一行: 最终 IGD / HV 的中位数、均值、标准差与参考前沿的超体积。"""
+    rows = []
+    front_hv = {}
+    for (p, a), runs in traces.items():
+        if p not in front_hv:
+            front_hv[p] = Metrics(PROBLEMS[p]()).front_hv
+        final = np.array([trace[-1] for trace in runs])
+        d, hv = final[:, 3], final[:, 4]
+        rows.append([p, a, len(runs), int(final[:, 1].max()), final[:, 2].mean(),
+                     np.median(d), d.mean(), d.std(), np.median(hv), hv.mean(), hv.std(), front_hv[p]])
+    return rows
+
+
+def write_results(output_dir, traces, rows):
+    with open(os.path.join(output_dir, "benchmark_trace.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(TRACE_HEADER)
+        for (p, a), runs in traces.items():
+            for r, trace in enumerate(runs, start=1):
+                writer.writerows([p, a, r] + list(row) for row in trace)
+    with open(os.path.join(output_dir, "benchmark_summary.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        writer.writerows(rows)
+
+
+def print_summary(rows, file=sys.stdout):
+    print(f"{'Problem':<8}{'Algorithm':<10}{'MedianIGD':>12}{'MedianHV':>10}{'FrontHV':>9}{'Time(s)':>9}", file=file)
+    for row in rows:
+        print(f"{row[0]:<8}{row[1]:<10}{row[5]:>12.4g}{row[8]:>10.4f}{row[11]:>9.4f}{row[4]:>9.1f}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="标准测试问题上的算法引擎基准 (IGD / 超体积)")
+    parser.add_argument('--problems', nargs='+', choices=list(PROBLEMS), default=list(BENCH_PROBLEMS))
+    parser.add_argument('--algos', nargs='+', choices=list(OPTIMIZERS), default=list(OPTIMIZERS))
+    parser.add_argument('--runs', type=int, default=BENCH_RUNS)
+    parser.add_argument('--evals', type=int, default=BENCH_EVALS, help="每次运行的评估次数")
+    parser.add_argument('--workers', type=int, default=BENCH_WORKERS)
+    parser.add_argument('-o', '--output-dir', default=None, help="输出目录 (默认 outputs/benchmark_results_N)")
+    args = parser.parse_args(argv)
+
+    from main import _create_unique_output_dir
+    output_dir = args.output_dir or _create_unique_output_dir(os.path.join(os.getcwd(), "outputs"), "benchmark_results")
+    os.makedirs(output_dir, exist_ok=True)
+
+    traces = run_suite(args.problems, args.algos, args.runs, args.evals, args.workers)
+    rows = summarize(traces)
+    print_summary(rows)
+    write_results(output_dir, traces, rows)
+    print(f"\n结果已保存: {output_dir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import numpy as np
+from dataclasses import dataclass, fields, replace
 
 # --- 物理常量 ---
 L_SPAN = 75.0           # 跨径 (m)
@@ -57,6 +58,7 @@ VAR_RANGES_MAT = [
 ]
 
 NDIM = 20  # 总变量维度
+INT_GENES = (12, 13, 16, 17)  # 离散基因位置 (整数索引): fc, fy, npb, npw
 
 # --- 优化算法参数 ---
 N_RUNS = 10         # 重复运行次数
@@ -80,6 +82,8 @@ GDE3_POP = 500
 GDE3_GEN = 100
 GDE3_F = 0.8
 GDE3_CR = 0.9
+GDE3_ADAPT = 'fixed'    # F/CR 控制方式: fixed / jde / shade (algorithms/de_control.py)
+GDE3_SHADE_MEMORY = 10  # SHADE 成功历史记忆长度
 
 # MOPSO
 MOPSO_POP = 500
@@ -88,10 +92,219 @@ MOPSO_W = 0.2       # 惯性权重 (修正为0.2)
 MOPSO_C1 = 1.5      # 个体学习因子
 MOPSO_C2 = 1.5      # 全局学习因子
 
+# MOEA/D (algorithms/moead.py): 种群规模 = Das-Dennis 权重数 C(MOEAD_P + 2, 2)
+MOEAD_P = 23            # 权重划分数 (生成 300 个子问题)
+MOEAD_GEN = 200
+MOEAD_T = 20            # 邻域大小
+MOEAD_DELTA = 0.9       # 从邻域内选择父代的概率
+MOEAD_NR = 2            # 每个子代最多替换的解数
+MOEAD_F = 0.5           # DE/rand/1 缩放因子
+MOEAD_CR = 1.0          # DE 交叉率
+MOEAD_AGG = 'tchebycheff'   # 标量化函数: tchebycheff / pbi
+MOEAD_THETA = 5.0       # PBI 惩罚参数
+
+# 岛屿模型 (islands.py)
+ISLAND_ALGOS = ['NSGA-II', 'NSGA-III', 'GDE3', 'MOPSO']  # 每个元素对应一个岛, 允许重复
+ISLAND_TOPOLOGY = 'ring'    # 迁移拓扑: ring / star / full
+ISLAND_INTERVAL = 10        # 每 k 代迁移一次
+ISLAND_MIGRANTS = 5         # 每次迁出的非支配个体数
+
+# 参数扫描 (sweep.py): 对 CaseConfig 字段做网格组合, 每个组合为一个工况
+# (只能扫描进入目标/约束计算的字段, 见 UNMODELLED_FIELDS)
+SWEEP_GRID = {
+    'l_span': [60.0, 75.0, 90.0],
+    'deflection_ratio': [800.0, 1000.0],
+}
+SWEEP_ALGOS = ['NSGA-II', 'NSGA-III', 'GDE3', 'MOPSO']
+SWEEP_RUNS = N_RUNS
+SWEEP_WORKERS = None    # None 表示使用全部 CPU 核
+
+# 热启动 (seeding.py): 从历史前沿 CSV 读取解码变量作为初始种群的一部分
+SEED_FRONTS = []        # 例如 ['outputs/run_results/pareto_front_global.csv']
+SEED_FRACTION = 0.2     # 初始种群中热启动个体的比例
+SEED_JITTER = 0.02      # 重复使用同一设计时, 连续变量高斯扰动的标准差 (相对变量区间宽度)
+
+# 初始种群采样 (sampling.py): 各算法与 check_feasibility.py 共用
+INIT_METHOD = 'lhs'     # uniform (独立均匀) / lhs (拉丁超立方) / sobol / halton (加扰准随机序列)
+
+# 评估预算 (algorithms/budget.py): 设置后以预算代替代数, 用于等预算公平比较
+MAX_EVALS = None        # 每次运行的最大评估次数, 例如 40000
+TIME_LIMIT = None       # 每次运行的墙钟时间上限 (s)
+BUDGET_TARGET = None    # 目标点 (Cost, Moment, Stiffness); None 表示以首个可行解为目标
+
+# 梯度局部精修 (algorithms/refine.py): 离散基因固定, 对部分前沿个体做差分梯度下降
+REFINE_INTERVAL = None  # 每 k 代精修一次; None 表示运行过程中不精修
+REFINE_AT_END = False   # 运行结束时是否精修一次
+REFINE_SIZE = 10        # 每次精修的前沿个体数
+REFINE_ITERS = 5        # 每次精修的梯度步数
+REFINE_SCALARIZATION = 'asf'  # 标量化方式: asf (成就函数) / weighted (加权和)
+REFINE_FD_STEP = 1e-6   # 前向差分步长 (相对变量区间宽度)
+REFINE_STEP_SIZES = (0.05, 0.02, 0.01, 0.005, 0.002, 0.001)  # 线搜索步长 (相对变量区间宽度)
+
+# 绘图 (visualization.py): 前沿点数超过上限时先抽稀, 图表在进程池中并行生成
+PLOT_MAX_POINTS = 1500  # 每张图的最大点数 (保留各目标极值点)
+PLOT_DECIMATE = 'grid'  # 抽稀方式: grid (目标空间网格) / crowding (拥挤度距离)
+PLOT_DPI = 300          # 位图分辨率; 预览可用 72~100
+PLOT_FORMAT = 'png'     # png / svg / pdf
+PLOT_WORKERS = None     # None 表示使用全部 CPU 核
+
+# 蒙特卡洛稳健性分析 (robustness.py): 材料与施工离散性下的目标分布与约束失效概率
+ROBUST_SAMPLES = 100000 # 每个设计的样本数
+ROBUST_CHUNK = 8192     # 每块样本数 (控制临时数组内存, 块数组可留在缓存中)
+ROBUST_WORKERS = None   # 按设计分批的进程数; None 表示使用全部 CPU 核
+ROBUST_EC_COV = 0.10    # 混凝土弹性模量 Ec 的变异系数
+ROBUST_SIGMA_COV = 0.05 # 张拉控制应力 sigma 的变异系数
+ROBUST_BAR_COV = 0.02   # 钢筋直径 dr / dp 的变异系数
+ROBUST_GEO_TOL = 0.005  # 截面尺寸施工偏差的标准差 (m)
+ROBUST_QUANTILES = (0.05, 0.5, 0.95)
+
+# 全局敏感性分析 (sensitivity.py): Saltelli 采样的 Sobol 指数与 Morris 筛选
+SENS_SOBOL_N = 1 << 15  # Saltelli 基样本数 N, 评估次数 N * (NDIM + 2)
+SENS_MORRIS_R = 1000    # Morris 轨迹数, 评估次数 R * (NDIM + 1)
+SENS_MORRIS_LEVELS = 4  # Morris 网格层数 p, 步长 p / (2 (p - 1))
+SENS_CHUNK = 1 << 18    # 每个进程任务的评估行数
+SENS_WORKERS = None     # None 表示使用全部 CPU 核
+
+# 离散组合分解求解 (decompose.py): 枚举 fc / fy / npb / npw 组合, 逐组合优化连续基因
+DECOMP_POP = 200       # 每个组合的子种群规模
+DECOMP_GEN = 40        # 每个组合的子优化代数
+DECOMP_F = 0.5         # 子优化 DE 缩放因子
+DECOMP_CR = 0.9        # 子优化 DE 交叉率
+DECOMP_PROBE = 256     # 估计乐观界的探测样本数 (每个组合)
+DECOMP_BOUND_SLACK = 0.05  # 乐观界向有利方向放宽的比例 (相对探测样本的目标范围)
+DECOMP_WORKERS = None  # None 表示使用全部 CPU 核
+DECOMP_LAG = 32        # 界剪枝只使用提交顺序上至少早 DECOMP_LAG 个组合的结果 (同时是在途组合数上限)
+
+# 本地优化服务 (service.py): localhost HTTP 接收作业, 预热的工作进程逐个执行
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 2     # 常驻工作进程数 (可并行的作业数)
+SERVICE_POLL = 1.0      # 检查工作进程存活的间隔 (s); 异常退出的工作进程其作业记为失败并重启
+
+# 标准测试问题基准 (benchmarks.py): 已知前沿的三目标问题上比较各算法引擎的 IGD / 超体积
+BENCH_PROBLEMS = ('DTLZ1', 'DTLZ2', 'DTLZ4', 'DTLZ7', 'WFG4', 'WFG5')
+BENCH_EVALS = 20000     # 每次运行的评估次数
+BENCH_RUNS = 5          # 每个 (问题, 算法) 的独立运行次数 (种子 SEED + run)
+BENCH_WORKERS = None    # None 表示使用全部 CPU 核心
+BENCH_FRONT_P = 40      # 参考前沿的 Das-Dennis 分割数 (DTLZ7 为 4p + 1 网格)
+
+# 结果目录 (catalog.py): 每个工作流结束时登记到 SQLite 数据库, None 表示不登记
+CATALOG_DB = None       # 如 'outputs/results_catalog.sqlite'
+
+# 评估明细: 评估时在个体上附带约束明细、目标与解码变量 (constraints.EvaluationRecord),
+# 阶段一逐解核查直接读取而不重新计算; False 时核查阶段重新计算
+EVAL_DETAILS = True
+
+# NSGA-II / NSGA-III 的变异方式: True 为矩阵化 SBX + 多项式变异 (algorithms.mixed_integer.vary_matrix),
+# False 为逐个体克隆的 deap.algorithms.varAnd (与旧版本结果逐位一致)
+VECTOR_VARIATION = True
+
+# 多节点评估 (cluster.py): 协调进程监听 TCP 端口, 各节点的工作进程主动连接并领取评估批次或整次运行作业
+CLUSTER_HOST = '127.0.0.1'  # 跨节点时设为 '0.0.0.0' (仅限可信网络, 可配合 CLUSTER_TOKEN)
+CLUSTER_PORT = 8766
+CLUSTER_TOKEN = None    # 工作进程连接时须提供的口令; None 表示不校验
+CLUSTER_HEARTBEAT = 2.0     # 工作进程执行任务期间的心跳间隔 (s)
+CLUSTER_TIMEOUT = 10.0      # 超过该时间没有心跳或结果即视为失联, 其任务重新提交 (s)
+CLUSTER_CHUNK = 16      # 评估批次拆分时每个任务的最少行数
+
 # 约束惩罚
 PENALTY_VALUE = 1e10
 
 # --- Stress Limits (Placeholders - Please Update) ---
 LIMIT_STRESS_C_FACTOR = 0.5  # fc_allow = 0.5 * fc
 LIMIT_STRESS_T = 1.0e6       # 1 MPa tension allowed
-LIMIT_SHEAR_FACTOR = 0.05    # tau_allow = 0.05 * fc
\ No newline at end of file
+LIMIT_SHEAR_FACTOR = 0.05    # tau_allow = 0.05 * fc
+
+# --- 单价与规范限值 (可按工况修改, 见 whatif.py) ---
+CC_PRICE = (3, 255)          # Eq(15) 混凝土单价 cc = a * fc + b
+CR_PRICE = (0.1, 15, 11.0)   # Eq(15) 普通钢筋单价 cr = (a * fy + b) / c
+CP_PRICE = (0.1, 15, 11.0)   # Eq(15) 预应力钢筋单价 cp = (a * fy + b) / c
+K_DEF = 1e-4                 # Eq(28) 挠度系数 (取较小量级, 缓解 Mu=m*g*L 带来的系统性超限)
+DEFLECTION_RATIO = 800.0     # Eq(28) 挠度限值 L / DEFLECTION_RATIO
+
+
+@dataclass(frozen=True)
+class CaseConfig:
+    """
+    单个桥梁工况 (不可变, 可 pickle 后发送到工作进程)。
+    构造时预计算离散变量相关的查找表与基因上下界, 目标/约束计算直接按档位索引取值。
+    默认值取自本文件的模块级常量; 派生工况用 dataclasses.replace(DEFAULT_CASE, l_span=...)。
+    """
+    l_span: float = L_SPAN
+    b_top: float = B_TOP
+    alpha: float = ALPHA
+    var_ranges_geo: tuple = tuple(VAR_RANGES_GEO)
+    var_ranges_mat: tuple = tuple(VAR_RANGES_MAT)
+    val_fc: tuple = tuple(VAL_FC)
+    val_fy: tuple = tuple(VAL_FY)
+    val_npb: tuple = tuple(VAL_NPB)
+    val_npw: tuple = tuple(VAL_NPW)
+    penalty_value: float = PENALTY_VALUE
+    limit_stress_c_factor: float = LIMIT_STRESS_C_FACTOR
+    limit_stress_t: float = LIMIT_STRESS_T
+    limit_shear_factor: float = LIMIT_SHEAR_FACTOR
+    cc_price: tuple = tuple(CC_PRICE)
+    cr_price: tuple = tuple(CR_PRICE)
+    cp_price: tuple = tuple(CP_PRICE)
+    k_def: float = K_DEF
+    deflection_ratio: float = DEFLECTION_RATIO
+
+    def __post_init__(self):
+        fc = np.asarray(self.val_fc, dtype=float)
+        fy = np.asarray(self.val_fy, dtype=float)
+        tables = {
+            'fc_table': fc,
+            'fy_table': fy,
+            'npb_table': np.asarray(self.val_npb, dtype=float),
+            'npw_table': np.asarray(self.val_npw, dtype=float),
+            'rho_c_table': fc + 2320,                                   # Eq(11) 混凝土密度
+            'cc_table': self.cc_price[0] * fc + self.cc_price[1],       # Eq(15) 混凝土单价
+            'ec_table': (-4.375 * fc ** 2 + 612.5 * fc + 15000) * 1e6,  # Eq(19) 混凝土弹性模量
+            'cr_table': (fy * self.cr_price[0] + self.cr_price[1]) / self.cr_price[2],  # Eq(15) 普通钢筋单价
+            'cp_table': (fy * self.cp_price[0] + self.cp_price[1]) / self.cp_price[2],  # Eq(15) 预应力钢筋单价
+        }
+        for name, arr in tables.items():
+            arr.flags.writeable = False
+            object.__setattr__(self, name, arr)
+
+        # 基因上下界 (离散基因为整数索引区间)
+        low = [r[0] for r in self.var_ranges_geo] + \
+              [0, 0] + \
+              [self.var_ranges_mat[0][0], self.var_ranges_mat[1][0]] + \
+              [0, 0] + \
+              [self.var_ranges_mat[2][0], self.var_ranges_mat[3][0]]
+        up = [r[1] for r in self.var_ranges_geo] + \
+             [len(self.val_fc)-1, len(self.val_fy)-1] + \
+             [self.var_ranges_mat[0][1], self.var_ranges_mat[1][1]] + \
+             [len(self.val_npb)-1, len(self.val_npw)-1] + \
+             [self.var_ranges_mat[2][1], self.var_ranges_mat[3][1]]
+        object.__setattr__(self, 'low', tuple(low))
+        object.__setattr__(self, 'up', tuple(up))
+
+    @property
+    def levels(self):
+        """各离散基因的档位数, 与 INT_GENES 顺序一致。"""
+        return (len(self.val_fc), len(self.val_fy), len(self.val_npb), len(self.val_npw))
+
+    def discrete_index(self, x):
+        """基因向量 -> (fc, fy, npb, npw) 档位索引。"""
+        return tuple(int(min(max(round(x[j]), 0), n - 1)) for j, n in zip(INT_GENES, self.levels))
+
+
+DEFAULT_CASE = CaseConfig()
+
+
+def _tuples(value):
+    return tuple(_tuples(v) for v in value) if isinstance(value, list) else value
+
+
+def make_case(overrides, base=DEFAULT_CASE):
+    """{CaseConfig 字段名: 取值} -> 工况 (JSON 列表转为元组)。未知字段抛出 ValueError。"""
+    names = {f.name for f in fields(base)}
+    unknown = sorted(set(overrides) - names)
+    if unknown:
+        raise ValueError(f"未知工况字段: {', '.join(unknown)}")
+    return replace(base, **{k: _tuples(v) for k, v in overrides.items()})
+
+# 仅作记录、尚未进入任何目标或约束计算的 CaseConfig 字段 (改动它们不会改变优化结果)
+UNMODELLED_FIELDS = ('b_top', 'limit_stress_c_factor', 'limit_stress_t', 'limit_shear_factor')
\ No newline at end of file
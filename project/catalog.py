@@ -0,0 +1,331 @@
+"""
+跨工作流的 SQLite 结果目录。
+
+每次 main.run_campaign (或扫描中的一个工况) 产生一个输出目录, 目录中的 CSV 登记到本地 SQLite 数据库:
+- campaigns:     每个输出目录一行 (路径、名称、登记时间、工况 l_span / b_top / alpha 与改动字段)
+- runs:          每次运行一行 (可行性汇总与预算统计, 同 feasibility_summary.csv 的列)
+- front_members: 各算法前沿的每个设计一行 (目标、解码变量、是否属于该工作流的全局前沿)
+目标、跨径与算法列均建索引, 跨全部历史工作流的查询 (如某跨径下满足约束的最便宜设计) 直接由 SQL 完成。
+每个工作流在一个事务中批量写入 (executemany); 重复登记同一目录时先删除旧记录。
+
+历史输出目录未记录工况: 导入时按 DEFAULT_CASE 登记, 可用 --l-span / --b-top 指定;
+扫描输出 (含 sweep_summary.csv 的根目录) 按汇总表中的工况字段登记。
+
+用法:
+    python catalog.py import outputs/run_results_1 outputs/sweep_results_2
+    python catalog.py campaigns
+    python catalog.py best --span 75 --max-moment 1.2e9 --min-stiffness 6e10 -k 3
+    python catalog.py runs --algo GDE3
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from case_config import *
+from objectives import DECODED_VAR_NAMES
+from results_store import ResultStore, OBJECTIVE_NAMES, pareto_mask
+
+DEFAULT_DB = os.path.join("outputs", "results_catalog.sqlite")
+
+# runs 表的列与 feasibility_summary.csv (扫描输出为 run_summary.csv) 列名的对应关系
+RUN_COLUMNS = [
+    ('time', 'Time(s)'), ('population_size', 'PopulationSize'), ('front_size', 'FrontSize'),
+    ('feasible_count', 'FeasibleCount'), ('infeasible_count', 'InfeasibleCount'), ('feasible_ratio', 'FeasibleRatio'),
+    ('fail_eq24', 'Fail_Eq24'), ('fail_eq25', 'Fail_Eq25'), ('fail_eq26', 'Fail_Eq26'),
+    ('fail_eq29', 'Fail_Eq29'), ('fail_eq28', 'Fail_Eq28'), ('fail_fc', 'Fail_fc'), ('fail_fy', 'Fail_fy'),
+    ('evaluations', 'Evaluations'), ('generations', 'Generations'),
+    ('evals_to_target', 'EvalsToTarget'), ('time_to_target', 'TimeToTarget(s)'),
+]
+MEMBER_COLUMNS = ['cost', 'moment', 'stiffness'] + DECODED_VAR_NAMES
+_OBJECTIVE_COLUMNS = dict(zip(OBJECTIVE_NAMES, MEMBER_COLUMNS[:3]))
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    output_dir TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    l_span REAL,
+    b_top REAL,
+    alpha REAL,
+    overrides TEXT,
+    algorithms TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_span ON campaigns (l_span, b_top);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns (id) ON DELETE CASCADE,
+    algorithm TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    {", ".join(f"{name} {'REAL' if name in ('time', 'feasible_ratio', 'time_to_target') else 'INTEGER'}"
+               for name, _ in RUN_COLUMNS)},
+    UNIQUE (campaign_id, algorithm, run)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_algorithm ON runs (algorithm);
+
+CREATE TABLE IF NOT EXISTS front_members (
+    id INTEGER PRIMARY KEY,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns (id) ON DELETE CASCADE,
+    run_id INTEGER REFERENCES runs (id) ON DELETE CASCADE,
+    algorithm TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    solution_idx INTEGER NOT NULL,
+    global_front INTEGER NOT NULL,
+    {", ".join(f"{name} REAL NOT NULL" for name in MEMBER_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_members_campaign ON front_members (campaign_id);
+CREATE INDEX IF NOT EXISTS idx_members_algorithm ON front_members (algorithm);
+CREATE INDEX IF NOT EXISTS idx_members_cost ON front_members (cost);
+CREATE INDEX IF NOT EXISTS idx_members_moment ON front_members (moment);
+CREATE INDEX IF NOT EXISTS idx_members_stiffness ON front_members (stiffness);
+"""
+
+
+def _number(value):
+    return None if value in ('', None) else float(value)
+
+
+def _read_rows(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def _sweep_case(output_dir):
+    """扫描工况子目录: 从上级 sweep_summary.csv 读取该工况的字段取值, 不是扫描输出时返回 None。"""
+    rows = [row for row in _read_rows(os.path.join(os.path.dirname(output_dir), "sweep_summary.csv"))
+            if row['Case'] == os.path.basename(output_dir)]
+    if not rows:
+        return None
+    keys = list(rows[0])
+    overrides = {k: float(rows[0][k]) for k in keys[1:keys.index('Algorithm')]}
+    return replace(DEFAULT_CASE, **overrides)
+
+
+def _case_overrides(case):
+    from sweep import case_overrides
+    return json.dumps({k: list(v) if isinstance(v, tuple) else v for k, v in case_overrides(case).items()})
+
+
+class Catalog:
+    def __init__(self, path=DEFAULT_DB):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 服务的多个工作进程可能同时登记: WAL 模式下读写互不阻塞, 写锁等待 timeout 秒
+        self.conn = sqlite3.connect(path, timeout=60.0)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- 登记 ----------
+    def record(self, output_dir, case=None):
+        """
+        登记一个输出目录 (main 的输出或扫描的单个工况子目录), 返回 campaign id。
+        case 为 None 时, 扫描工况按 sweep_summary.csv 确定, 其余按 DEFAULT_CASE。
+        """
+        output_dir = os.path.abspath(output_dir)
+        case = case or _sweep_case(output_dir) or DEFAULT_CASE
+        run_rows = _read_rows(os.path.join(output_dir, "feasibility_summary.csv")) or \
+            _read_rows(os.path.join(output_dir, "run_summary.csv"))
+        front_files = sorted(p for p in glob.glob(os.path.join(output_dir, "pareto_front_*.csv"))
+                             if os.path.basename(p) != "pareto_front_global.csv")
+        if not run_rows and not front_files:
+            raise FileNotFoundError(f"不是结果输出目录: {output_dir}")
+
+        store = ResultStore.from_csv(front_files)
+        algorithms = list(dict.fromkeys([row['Algorithm'] for row in run_rows] + store.algorithm_names))
+        on_front = pareto_mask(store.objectives)
+
+        with self.conn:
+            self.conn.execute("DELETE FROM campaigns WHERE output_dir = ?", (output_dir,))
+            cur = self.conn.execute(
+                "INSERT INTO campaigns (output_dir, name, recorded_at, l_span, b_top, alpha, overrides, algorithms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (output_dir, os.path.basename(output_dir), time.strftime('%Y-%m-%d %H:%M:%S'),
+                 case.l_span, case.b_top, case.alpha, _case_overrides(case), json.dumps(algorithms)))
+            campaign_id = cur.lastrowid
+
+            self.conn.executemany(
+                f"INSERT INTO runs (campaign_id, algorithm, run, {', '.join(n for n, _ in RUN_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(RUN_COLUMNS) + 3))})",
+                [[campaign_id, row['Algorithm'], int(row['Run'])] + [_number(row.get(col)) for _, col in RUN_COLUMNS]
+                 for row in run_rows])
+            run_ids = {(r['algorithm'], r['run']): r['id'] for r in self.conn.execute(
+                "SELECT id, algorithm, run FROM runs WHERE campaign_id = ?", (campaign_id,))}
+
+            names = store.algorithm_names
+            self.conn.executemany(
+                f"INSERT INTO front_members (campaign_id, run_id, algorithm, run, solution_idx, global_front, "
+                f"{', '.join(MEMBER_COLUMNS)}) VALUES ({', '.join('?' * (len(MEMBER_COLUMNS) + 6))})",
+                [[campaign_id, run_ids.get((names[a], r)), names[a], r, s, g] + obj + dec
+                 for a, r, s, g, obj, dec in zip(store.algorithm_codes.tolist(), store.run.tolist(),
+                                                 store.solution_idx.tolist(), on_front.astype(int).tolist(),
+                                                 store.objectives.tolist(), store.decoded.tolist())])
+        return campaign_id
+
+    def import_tree(self, path, case=None):
+        """
+        登记 path 及其子目录中的全部输出目录 (含 pareto_front_*.csv 或运行汇总的目录),
+        返回 [(输出目录, campaign id), ...]。
+        """
+        found = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            if any(f.startswith("pareto_front_") and f.endswith(".csv") for f in files) or \
+                    "feasibility_summary.csv" in files:
+                found.append((root, self.record(root, case)))
+        return found
+
+    def remove(self, output_dir):
+        with self.conn:
+            self.conn.execute("DELETE FROM campaigns WHERE output_dir = ?", (os.path.abspath(output_dir),))
+
+    # ---------- 查询 ----------
+    def campaigns(self):
+        return self.conn.execute(
+            "SELECT c.*, (SELECT COUNT(*) FROM runs WHERE campaign_id = c.id) AS n_runs, "
+            "(SELECT COUNT(*) FROM front_members WHERE campaign_id = c.id) AS n_members "
+            "FROM campaigns c ORDER BY c.id").fetchall()
+
+    def runs(self, algorithm=None, campaign=None):
+        """运行汇总; campaign 为输出目录名称或路径。"""
+        where, params = self._filters(algorithm=algorithm, campaign=campaign, table='r')
+        return self.conn.execute(
+            f"SELECT c.name AS campaign, r.* FROM runs r JOIN campaigns c ON c.id = r.campaign_id {where} "
+            "ORDER BY c.id, r.algorithm, r.run", params).fetchall()
+
+    def _filters(self, span=None, b_top=None, algorithm=None, campaign=None, global_only=False,
+                 max_cost=None, max_moment=None, min_stiffness=None, table='f'):
+        clauses, params = [], []
+        # 工况按浮点容差匹配, 仍可使用 l_span 索引
+        for col, value in (('l_span', span), ('b_top', b_top)):
+            if value is not None:
+                clauses.append(f"c.{col} BETWEEN ? AND ?")
+                params += [value - 1e-9, value + 1e-9]
+        if algorithm is not None:
+            clauses.append(f"{table}.algorithm = ?")
+            params.append(algorithm)
+        if campaign is not None:
+            clauses.append("(c.name = ? OR c.output_dir = ?)")
+            params += [campaign, os.path.abspath(campaign)]
+        if global_only:
+            clauses.append("f.global_front = 1")
+        for col, op, value in (('cost', '<=', max_cost), ('moment', '<=', max_moment),
+                               ('stiffness', '>=', min_stiffness)):
+            if value is not None:
+                clauses.append(f"f.{col} {op} ?")
+                params.append(value)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def best(self, objective='Cost', k=1, **filters):
+        """
+        全部登记工作流中满足 filters 的前沿设计按 objective 取前 k 个 (Stiffness 取最大)。
+        filters: span / b_top / algorithm / campaign / global_only / max_cost / max_moment / min_stiffness。
+        """
+        col = _OBJECTIVE_COLUMNS[objective]
+        where, params = self._filters(**filters)
+        return self.conn.execute(
+            f"SELECT c.name AS campaign, c.output_dir, c.l_span, c.b_top, f.* "
+            f"FROM front_members f JOIN campaigns c ON c.id = f.campaign_id {where} "
+            f"ORDER BY f.{col} {'DESC' if objective == 'Stiffness' else 'ASC'} LIMIT ?", params + [k]).fetchall()
+
+    def front_index(self, **filters):
+        """满足 filters 的前沿设计载入为 front_query.FrontIndex (区间 / 近邻查询)。"""
+        from front_query import FrontIndex
+        where, params = self._filters(**filters)
+        rows = self.conn.execute(
+            f"SELECT f.algorithm, f.run, f.solution_idx, {', '.join('f.' + c for c in MEMBER_COLUMNS)} "
+            f"FROM front_members f JOIN campaigns c ON c.id = f.campaign_id {where} ORDER BY f.id", params).fetchall()
+        names = list(dict.fromkeys(row[0] for row in rows))
+        values = np.array([tuple(row)[3:] for row in rows], dtype=float).reshape(-1, len(MEMBER_COLUMNS))
+        return FrontIndex(values[:, :3], values[:, 3:], [names.index(row[0]) for row in rows], names,
+                          [row[1] for row in rows], [row[2] for row in rows])
+
+
+def record_campaign(db_path, output_dir, case=None):
+    """main.run_campaign 结束时登记输出目录。"""
+    with Catalog(db_path) as cat:
+        campaign_id = cat.record(output_dir, case)
+    print(f"结果目录已登记: {db_path} (campaign {campaign_id})")
+    return campaign_id
+
+
+def _write_rows(rows, file=sys.stdout):
+    writer = csv.writer(file)
+    if rows:
+        writer.writerow(rows[0].keys())
+    writer.writerows(tuple(row) for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="跨工作流的 SQLite 结果目录")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"数据库文件 (默认 {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_imp = sub.add_parser('import', help="登记已有输出目录 (含子目录)")
+    p_imp.add_argument('paths', nargs='+')
+    p_imp.add_argument('--l-span', type=float, default=None, help="历史目录的跨径 (默认 DEFAULT_CASE)")
+    p_imp.add_argument('--b-top', type=float, default=None, help="历史目录的桥宽 (默认 DEFAULT_CASE)")
+    sub.add_parser('campaigns', help="列出已登记的工作流")
+    p_runs = sub.add_parser('runs', help="运行汇总")
+    p_runs.add_argument('--algo', default=None)
+    p_runs.add_argument('--campaign', default=None, help="输出目录名称或路径")
+    p_best = sub.add_parser('best', help="全部工作流中满足约束的最优设计")
+    p_best.add_argument('--objective', choices=OBJECTIVE_NAMES, default='Cost')
+    p_best.add_argument('-k', type=int, default=1)
+    p_best.add_argument('--span', type=float, default=None)
+    p_best.add_argument('--b-top', type=float, default=None)
+    p_best.add_argument('--algo', default=None)
+    p_best.add_argument('--campaign', default=None)
+    p_best.add_argument('--global-only', action='store_true', help="只取各工作流全局前沿上的设计")
+    p_best.add_argument('--max-cost', type=float, default=None)
+    p_best.add_argument('--max-moment', type=float, default=None)
+    p_best.add_argument('--min-stiffness', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    with Catalog(args.db) as cat:
+        if args.command == 'import':
+            case = None
+            if args.l_span is not None or args.b_top is not None:
+                case = replace(DEFAULT_CASE, l_span=args.l_span if args.l_span is not None else DEFAULT_CASE.l_span,
+                               b_top=args.b_top if args.b_top is not None else DEFAULT_CASE.b_top)
+            for path in args.paths:
+                found = cat.import_tree(path, case)
+                for output_dir, campaign_id in found:
+                    print(f"  campaign {campaign_id}: {output_dir}", file=sys.stderr)
+                if not found:
+                    print(f"  未找到输出目录: {path}", file=sys.stderr)
+        elif args.command == 'campaigns':
+            _write_rows(cat.campaigns())
+        elif args.command == 'runs':
+            _write_rows(cat.runs(args.algo, args.campaign))
+        else:
+            rows = cat.best(args.objective, args.k, span=args.span, b_top=args.b_top, algorithm=args.algo,
+                            campaign=args.campaign, global_only=args.global_only, max_cost=args.max_cost,
+                            max_moment=args.max_moment, min_stiffness=args.min_stiffness)
+            print(f"匹配 {len(rows)} 个设计", file=sys.stderr)
+            _write_rows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+多节点评估: 协调进程 (Coordinator) 监听 TCP 端口, 各节点上的工作进程主动连接并领取任务。
+
+两类任务:
+- eval: 一批候选基因矩阵 (n, 20) -> 目标 (n, 3) 与惩罚值 (n,)。Coordinator.evaluate_candidates 与
+  algorithms.ask_tell.evaluate_candidates 签名相同, 作为 drive() 的 evaluate 传入后,
+  每代候选按工作进程数拆分为若干任务并行评估, 按原顺序拼回
+- job:  整次 (工况, 算法, 运行) 作业, 由工作进程调用 sweep._run_job 运行, 返回可行解的目标与解码变量
+
+消息格式 (两个方向相同, 网络字节序):
+    [u32 头部长度][u32 数组个数][JSON 头部][u64 数组长度][.npy 数据] ...
+数组以 NumPy .npy 格式传输 (allow_pickle=False, 不反序列化任何对象)。
+工作进程执行任务期间每 CLUSTER_HEARTBEAT 秒发送一次心跳; 协调进程超过 CLUSTER_TIMEOUT 秒
+收不到心跳或结果 (或连接断开) 即视为失联, 其任务放回队列由其他工作进程重新执行。
+评估是基因的确定性函数, 作业自带随机种子, 因此结果与单机执行逐位一致 (与任务落在哪个工作进程无关)。
+
+远程评估不附带 EvaluationRecord, 阶段一逐解核查时在协调进程中重新计算 (结果相同)。
+
+用法:
+    python cluster.py worker 10.0.0.5:8766 --procs 8          # 每个计算节点
+    python main.py run --cluster 0.0.0.0:8766 --cluster-workers 16
+    python cluster.py sweep --listen 0.0.0.0:8766 --workers 16
+"""
+import argparse
+import io
+import itertools
+import json
+import multiprocessing as mp
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+from case_config import *
+
+_PREFIX = struct.Struct('!II')
+_LENGTH = struct.Struct('!Q')
+
+
+# ---------- 消息 ----------
+def send_message(sock, header, arrays=()):
+    """发送一条消息: JSON 头部 + 若干 NumPy 数组。"""
+    body = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    parts = [_PREFIX.pack(len(body), len(arrays)), body]
+    for a in arrays:
+        buf = io.BytesIO()
+        np.lib.format.write_array(buf, np.ascontiguousarray(a), allow_pickle=False)
+        data = buf.getvalue()
+        parts += [_LENGTH.pack(len(data)), data]
+    sock.sendall(b''.join(parts))
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if k == 0:
+            raise ConnectionError("连接已关闭")
+        got += k
+    return buf
+
+
+def recv_message(sock):
+    """接收一条消息, 返回 (header, arrays)。连接关闭时抛出 ConnectionError。"""
+    size, count = _PREFIX.unpack(_recv_exact(sock, _PREFIX.size))
+    header = json.loads(_recv_exact(sock, size))
+    arrays = []
+    for _ in range(count):
+        (n,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+        arrays.append(np.lib.format.read_array(io.BytesIO(_recv_exact(sock, n)), allow_pickle=False))
+    return header, arrays
+
+
+def parse_address(text, host=CLUSTER_HOST, port=CLUSTER_PORT):
+    """'host:port' / 'host' / ':port' -> (host, port)。"""
+    h, sep, p = (text or '').rpartition(':')
+    if not sep:
+        h, p = text, ''
+    return h or host, int(p) if p else port
+
+
+def _case_overrides(case):
+    from sweep import case_overrides
+    return case_overrides(case)
+
+
+# ---------- 协调进程 ----------
+class RemoteError(RuntimeError):
+    """工作进程执行任务时抛出异常 (确定性错误, 不重新提交)。"""
+
+
+class Coordinator:
+    """
+    监听 address, 接受工作进程连接。每个连接由一个线程服务: 从共享队列取任务、发送、
+    等待结果 (期间只收到心跳); 失联时任务放回队首。所有工作进程都失联时任务留在队列中,
+    等待新的工作进程连接后继续。
+    """
+    def __init__(self, address=None, token=CLUSTER_TOKEN, timeout=CLUSTER_TIMEOUT, chunk=CLUSTER_CHUNK):
+        self.token = token
+        self.timeout = timeout
+        self.chunk = chunk
+        self._server = socket.create_server(parse_address(address))
+        self.address = self._server.getsockname()[:2]
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._results = {}
+        self._ids = itertools.count()
+        self._workers = {}
+        self._closed = False
+        self.resubmitted = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def n_workers(self):
+        with self._cond:
+            return len(self._workers)
+
+    def workers(self):
+        """[(工作进程名, 已完成任务数), ...]"""
+        with self._cond:
+            return sorted(self._workers.items())
+
+    def wait_for_workers(self, n=1, timeout=None):
+        """等待至少 n 个工作进程连接; 超时返回 False。"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while len(self._workers) < n:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self):
+        """通知全部工作进程退出并停止监听。"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            # 等待服务线程发出 shutdown (空闲的工作进程随即退出)
+            deadline = time.time() + 1.0
+            while self._workers and time.time() < deadline:
+                self._cond.wait(deadline - time.time())
+        self._server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, addr = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn, addr), daemon=True).start()
+
+    def _serve(self, conn, addr):
+        conn.settimeout(self.timeout)
+        try:
+            hello, _ = recv_message(conn)
+        except (OSError, ValueError, struct.error):
+            conn.close()
+            return
+        if hello.get('type') != 'hello' or (self.token is not None and hello.get('token') != self.token):
+            print(f"拒绝连接: {addr[0]}:{addr[1]} (口令不符)", file=sys.stderr)
+            conn.close()
+            return
+        name = f"{hello.get('host', addr[0])}:{hello.get('pid', addr[1])}"
+        with self._cond:
+            self._workers[name] = 0
+            self._cond.notify_all()
+
+        task = None
+        try:
+            while True:
+                with self._cond:
+                    while not self._queue and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        send_message(conn, {'type': 'shutdown'})
+                        break
+                    task = self._queue.popleft()
+                send_message(conn, task[1], task[2])
+                header, arrays = recv_message(conn)
+                while header.get('type') == 'heartbeat':
+                    header, arrays = recv_message(conn)
+                with self._cond:
+                    self._results[task[0]] = (name, header, arrays)
+                    self._workers[name] += 1
+                    task = None
+                    self._cond.notify_all()
+        except (OSError, ValueError, struct.error) as e:
+            print(f"工作进程 {name} 失联 ({type(e).__name__})"
+                  + (", 任务重新提交" if task is not None else ""), file=sys.stderr)
+        finally:
+            with self._cond:
+                if task is not None:
+                    self._queue.appendleft(task)
+                    self.resubmitted += 1
+                self._workers.pop(name, None)
+                self._cond.notify_all()
+            conn.close()
+
+    def _submit(self, tasks):
+        ids = []
+        with self._cond:
+            for header, arrays in tasks:
+                task_id = next(self._ids)
+                self._queue.append((task_id, dict(header, task=task_id), list(arrays)))
+                ids.append(task_id)
+            self._cond.notify_all()
+        return ids
+
+    def _collect(self, ids):
+        """逐个返回已完成的 (header, arrays), 按完成顺序。"""
+        pending = set(ids)
+        while pending:
+            with self._cond:
+                done = [t for t in pending if t in self._results]
+                while not done:
+                    self._cond.wait()
+                    done = [t for t in pending if t in self._results]
+                finished = [(t, self._results.pop(t)) for t in done]
+            for task_id, (name, header, arrays) in finished:
+                pending.discard(task_id)
+                if header.get('type') == 'error':
+                    raise RemoteError(f"工作进程 {name} 执行任务失败:\n{header.get('error', '')}")
+                yield task_id, header, arrays
+
+    def map(self, tasks):
+        """执行 [(header, arrays), ...], 按提交顺序返回 [(header, arrays), ...]。"""
+        ids = self._submit(tasks)
+        results = {task_id: (header, arrays) for task_id, header, arrays in self._collect(ids)}
+        return [results[t] for t in ids]
+
+    def imap_unordered(self, tasks):
+        """执行 [(header, arrays), ...], 按完成顺序逐个返回 (header, arrays)。"""
+        for _, header, arrays in self._collect(self._submit(tasks)):
+            yield header, arrays
+
+    def evaluate_candidates(self, X, case=DEFAULT_CASE, budget=None, records=False):
+        """
+        algorithms.ask_tell.evaluate_candidates 的远程版本: 候选按行拆分给各工作进程, 结果按原顺序拼回。
+        设置 max_evals 时只发送预算内的前缀; records=True 时记录为 None (核查时在本地重新计算)。
+        """
+        from algorithms.ask_tell import fitness_values
+        X = np.asarray(X, dtype=float).reshape(-1, NDIM)
+        n = len(X)
+        if budget is not None:
+            if budget.exhausted():
+                n = 0
+            elif budget.max_evals is not None:
+                n = min(n, budget.max_evals - budget.evals)
+        objectives, penalties = np.empty((0, 3)), np.empty(0)
+        if n > 0:
+            size = max(self.chunk, -(-n // max(self.n_workers, 1)))
+            header = {'type': 'eval', 'case': _case_overrides(case)}
+            parts = self.map([(header, [X[i:i + size]]) for i in range(0, n, size)])
+            objectives = np.vstack([arrays[0] for _, arrays in parts])
+            penalties = np.concatenate([arrays[1] for _, arrays in parts])
+
+        k = len(penalties)
+        if budget is not None:
+            for i, fit in enumerate(fitness_values(objectives.tolist(), penalties.tolist())):
+                if budget.exhausted():
+                    k = i
+                    break
+                budget.record(fit)
+        result = (objectives[:k], penalties[:k])
+        return result + (None,) if records else result
+
+
+def remote_jobs(coordinator, jobs):
+    """
+    sweep 作业 [(工况序号, 工况, 算法, 运行, 种子), ...] 交给工作进程执行,
+    按完成顺序返回与 sweep._run_job 相同结构的结果字典。
+    """
+    tasks = [({'type': 'job', 'case_idx': case_idx, 'case': _case_overrides(case),
+               'algorithm': name, 'run': run, 'seed': seed}, [])
+             for case_idx, case, name, run, seed in jobs]
+    for header, (objectives, decoded) in coordinator.imap_unordered(tasks):
+        feasible = []
+        for idx, obj, dec in zip(header['solution_idx'], objectives.tolist(), decoded.tolist()):
+            for j in INT_GENES:
+                dec[j] = int(dec[j])
+            feasible.append({'algorithm': header['algorithm'], 'run': header['run'], 'solution_idx': idx,
+                             'objectives': tuple(obj), 'decoded': dec})
+        yield {'case_idx': header['case_idx'], 'algorithm': header['algorithm'], 'run': header['run'],
+               'time': header['time'], 'pop_size': header['pop_size'], 'feasible': feasible}
+
+
+# ---------- 工作进程 ----------
+def _handle_eval(header, arrays):
+    from algorithms.ask_tell import evaluate_candidates
+    objectives, penalties = evaluate_candidates(arrays[0], make_case(header['case']))
+    return {}, [objectives, penalties]
+
+
+def _handle_job(header, arrays):
+    from sweep import _run_job
+    res = _run_job((header['case_idx'], make_case(header['case']), header['algorithm'],
+                    header['run'], header['seed']))
+    feasible = res['feasible']
+    reply = {k: res[k] for k in ('case_idx', 'algorithm', 'run', 'time', 'pop_size')}
+    reply['solution_idx'] = [r['solution_idx'] for r in feasible]
+    return reply, [np.array([r['objectives'] for r in feasible], dtype=float).reshape(-1, 3),
+                   np.array([r['decoded'] for r in feasible], dtype=float).reshape(-1, NDIM)]
+
+
+HANDLERS = {'eval': _handle_eval, 'job': _handle_job}
+
+
+def _connect(address, wait):
+    deadline = time.time() + wait
+    while True:
+        try:
+            return socket.create_connection(address)
+        except OSError:
+            if time.time() >= deadline:
+                raise
+            time.sleep(0.5)
+
+
+def run_worker(address, token=CLUSTER_TOKEN, heartbeat=CLUSTER_HEARTBEAT, wait=CLUSTER_TIMEOUT):
+    """
+    连接协调进程并循环执行任务, 直到收到 shutdown 或连接断开。返回完成的任务数。
+    wait 秒内协调进程尚未启动时重试连接。
+    """
+    sock = _connect(parse_address(address), wait)
+    lock = threading.Lock()
+    busy = threading.Event()
+    stop = threading.Event()
+
+    def beat():
+        # 只在执行任务期间发送心跳, 空闲时协调进程不读取该连接
+        while not stop.wait(heartbeat):
+            with lock:
+                if busy.is_set():
+                    try:
+                        send_message(sock, {'type': 'heartbeat'})
+                    except OSError:
+                        return
+
+    send_message(sock, {'type': 'hello', 'host': socket.gethostname(), 'pid': os.getpid(), 'token': token})
+    threading.Thread(target=beat, daemon=True).start()
+    done = 0
+    try:
+        while True:
+            try:
+                header, arrays = recv_message(sock)
+            except (ConnectionError, OSError):
+                break
+            kind = header.get('type')
+            if kind == 'shutdown':
+                break
+            busy.set()
+            try:
+                reply, out = HANDLERS[kind](header, arrays)
+                reply = dict(reply, type='result', task=header.get('task'))
+            except Exception:
+                reply, out = {'type': 'error', 'task': header.get('task'), 'error': traceback.format_exc()}, []
+            with lock:
+                busy.clear()
+                send_message(sock, reply, out)
+            done += 1
+    finally:
+        stop.set()
+        sock.close()
+    return done
+
+
+def _worker_process(address, token, heartbeat, wait):
+    done = run_worker(address, token, heartbeat, wait)
+    print(f"工作进程 {os.getpid()} 退出, 完成任务 {done} 个", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多节点评估: 工作进程 / 分布式参数扫描")
+    parser.add_argument('--token', default=CLUSTER_TOKEN, help="连接口令")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_worker = sub.add_parser('worker', help="连接协调进程并执行任务")
+    p_worker.add_argument('address', help="协调进程地址 host:port")
+    p_worker.add_argument('--procs', type=int, default=1, help="本节点启动的工作进程数")
+    p_worker.add_argument('--heartbeat', type=float, default=CLUSTER_HEARTBEAT, help="心跳间隔 (s)")
+    p_worker.add_argument('--wait', type=float, default=CLUSTER_TIMEOUT, help="协调进程未启动时的重试时长 (s)")
+
+    p_sweep = sub.add_parser('sweep', help="参数扫描 (sweep.py), 作业分发给工作进程")
+    p_sweep.add_argument('--listen', default=f"{CLUSTER_HOST}:{CLUSTER_PORT}", help="监听地址 host:port")
+    p_sweep.add_argument('--workers', type=int, default=1, help="开始前等待连接的工作进程数")
+    p_sweep.add_argument('--runs', type=int, default=SWEEP_RUNS, help="每个算法的运行次数")
+    p_sweep.add_argument('--output-root', default=None, help="输出根目录 (默认 outputs/sweep_results_N)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        procs = [mp.Process(target=_worker_process, args=(args.address, args.token, args.heartbeat, args.wait))
+                 for _ in range(max(args.procs, 1))]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    else:
+        from sweep import run_sweep
+        with Coordinator(args.listen, token=args.token) as coordinator:
+            print(f"协调进程监听 {coordinator.address[0]}:{coordinator.address[1]}, "
+                  f"等待 {args.workers} 个工作进程...")
+            coordinator.wait_for_workers(args.workers)
+            run_sweep(n_runs=args.runs, output_root=args.output_root, cluster=coordinator)
+            print(f"工作进程: {coordinator.n_workers} 个在线, 重新提交任务 {coordinator.resubmitted} 次")
+
+
+if __name__ == "__main__":
+    main()
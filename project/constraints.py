@@ -2,12 +2,14 @@ import numpy as np
 from case_config import *
 from objectives import decode_variables, SectionProperties, calculate_objectives
 
-def check_constraints(x_continuous, debug=False, return_details=False):
+def constraint_terms(x_continuous, case=DEFAULT_CASE, ec_scale=1.0):
     """
-    检查约束，返回总惩罚值。
-    如果满足所有约束，返回 0。
+    计算各约束涉及的截面量与限值 (不做判断)。
+    只含算术运算, 连续基因可以是等长数组 (离散基因为标量), 用于批量求约束裕度。
+    ec_scale 同 calculate_objectives (Ec 的倍数)。
     """
-    params = decode_variables(x_continuous)
+    params = decode_variables(x_continuous, case)
+    i_fc, _, _, _ = case.discrete_index(x_continuous)
     sec = SectionProperties(params[:12])
 
     h = params[2]
@@ -24,15 +26,15 @@ def check_constraints(x_continuous, debug=False, return_details=False):
     sr_assumed = 0.15
 
     theta = np.arctan(sec.p_slope) + np.pi / 2.0
-    rho_c = fc + 2320
+    rho_c = case.rho_c_table[i_fc]
     lr = (sec.ltop + sec.lbot + (4 * sec.h) / np.sin(np.pi - theta)) * (2 * sec.l_seg / sr_assumed)
 
     rho_r = 6170 * (dr / 1000.0)
-    n_segments = L_SPAN / sec.l_seg
+    n_segments = case.l_span / sec.l_seg
     mr = n_segments * lr * rho_r
 
     rho_p = 6170 * (dp / 1000.0)
-    mp = (npb + npw) * L_SPAN * rho_p
+    mp = (npb + npw) * case.l_span * rho_p
 
     A_chamfers = sec.x1 * sec.y1 + sec.x2 * sec.y1 + sec.x3 * sec.y2
     A = sec.ltop * sec.ttop + sec.lbot * sec.tbot + 2 * sec.tw * (sec.h - sec.ttop - sec.tbot) / np.sin(np.pi - theta) + A_chamfers
@@ -42,13 +44,142 @@ def check_constraints(x_continuous, debug=False, return_details=False):
     denominator = 2 * (Ac - A_chamfers) * np.sin(np.pi - theta)
     h0 = numerator / (denominator + 1e-12)
 
-    mc = rho_c * Ac * L_SPAN
-    Mu = (mc + mr + mp) * G * L_SPAN
+    mc = rho_c * Ac * case.l_span
+    Mu = (mc + mr + mp) * G * case.l_span
 
     hp_val = hp_ratio * sec.h
     term_p = 0.25 * np.pi * (dp / 1000.0) ** 2 * (sigma * 1e6)
     Mp = term_p * (npb * h0 + npw * (h0 - hp_val))
 
+    # Eq(24) 宽度比例 / Eq(25) 高跨比 (ns=3) / Eq(29) 预应力弯矩平衡
+    lower_width = 0.6 * sec.ltop
+    upper_width = 0.8 * sec.ltop
+    limit_h_min = case.l_span / (20.0 * 3)
+    limit_h_max = case.l_span / (15.0 * 3)
+    limit_Mp = 0.5 * (case.alpha * Mu - (-0.338 * Mu))
+
+    # Eq(28) 挠度 (k_def 与限值 L / deflection_ratio 取自工况)
+    k_def = case.k_def
+    alpha_s = 0.95
+
+    # 与 objectives.py 一致：Eq(19) 等效模量 E
+    Ec = case.ec_table[i_fc] * ec_scale
+    Er = 2.0e11
+    Ar_single = 0.25 * np.pi * (dr / 1000.0) ** 2
+    E_val = (Ec * Ac + Er * Ar_single * (lr / (2 * sec.l_seg))) / (A + 1e-12)
+
+    # 与 objectives.py 一致：Eq(21) 惯性矩 Iz（基于 h0）
+    I_top = (sec.ltop * sec.ttop ** 3) / 12.0 + sec.ltop * sec.ttop * (sec.h - h0 - 0.5 * sec.ttop) ** 2
+    I_bot = (sec.lbot * sec.tbot ** 3) / 12.0 + sec.lbot * sec.tbot * (h0 - 0.5 * sec.tbot) ** 2
+    h_web_actual = sec.h - sec.ttop - sec.tbot
+    sin_val = np.sin(np.pi - theta)
+    I_web = (1.0 / 12.0) * (2 * sec.tw / sin_val) * (h_web_actual ** 3) + \
+        (2 * sec.tw / sin_val) * h_web_actual * (h0 - 0.5 * (sec.h - sec.ttop + sec.tbot)) ** 2
+    Iz = I_top + I_bot + I_web
+
+    # Eq(22): 刚度 S
+    S_curr = alpha_s * E_val * Iz
+    Mmax_pos = case.alpha * Mu
+
+    deflection = k_def * Mmax_pos * case.l_span ** 2 / (S_curr + 1e-12)
+    limit_deflection = case.l_span / case.deflection_ratio
+
+    return {
+        'fc': fc,
+        'fy': fy,
+        'ltop': sec.ltop,
+        'lbot': sec.lbot,
+        'eq24_lower': lower_width,
+        'eq24_upper': upper_width,
+        'h': h,
+        'eq25_h_min': limit_h_min,
+        'eq25_h_max': limit_h_max,
+        'x1_y1': sec.x1 / sec.y1,
+        'x2_y1': sec.x2 / sec.y1,
+        'x3_y2': sec.x3 / sec.y2,
+        'Mp': Mp,
+        'eq29_limit_Mp': limit_Mp,
+        'deflection': deflection,
+        'eq28_limit_deflection': limit_deflection,
+        'Mu': Mu,
+        'Mmax_pos': Mmax_pos,
+        'S_curr': S_curr,
+        'A': A,
+        'Ac': Ac,
+        'h0': h0,
+    }
+
+
+# 连续约束裕度的名称 (constraint_margins 的行顺序), 裕度 >= 0 表示满足
+MARGIN_NAMES = [
+    'Eq24_lower', 'Eq24_upper', 'Eq25_lower', 'Eq25_upper',
+    'Eq26_x1y1_lower', 'Eq26_x1y1_upper', 'Eq26_x2y1_lower', 'Eq26_x2y1_upper',
+    'Eq26_x3y2_lower', 'Eq26_x3y2_upper', 'Eq29', 'Eq28',
+]
+
+
+def constraint_margins(x_continuous, case=DEFAULT_CASE):
+    """
+    各连续约束的归一化裕度 (>= 0 为满足), 按 MARGIN_NAMES 顺序堆叠。
+    连续基因为数组时返回 (len(MARGIN_NAMES), N) 数组; 材料约束只与离散基因有关, 不在其中。
+    """
+    t = constraint_terms(x_continuous, case)
+    return np.array([
+        (t['lbot'] - t['eq24_lower']) / t['ltop'],
+        (t['eq24_upper'] - t['lbot']) / t['ltop'],
+        (t['h'] - t['eq25_h_min']) / t['eq25_h_max'],
+        (t['eq25_h_max'] - t['h']) / t['eq25_h_max'],
+        t['x1_y1'] - 1.0, 1.5 - t['x1_y1'],
+        t['x2_y1'] - 1.0, 1.5 - t['x2_y1'],
+        t['x3_y2'] - 1.0, 1.5 - t['x3_y2'],
+        (t['eq29_limit_Mp'] - t['Mp']) / np.abs(t['eq29_limit_Mp']),
+        (t['eq28_limit_deflection'] - t['deflection']) / t['eq28_limit_deflection'],
+    ])
+
+
+# 约束组的判断标志名称 (check_constraints 的 details 键, 顺序即惩罚累加顺序), True 表示满足
+FLAG_NAMES = [
+    'Eq24_width_ok', 'Eq25_height_ok', 'Eq26_chamfer_ok',
+    'Eq29_moment_balance_ok', 'Eq28_deflection_ok',
+    'Material_fc_ok', 'Material_fy_ok',
+]
+
+
+def constraint_flags(terms):
+    """
+    由 constraint_terms 的结果判断各约束组是否满足, 返回 {FLAG_NAMES 中的名称: 标志}。
+    判断与 check_constraints 逐项一致, 但只含逐元素比较, terms 为数组时返回等长布尔数组
+    (check_constraints 位于每次评估的热路径上, 保留其标量写法)。
+    """
+    def within(v, lo, hi):
+        return (lo <= v) & (v <= hi)
+
+    return {
+        # 1. Eq(24) 宽度比例约束
+        'Eq24_width_ok': within(terms['lbot'], terms['eq24_lower'], terms['eq24_upper']),
+        # 2. Eq(25) 高跨比约束 (ns=3)
+        'Eq25_height_ok': within(terms['h'], terms['eq25_h_min'], terms['eq25_h_max']),
+        # 3. Eq(26) 倒角比例约束
+        'Eq26_chamfer_ok': within(terms['x1_y1'], 1.0, 1.5) & within(terms['x2_y1'], 1.0, 1.5)
+                           & within(terms['x3_y2'], 1.0, 1.5),
+        # 4. Eq(29) 预应力弯矩平衡约束
+        'Eq29_moment_balance_ok': ~(terms['Mp'] > terms['eq29_limit_Mp']),
+        # 5. Eq(28) 挠度约束
+        'Eq28_deflection_ok': ~(terms['deflection'] > terms['eq28_limit_deflection']),
+        # 保留原有材料性能约束
+        'Material_fc_ok': ~(terms['fc'] < 40),
+        'Material_fy_ok': ~(terms['fy'] < 235),
+    }
+
+
+def check_constraints(x_continuous, debug=False, return_details=False, case=DEFAULT_CASE):
+    """
+    检查约束，返回总惩罚值。
+    如果满足所有约束，返回 0。
+    """
+    terms = constraint_terms(x_continuous, case)
+    fc, fy, h = terms['fc'], terms['fy'], terms['h']
+
     penalties = 0.0
     details = {
         'Eq24_width_ok': True,
@@ -61,120 +192,124 @@ def check_constraints(x_continuous, debug=False, return_details=False):
     }
 
     # 1. Eq(24) 宽度比例约束
-    lower_width = 0.6 * sec.ltop
-    upper_width = 0.8 * sec.ltop
-    if not (lower_width <= sec.lbot <= upper_width):
+    lower_width = terms['eq24_lower']
+    upper_width = terms['eq24_upper']
+    if not (lower_width <= terms['lbot'] <= upper_width):
         if debug:
-            print(f"FAIL: Eq(24) width ratio. ltop={sec.ltop:.3f}, lbot={sec.lbot:.3f}")
+            print(f"FAIL: Eq(24) width ratio. ltop={terms['ltop']:.3f}, lbot={terms['lbot']:.3f}")
         details['Eq24_width_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
 
     # 2. Eq(25) 高跨比约束 (ns=3)
-    limit_h_min = L_SPAN / (20.0 * 3)
-    limit_h_max = L_SPAN / (15.0 * 3)
+    limit_h_min = terms['eq25_h_min']
+    limit_h_max = terms['eq25_h_max']
     if not (limit_h_min <= h <= limit_h_max):
         if debug:
             print(f"FAIL: Eq(25) h/span. h={h:.3f}, range=[{limit_h_min:.3f}, {limit_h_max:.3f}]")
         details['Eq25_height_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
 
     # 3. Eq(26) 倒角比例约束
-    ratio_ok = (1.0 <= sec.x1 / sec.y1 <= 1.5) and (1.0 <= sec.x2 / sec.y1 <= 1.5) and (1.0 <= sec.x3 / sec.y2 <= 1.5)
+    ratio_ok = (1.0 <= terms['x1_y1'] <= 1.5) and (1.0 <= terms['x2_y1'] <= 1.5) and (1.0 <= terms['x3_y2'] <= 1.5)
     if not ratio_ok:
         if debug:
             print("FAIL: Eq(26) chamfer ratio out of [1.0, 1.5]")
         details['Eq26_chamfer_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
 
     # 4. Eq(29) 预应力弯矩平衡约束
-    limit_Mp = 0.5 * (0.514 * Mu - (-0.338 * Mu))
+    Mp, limit_Mp = terms['Mp'], terms['eq29_limit_Mp']
     if Mp > limit_Mp:
         if debug:
             print(f"FAIL: Eq(29) Mp balance. Mp={Mp:.3e}, limit={limit_Mp:.3e}")
         details['Eq29_moment_balance_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
 
     # 5. Eq(28) 挠度约束
-    # 修改：将 k_def 设为更小量级，缓解 Mu=m*g*L 带来的大数值引起的系统性超限
-    k_def = 1e-4
-    alpha_s = 0.95
-
-    # 与 objectives.py 一致：Eq(19) 等效模量 E
-    Ec = (-4.375 * fc ** 2 + 612.5 * fc + 15000) * 1e6
-    Er = 2.0e11
-    Ar_single = 0.25 * np.pi * (dr / 1000.0) ** 2
-    E_val = (Ec * Ac + Er * Ar_single * (lr / (2 * sec.l_seg))) / (A + 1e-12)
-
-    # 与 objectives.py 一致：Eq(21) 惯性矩 Iz（基于 h0）
-    I_top = (sec.ltop * sec.ttop ** 3) / 12.0 + sec.ltop * sec.ttop * (sec.h - h0 - 0.5 * sec.ttop) ** 2
-    I_bot = (sec.lbot * sec.tbot ** 3) / 12.0 + sec.lbot * sec.tbot * (h0 - 0.5 * sec.tbot) ** 2
-    h_web_actual = sec.h - sec.ttop - sec.tbot
-    sin_val = np.sin(np.pi - theta)
-    I_web = (1.0 / 12.0) * (2 * sec.tw / sin_val) * (h_web_actual ** 3) + \
-        (2 * sec.tw / sin_val) * h_web_actual * (h0 - 0.5 * (sec.h - sec.ttop + sec.tbot)) ** 2
-    Iz = I_top + I_bot + I_web
-
-    # Eq(22): 刚度 S
-    S_curr = alpha_s * E_val * Iz
-    Mmax_pos = 0.514 * Mu
-
-    deflection = k_def * Mmax_pos * L_SPAN ** 2 / (S_curr + 1e-12)
-    limit_deflection = L_SPAN / 800.0
+    deflection, limit_deflection = terms['deflection'], terms['eq28_limit_deflection']
     if deflection > limit_deflection:
         if debug:
             print(f"FAIL: Eq(28) deflection. delta={deflection:.6f}, limit={limit_deflection:.6f}")
         details['Eq28_deflection_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
 
     # 保留原有材料性能约束
     if fc < 40:
         if debug:
             print(f"FAIL: material fc >= 40. fc={fc}")
         details['Material_fc_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
     if fy < 235:
         if debug:
             print(f"FAIL: material fy >= 235. fy={fy}")
         details['Material_fy_ok'] = False
-        penalties += PENALTY_VALUE
+        penalties += case.penalty_value
 
     details.update({
         'penalty_total': penalties,
         'is_feasible': penalties == 0,
-        'ltop': sec.ltop,
-        'lbot': sec.lbot,
-        'eq24_lower': lower_width,
-        'eq24_upper': upper_width,
-        'h': h,
-        'eq25_h_min': limit_h_min,
-        'eq25_h_max': limit_h_max,
-        'x1_y1': sec.x1 / sec.y1,
-        'x2_y1': sec.x2 / sec.y1,
-        'x3_y2': sec.x3 / sec.y2,
-        'Mp': Mp,
-        'eq29_limit_Mp': limit_Mp,
-        'deflection': deflection,
-        'eq28_limit_deflection': limit_deflection,
-        'Mu': Mu,
-        'Mmax_pos': Mmax_pos,
-        'S_curr': S_curr,
-        'A': A,
-        'Ac': Ac,
-        'h0': h0,
     })
+    details.update({k: v for k, v in terms.items() if k not in ('fc', 'fy')})
 
     if return_details:
         return penalties, details
     return penalties
 
-def evaluate(x_continuous):
+class EvaluationRecord:
+    """
+    单次评估的明细: 基因、惩罚值、约束明细 (check_constraints 的 details)、目标 (c, m, s) 与解码变量。
+    解码变量在首次读取时才计算 (多数个体在评估后即被淘汰)。
+    创建后不再修改; 复制个体 (toolbox.clone) 时共享同一记录, 不做深拷贝。
+    """
+    __slots__ = ('genes', 'penalty', 'details', 'objectives', 'case', '_decoded')
+
+    def __init__(self, genes, penalty, details, objectives, case=DEFAULT_CASE):
+        self.genes = genes
+        self.penalty = penalty
+        self.details = details
+        self.objectives = objectives
+        self.case = case
+        self._decoded = None
+
+    @property
+    def decoded(self):
+        if self._decoded is None:
+            self._decoded = decode_variables(self.genes, self.case)
+        return self._decoded
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def matches(self, x):
+        """记录是否对应基因 x (个体在评估后被修改时不再对应)。"""
+        return self.genes == tuple(x)
+
+
+def evaluation_record(x_continuous, case=DEFAULT_CASE):
+    """完整评估一次, 返回 EvaluationRecord。惩罚值与目标同 check_constraints / calculate_objectives。"""
+    penalty, details = check_constraints(x_continuous, return_details=True, case=case)
+    return EvaluationRecord(tuple(x_continuous), penalty, details, calculate_objectives(x_continuous, case), case)
+
+
+def evaluation_of(ind, case=DEFAULT_CASE):
+    """个体上附带的评估记录; 没有记录或记录已不对应当前基因时重新计算。"""
+    rec = getattr(ind, 'evaluation', None)
+    if rec is None or not rec.matches(ind):
+        rec = evaluation_record(ind, case)
+    return rec
+
+
+def evaluate(x_continuous, case=DEFAULT_CASE):
     """
     DEAP 评估函数包装器
     """
-    penalty = check_constraints(x_continuous)
+    penalty = check_constraints(x_continuous, case=case)
 
     # 获取真实的物理目标值
-    c, m, s = calculate_objectives(x_continuous)
+    c, m, s = calculate_objectives(x_continuous, case)
 
     if penalty > 0:
         # 使用可微分的叠加惩罚，保留“越接近可行域越优”的相对信息
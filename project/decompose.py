@@ -0,0 +1,313 @@
+"""
+离散组合分解求解。
+
+离散基因只有 len(VAL_FC) x len(VAL_FY) x len(VAL_NPB) x len(VAL_NPW) 个组合 (默认 675)。
+本模块逐个枚举组合, 固定离散基因后对 16 个连续基因做向量化的子优化
+(DE/rand/1/bin 变异 + 可行优先的非支配排序与拥挤度选择, 每代一次批量评估),
+再合并各组合的子前沿得到全局前沿。
+
+剪枝分两步:
+1. 精确剪枝: fy 只通过钢筋单价 cr / cp 进入目标 (约束中只有 fy >= 235)。
+   若另一 fy 档位满足材料约束且两项单价都不高 (至少一项更低), 则对任意连续基因,
+   该组合造价更高而弯矩、刚度与可行性完全相同, 不可能贡献前沿。
+2. 界剪枝: 用 DECOMP_PROBE 个探测样本 (忽略约束) 估计每个组合的乐观界
+   (造价/弯矩最小值、刚度最大值构成的理想点, 再按 DECOMP_BOUND_SLACK 放宽)。
+   组合按乐观界由好到差提交, 若某组合的乐观界已被当前全局前沿支配则跳过。
+   乐观界由抽样估计, 不是严格下界; slack 越大越保守。
+
+子优化在进程池中执行。第 i 个组合的剪枝判断只使用提交顺序上前 i - DECOMP_LAG 个组合合并出的前沿
+(串行执行时同样滞后), 因此在途组合数不超过 DECOMP_LAG + 1, 剪枝判断与结果只取决于随机种子与 lag,
+与进程数无关。lag 应不小于 2 倍进程数, 否则进程池吃不满。
+
+用法:
+    python decompose.py -o outputs/decomposition
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from case_config import *
+from constraints import check_constraints
+from objectives import decode_matrix
+from results_store import ResultStore, pareto_mask, crowding_distance
+from sampling import unit_samples
+from algorithms.refine import CONT_GENES, batch_objectives
+
+ALGORITHM_NAME = 'Decomposition'
+FRONT_FILE = "pareto_front_decomposition.csv"
+SUMMARY_FILE = "decomposition_summary.csv"
+SUMMARY_HEADER = ['fc', 'fy', 'npb', 'npw', 'Status', 'Evaluations', 'SubFrontSize', 'InGlobalFront',
+                  'IdealCost', 'IdealMoment', 'IdealStiffness']
+
+
+def material_feasible(combo, case=DEFAULT_CASE):
+    """材料约束 (fc >= 40, fy >= 235) 只与离散基因有关, 不满足的组合无需求解。"""
+    return case.val_fc[combo[0]] >= 40 and case.val_fy[combo[1]] >= 235
+
+
+def price_dominated(combo, case=DEFAULT_CASE):
+    """是否存在另一满足材料约束的 fy 档位, 其 cr / cp 都不高于本档位且至少一项更低 (见模块说明)。"""
+    i = combo[1]
+    cr, cp = case.cr_table, case.cp_table
+    return any(case.val_fy[j] >= 235 and cr[j] <= cr[i] and cp[j] <= cp[i] and (cr[j] < cr[i] or cp[j] < cp[i])
+               for j in range(len(case.val_fy)) if j != i)
+
+
+def combinations(case=DEFAULT_CASE):
+    """全部离散档位组合 (fc, fy, npb, npw 的索引), 按 INT_GENES 顺序。"""
+    return [tuple(c) for c in itertools.product(*(range(n) for n in case.levels))]
+
+
+def _genes(U, combo, case):
+    """连续基因的单位样本 (n, 16) + 离散组合 -> 基因矩阵 (n, 20)。"""
+    low, up = np.array(case.low), np.array(case.up)
+    X = np.empty((len(U), NDIM))
+    X[:, CONT_GENES] = low[CONT_GENES] + U * (up - low)[CONT_GENES]
+    X[:, list(INT_GENES)] = combo
+    return X
+
+
+def _evaluate(X, case):
+    """目标 (c, m, s) 与约束违反量 (负裕度之和, 0 为可行)。"""
+    F, G = batch_objectives(X, case)
+    F[:, 2] = -F[:, 2]
+    return F, np.maximum(0.0, -G).sum(axis=1)
+
+
+def probe_ideal_points(combos, case=DEFAULT_CASE, n_probe=DECOMP_PROBE, slack=DECOMP_BOUND_SLACK, seed=SEED):
+    """
+    每个组合的乐观界 (Cost, Moment, Stiffness)。所有组合共用同一组 Sobol 探测点,
+    一次批量评估; 约束被忽略, 理想点再向有利方向放宽 slack 倍的探测目标范围。
+    """
+    U = unit_samples(n_probe, len(CONT_GENES), 'sobol', np.random.default_rng(seed))
+    X = np.vstack([_genes(U, combo, case) for combo in combos])
+    F, _ = _evaluate(X, case)
+    F = F.reshape(len(combos), n_probe, 3)
+    best = np.stack([F[:, :, 0].min(axis=1), F[:, :, 1].min(axis=1), F[:, :, 2].max(axis=1)], axis=1)
+    span = F.max(axis=1) - F.min(axis=1)
+    return best - slack * span * np.array([1.0, 1.0, -1.0])
+
+
+def dominated_by_front(point, front_F):
+    """point (c, m, s) 是否被前沿中某个点支配。"""
+    if len(front_F) == 0:
+        return False
+    t = front_F * np.array([1.0, 1.0, -1.0])
+    p = point * np.array([1.0, 1.0, -1.0])
+    return bool(((t <= p).all(axis=1) & (t < p).any(axis=1)).any())
+
+
+def _ranks(F):
+    """非支配层号 (0 为第一前沿)。一次计算支配矩阵, 再按被支配计数逐层剥离。"""
+    t = F * np.array([1.0, 1.0, -1.0])
+    a, b = t[:, None, :], t[None, :, :]
+    # 逐目标比较后合并, 比在长度为 3 的末轴上做 all / any 归约快得多
+    no_worse = (a[..., 0] <= b[..., 0]) & (a[..., 1] <= b[..., 1]) & (a[..., 2] <= b[..., 2])
+    better = (a[..., 0] < b[..., 0]) | (a[..., 1] < b[..., 1]) | (a[..., 2] < b[..., 2])
+    dom = (no_worse & better).astype(np.float32)
+    count = dom.sum(axis=0)
+    rank = np.full(len(F), -1)
+    layer = np.flatnonzero(count == 0)
+    r = 0
+    while len(layer):
+        rank[layer] = r
+        count -= dom[layer].sum(axis=0)
+        count[rank >= 0] = -1
+        layer = np.flatnonzero(count == 0)
+        r += 1
+    return rank
+
+
+def _select(F, cv, k):
+    """可行解优先 (按非支配层, 末层按拥挤度), 不足时按违约量补充不可行解。返回行号。"""
+    if len(F) <= k:
+        return np.arange(len(F))
+    feasible = np.flatnonzero(cv <= 0)
+    if len(feasible) < k:
+        infeasible = np.flatnonzero(cv > 0)
+        extra = infeasible[np.argsort(cv[infeasible], kind='stable')[:k - len(feasible)]]
+        return np.concatenate([feasible, extra])
+
+    rank = _ranks(F[feasible])
+    # 最后一个被选入的层: 前面各层全部保留, 该层按拥挤度截断
+    cum = np.cumsum(np.bincount(rank))
+    last = int(np.searchsorted(cum, k))
+    chosen = feasible[rank < last]
+    layer = feasible[rank == last]
+    lo, hi = F[layer].min(axis=0), F[layer].max(axis=0)
+    cd = crowding_distance((F[layer] - lo) / np.where(hi > lo, hi - lo, 1.0))
+    return np.concatenate([chosen, layer[np.argsort(-cd, kind='stable')[:k - len(chosen)]]])
+
+
+def solve_combination(combo, case=DEFAULT_CASE, pop=DECOMP_POP, n_gen=DECOMP_GEN,
+                      F_de=DECOMP_F, CR=DECOMP_CR, seed=SEED):
+    """
+    固定离散组合, 对连续基因做 n_gen 代向量化 DE 子优化。
+    返回 (子前沿基因 (n, 20), 子前沿目标 (n, 3), 评估次数); 无可行解时子前沿为空。
+    """
+    rng = np.random.default_rng([seed, *combo])
+    d = len(CONT_GENES)
+    U = unit_samples(pop, d, 'lhs', rng)
+    F, cv = _evaluate(_genes(U, combo, case), case)
+
+    for _ in range(n_gen):
+        n = len(U)
+        r1, r2, r3 = rng.permutation(n), rng.permutation(n), rng.permutation(n)
+        mutant = np.clip(U[r1] + F_de * (U[r2] - U[r3]), 0.0, 1.0)
+        cross = rng.random((n, d)) < CR
+        cross[np.arange(n), rng.integers(0, d, size=n)] = True
+        trial = np.where(cross, mutant, U)
+        Ft, cvt = _evaluate(_genes(trial, combo, case), case)
+
+        U = np.vstack([U, trial])
+        F = np.vstack([F, Ft])
+        cv = np.concatenate([cv, cvt])
+        keep = _select(F, cv, pop)
+        U, F, cv = U[keep], F[keep], cv[keep]
+
+    feasible = np.flatnonzero(cv <= 0)
+    front = feasible[pareto_mask(F[feasible])]
+    return _genes(U[front], combo, case), F[front], pop * (n_gen + 1)
+
+
+def decompose(case=DEFAULT_CASE, pop=DECOMP_POP, n_gen=DECOMP_GEN, n_probe=DECOMP_PROBE,
+              slack=DECOMP_BOUND_SLACK, seed=SEED, workers=DECOMP_WORKERS, prune=True, lag=DECOMP_LAG):
+    """
+    枚举离散组合求解并合并子前沿。lag 为界剪枝使用的结果滞后 (见模块说明), 结果与 workers 无关。
+    返回 (全局前沿基因 (n, 20), 全局前沿目标 (n, 3), 逐组合记录列表)。
+    """
+    combos = combinations(case)
+    records = {combo: {'status': 'material', 'evaluations': 0, 'sub_front': 0,
+                       'ideal': (np.nan,) * 3} for combo in combos}
+    candidates = []
+    for combo in combos:
+        if not material_feasible(combo, case):
+            continue
+        if prune and price_dominated(combo, case):
+            records[combo]['status'] = 'dominated'
+            continue
+        candidates.append(combo)
+    ideal = probe_ideal_points(candidates, case, n_probe, slack, seed)
+    for combo, point in zip(candidates, ideal):
+        records[combo]['ideal'] = tuple(point)
+        records[combo]['evaluations'] = n_probe
+
+    # 乐观界由好到差: 按探测理想点的归一化坐标之和排序, 尽早得到强的全局前沿
+    lo, hi = ideal.min(axis=0), ideal.max(axis=0)
+    norm = (ideal - lo) / np.where(hi > lo, hi - lo, 1.0)
+    order = np.argsort(norm[:, 0] + norm[:, 1] + (1.0 - norm[:, 2]), kind='stable')
+
+    front_X = np.empty((0, NDIM))
+    front_F = np.empty((0, 3))
+
+    def merge(combo, result):
+        nonlocal front_X, front_F
+        X, F, n_evals = result
+        records[combo]['status'] = 'solved'
+        records[combo]['evaluations'] += n_evals
+        records[combo]['sub_front'] = len(X)
+        front_X = np.vstack([front_X, X])
+        front_F = np.vstack([front_F, F])
+        mask = pareto_mask(front_F)
+        front_X, front_F = front_X[mask], front_F[mask]
+
+    args = (case, pop, n_gen, DECOMP_F, DECOMP_CR, seed)
+    n_proc = workers or mp.cpu_count()
+    pool = mp.Pool(processes=n_proc) if n_proc > 1 else None
+    try:
+        # (提交序号, 组合, 结果); 串行时结果已算出, 但同样按 lag 延后合并, 使剪枝判断与进程数无关
+        in_flight = deque()
+        for i, k in enumerate(order):
+            combo = candidates[k]
+            while in_flight and in_flight[0][0] < i - lag:
+                _, done, result = in_flight.popleft()
+                merge(done, result.get() if pool is not None else result)
+            if prune and dominated_by_front(ideal[k], front_F):
+                records[combo]['status'] = 'pruned'
+                continue
+            if pool is None:
+                in_flight.append((i, combo, solve_combination(combo, *args)))
+            else:
+                in_flight.append((i, combo, pool.apply_async(solve_combination, (combo,) + args)))
+        while in_flight:
+            _, done, result = in_flight.popleft()
+            merge(done, result.get() if pool is not None else result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    # 以标准约束检查复核 (裕度 >= 0 与 check_constraints 在边界上可能有舍入差异)
+    ok = np.array([check_constraints(x.tolist(), case=case) == 0 for x in front_X], dtype=bool)
+    front_X, front_F = front_X[ok], front_F[ok]
+
+    keys = [tuple(int(v) for v in x[list(INT_GENES)]) for x in front_X]
+    for combo in combos:
+        records[combo]['in_front'] = 0
+    for key in keys:
+        records[key]['in_front'] += 1
+    return front_X, front_F, [dict(combo=c, **records[c]) for c in combos]
+
+
+def write_results(output_dir, front_X, front_F, records, case=DEFAULT_CASE):
+    """写出 pareto_front_decomposition.csv (前沿 CSV 格式) 与逐组合汇总 decomposition_summary.csv。"""
+    store = ResultStore(capacity=max(1, len(front_X)))
+    decoded = decode_matrix(front_X, case) if len(front_X) else np.empty((0, NDIM))
+    for i, (obj, dec) in enumerate(zip(front_F, decoded)):
+        store.append(ALGORITHM_NAME, 0, i, obj, dec)
+    store.write_front(os.path.join(output_dir, FRONT_FILE))
+
+    with open(os.path.join(output_dir, SUMMARY_FILE), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        for rec in records:
+            i_fc, i_fy, i_npb, i_npw = rec['combo']
+            writer.writerow([case.val_fc[i_fc], case.val_fy[i_fy], case.val_npb[i_npb], case.val_npw[i_npw],
+                             rec['status'], rec['evaluations'], rec['sub_front'], rec['in_front']]
+                            + ['' if np.isnan(v) else float(v) for v in rec['ideal']])
+
+
+def main(argv=None):
+    from main import _create_unique_output_dir
+
+    parser = argparse.ArgumentParser(description="离散组合分解求解")
+    parser.add_argument('-o', '--output-dir', default=None, help="输出目录 (默认 outputs/decomposition_results_*)")
+    parser.add_argument('--pop', type=int, default=DECOMP_POP, help="每个组合的子种群规模")
+    parser.add_argument('--gen', type=int, default=DECOMP_GEN, help="每个组合的子优化代数")
+    parser.add_argument('--probe', type=int, default=DECOMP_PROBE, help="乐观界探测样本数")
+    parser.add_argument('--slack', type=float, default=DECOMP_BOUND_SLACK, help="乐观界放宽比例")
+    parser.add_argument('--no-prune', action='store_true', help="求解全部组合")
+    parser.add_argument('--workers', type=int, default=DECOMP_WORKERS)
+    parser.add_argument('--lag', type=int, default=DECOMP_LAG, help="界剪枝使用的结果滞后 (组合数)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args(argv)
+
+    if args.output_dir is None:
+        output_dir = _create_unique_output_dir(os.path.join(os.getcwd(), "outputs"), "decomposition_results")
+    else:
+        output_dir = args.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    front_X, front_F, records = decompose(pop=args.pop, n_gen=args.gen, n_probe=args.probe, slack=args.slack,
+                                          seed=args.seed, workers=args.workers, prune=not args.no_prune,
+                                          lag=args.lag)
+    elapsed = time.perf_counter() - t0
+    write_results(output_dir, front_X, front_F, records)
+
+    status = [rec['status'] for rec in records]
+    print(f"组合: {len(records)} (求解 {status.count('solved')}, 单价被支配 {status.count('dominated')}, "
+          f"界剪枝 {status.count('pruned')}, 材料不满足 {status.count('material')})")
+    print(f"评估次数: {sum(rec['evaluations'] for rec in records)}, 用时 {elapsed:.2f}s")
+    print(f"全局前沿: {len(front_F)} 个设计, 来自 {sum(rec['in_front'] > 0 for rec in records)} 个组合")
+    print(f"输出目录: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+全局 Pareto 前沿查询。
+
+将 pareto_front_global.csv (或多个前沿文件 / 输出目录) 载入为列式数组:
+目标矩阵、解码变量矩阵、算法/运行/解编号整数列, 并建立
+每个目标的排序索引 (区间查询) 与归一化目标空间上的 k-d 树 (近邻查询)。
+可保存为 .npz 以便重复加载大规模归档。
+
+用法:
+    python front_query.py outputs/run_results range --stiffness-min 6e10 --moment-max 1.2e9
+    python front_query.py outputs/run_results cheapest --stiffness-min 6e10 --moment-max 1.2e9 -k 3
+    python front_query.py outputs/run_results nearest --target 1.2e7 1.1e9 7e10 -k 5
+"""
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from objectives import DECODED_VAR_NAMES
+from results_store import ResultStore, OBJECTIVE_NAMES
+
+DEFAULT_FRONT_FILE = "pareto_front_global.csv"
+
+
+class FrontIndex:
+    def __init__(self, objectives, decoded, algorithm_codes, algorithm_names, run, solution_idx):
+        self.objectives = np.ascontiguousarray(objectives, dtype=float).reshape(-1, len(OBJECTIVE_NAMES))
+        self.decoded = np.ascontiguousarray(decoded, dtype=float).reshape(-1, len(DECODED_VAR_NAMES))
+        self.algorithm_codes = np.asarray(algorithm_codes, dtype=np.int32)
+        self.algorithm_names = list(algorithm_names)
+        self.run = np.asarray(run, dtype=np.int32)
+        self.solution_idx = np.asarray(solution_idx, dtype=np.int32)
+
+        # 区间查询: 每个目标一份升序排列的值与对应行号
+        self._order = np.argsort(self.objectives, axis=0, kind='stable')
+        self._sorted = np.take_along_axis(self.objectives, self._order, axis=0)
+
+        # 近邻查询: 目标按全前沿范围归一化后建树, 避免量纲差异主导距离
+        if len(self):
+            self._lo = self.objectives.min(axis=0)
+            span = self.objectives.max(axis=0) - self._lo
+        else:
+            self._lo = np.zeros(len(OBJECTIVE_NAMES))
+            span = np.ones(len(OBJECTIVE_NAMES))
+        self._span = np.where(span > 0, span, 1.0)
+        self._tree = cKDTree((self.objectives - self._lo) / self._span) if len(self) else None
+
+    def __len__(self):
+        return len(self.objectives)
+
+    # ---------- 载入 / 保存 ----------
+    @classmethod
+    def from_csv(cls, paths):
+        """读取一个或多个前沿 CSV (或含 pareto_front_global.csv 的输出目录)。"""
+        if isinstance(paths, str):
+            paths = [paths]
+        paths = [os.path.join(p, DEFAULT_FRONT_FILE) if os.path.isdir(p) else p for p in paths]
+        missing = [p for p in paths if not os.path.exists(p)]
+        if missing:
+            raise FileNotFoundError(f"前沿文件不存在: {', '.join(missing)}")
+        return cls.from_store(ResultStore.from_csv(paths))
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(store.objectives, store.decoded, store.algorithm_codes, store.algorithm_names,
+                   store.run, store.solution_idx)
+
+    @classmethod
+    def load(cls, path):
+        """从 save() 生成的 .npz 载入。"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['objectives'], data['decoded'], data['algorithm_codes'],
+                       [str(n) for n in data['algorithm_names']], data['run'], data['solution_idx'])
+
+    def save(self, path):
+        np.savez(path, objectives=self.objectives, decoded=self.decoded,
+                 algorithm_codes=self.algorithm_codes, algorithm_names=np.array(self.algorithm_names),
+                 run=self.run, solution_idx=self.solution_idx)
+
+    # ---------- 查询 ----------
+    def range(self, cost=(None, None), moment=(None, None), stiffness=(None, None)):
+        """
+        返回目标值落在给定闭区间内的行号 (升序)。区间端点为 None 表示不限。
+        先用排序索引取候选最少的一个目标的切片, 再对其余目标做向量化过滤。
+        """
+        bounds = [cost, moment, stiffness]
+        best = None
+        for j, (lo, hi) in enumerate(bounds):
+            left = 0 if lo is None else np.searchsorted(self._sorted[:, j], lo, side='left')
+            right = len(self) if hi is None else np.searchsorted(self._sorted[:, j], hi, side='right')
+            if best is None or right - left < best[2] - best[1]:
+                best = (j, left, right)
+        j, left, right = best
+        idx = self._order[left:right, j]
+
+        mask = np.ones(len(idx), dtype=bool)
+        for k, (lo, hi) in enumerate(bounds):
+            if k == j:
+                continue
+            vals = self.objectives[idx, k]
+            if lo is not None:
+                mask &= vals >= lo
+            if hi is not None:
+                mask &= vals <= hi
+        return np.sort(idx[mask])
+
+    def nearest(self, target, k=1):
+        """返回与目标点 (Cost, Moment, Stiffness) 在归一化目标空间中最近的 k 个行号及距离。"""
+        if self._tree is None:
+            return np.array([], dtype=int), np.array([])
+        k = min(k, len(self))
+        q = (np.asarray(target, dtype=float) - self._lo) / self._span
+        dist, idx = self._tree.query(q, k=k)
+        return np.atleast_1d(idx), np.atleast_1d(dist)
+
+    def best(self, objective='Cost', k=1, **bounds):
+        """
+        约束下的最优设计: 满足 bounds (同 range 的关键字) 的设计中按 objective 取前 k 个。
+        Cost / Moment 越小越好, Stiffness 越大越好。
+        """
+        j = OBJECTIVE_NAMES.index(objective)
+        keys = ('cost', 'moment', 'stiffness')
+        limits = [bounds.get(name, (None, None)) for name in keys]
+        unknown = set(bounds) - set(keys)
+        if unknown:
+            raise ValueError(f"未知约束: {', '.join(sorted(unknown))}")
+
+        # 沿该目标的排序索引从最优端分块扫描, 块长倍增; 约束宽松时只需扫描前几块
+        lo, hi = limits[j]
+        left = 0 if lo is None else np.searchsorted(self._sorted[:, j], lo, side='left')
+        right = len(self) if hi is None else np.searchsorted(self._sorted[:, j], hi, side='right')
+        order = self._order[left:right, j]
+        if objective == 'Stiffness':
+            order = order[::-1]
+
+        found = []
+        n_found = 0
+        start, chunk = 0, 1024
+        while start < len(order) and n_found < k:
+            idx = order[start:start + chunk]
+            mask = np.ones(len(idx), dtype=bool)
+            for c, (c_lo, c_hi) in enumerate(limits):
+                if c == j:
+                    continue
+                vals = self.objectives[idx, c]
+                if c_lo is not None:
+                    mask &= vals >= c_lo
+                if c_hi is not None:
+                    mask &= vals <= c_hi
+            found.append(idx[mask])
+            n_found += int(mask.sum())
+            start += chunk
+            chunk *= 2
+        if not found:
+            return np.array([], dtype=int)
+        return np.concatenate(found)[:k]
+
+    def cheapest(self, k=1, max_cost=None, max_moment=None, min_stiffness=None):
+        """满足弯矩上限与刚度下限 (及可选造价上限) 的最便宜的 k 个设计。"""
+        return self.best('Cost', k=k, cost=(None, max_cost), moment=(None, max_moment),
+                         stiffness=(min_stiffness, None))
+
+    def records(self, idx):
+        """将行号转换为记录列表 (algorithm / run / solution_idx / objectives / decoded)。"""
+        return [{
+            'algorithm': self.algorithm_names[self.algorithm_codes[i]],
+            'run': int(self.run[i]),
+            'solution_idx': int(self.solution_idx[i]),
+            'objectives': tuple(float(v) for v in self.objectives[i]),
+            'decoded': [float(v) for v in self.decoded[i]],
+        } for i in idx]
+
+    def write_csv(self, path_or_file, idx):
+        """按前沿 CSV 的列格式导出选中的行。"""
+        own = isinstance(path_or_file, str)
+        f = open(path_or_file, 'w', newline='', encoding='utf-8-sig') if own else path_or_file
+        try:
+            writer = csv.writer(f)
+            writer.writerow(['Algorithm', 'Run', 'SolutionIdx'] + OBJECTIVE_NAMES + DECODED_VAR_NAMES)
+            for rec in self.records(idx):
+                writer.writerow([rec['algorithm'], rec['run'], rec['solution_idx']]
+                                + list(rec['objectives']) + rec['decoded'])
+        finally:
+            if own:
+                f.close()
+
+
+def load_front_index(path):
+    """按扩展名载入: .npz 为已保存的索引, 否则为前沿 CSV 或输出目录。"""
+    if isinstance(path, str) and path.endswith('.npz'):
+        return FrontIndex.load(path)
+    return FrontIndex.from_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="全局 Pareto 前沿查询")
+    parser.add_argument('source', nargs='+', help="前沿 CSV / 输出目录 / .npz 索引")
+    parser.add_argument('--save', default=None, help="将载入的前沿保存为 .npz 索引")
+    parser.add_argument('--csv', default=None, help="查询结果导出到 CSV (默认打印到标准输出)")
+    sub = parser.add_subparsers(dest='command')
+
+    for name in ('range', 'cheapest'):
+        p = sub.add_parser(name, help="区间查询" if name == 'range' else "约束下造价最低的设计")
+        p.add_argument('--cost-min', type=float)
+        p.add_argument('--cost-max', type=float)
+        p.add_argument('--moment-min', type=float)
+        p.add_argument('--moment-max', type=float)
+        p.add_argument('--stiffness-min', type=float)
+        p.add_argument('--stiffness-max', type=float)
+        if name == 'cheapest':
+            p.add_argument('-k', type=int, default=1)
+    p_nn = sub.add_parser('nearest', help="距目标点最近的 k 个设计")
+    p_nn.add_argument('--target', type=float, nargs=3, required=True, metavar=('COST', 'MOMENT', 'STIFFNESS'))
+    p_nn.add_argument('-k', type=int, default=5)
+
+    args = parser.parse_args(argv)
+    sources = args.source if len(args.source) > 1 else args.source[0]
+    index = load_front_index(sources)
+    print(f"已载入 {len(index)} 个前沿设计", file=sys.stderr)
+    if args.save:
+        index.save(args.save)
+        print(f"索引已保存: {args.save}", file=sys.stderr)
+
+    if args.command is None:
+        return
+    bounds = {}
+    if args.command in ('range', 'cheapest'):
+        bounds = {
+            'cost': (args.cost_min, args.cost_max),
+            'moment': (args.moment_min, args.moment_max),
+            'stiffness': (args.stiffness_min, args.stiffness_max),
+        }
+    if args.command == 'range':
+        idx = index.range(**bounds)
+    elif args.command == 'cheapest':
+        idx = index.best('Cost', k=args.k, **bounds)
+    else:
+        idx, _ = index.nearest(args.target, k=args.k)
+
+    print(f"匹配 {len(idx)} 个设计", file=sys.stderr)
+    if args.csv:
+        index.write_csv(args.csv, idx)
+    else:
+        index.write_csv(sys.stdout, idx)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+岛屿模型并行优化。
+
+每个岛在独立进程中运行一个算法 (四种算法各占一岛, 或同一算法的多个副本)，
+每隔 ISLAND_INTERVAL 代按迁移拓扑向相邻岛发送 ISLAND_MIGRANTS 个非支配个体，
+岛间通过 multiprocessing 队列 (管道) 通信。运行结束后汇总各岛最终种群，
+提取全局 Pareto 前沿并记录每个岛对全局前沿的贡献。
+"""
+import csv
+import os
+import queue
+import random
+import time
+import traceback
+import multiprocessing as mp
+
+import numpy as np
+from deap import tools
+
+from case_config import *
+from constraints import check_constraints
+from objectives import decode_variables, calculate_objectives, DECODED_VAR_NAMES
+from main import _pareto_indices, _create_unique_output_dir
+
+from algorithms import ALGORITHMS, get_runner
+
+
+def migration_targets(n_islands, topology):
+    """返回 {岛编号: [迁出目标岛编号, ...]}。"""
+    if n_islands < 2:
+        return {i: [] for i in range(n_islands)}
+    if topology == 'ring':
+        return {i: [(i + 1) % n_islands] for i in range(n_islands)}
+    if topology == 'star':
+        # 0 号岛为枢纽, 与其余各岛双向交换
+        targets = {0: list(range(1, n_islands))}
+        for i in range(1, n_islands):
+            targets[i] = [0]
+        return targets
+    if topology == 'full':
+        return {i: [j for j in range(n_islands) if j != i] for i in range(n_islands)}
+    raise ValueError(f"未知迁移拓扑: {topology} (可选 ring / star / full)")
+
+
+class MigrationChannel:
+    """
+    作为 run_* 的 migration 钩子传入: migration(gen, pop, ind_class) -> 迁入个体列表。
+    迁出个体只携带基因与适应度, 接收方用自身的个体类重建, 因此不同算法之间可以互相迁移。
+    """
+    def __init__(self, island_id, inbox, outboxes, interval, n_migrants):
+        self.island_id = island_id
+        self.inbox = inbox
+        self.outboxes = outboxes
+        self.interval = max(1, int(interval))
+        self.n_migrants = n_migrants
+        self.log = []
+
+    def __call__(self, gen, pop, ind_class):
+        if (gen + 1) % self.interval != 0:
+            return []
+
+        # 迁出: 从当前第一前沿中随机抽取
+        if self.outboxes and self.n_migrants > 0 and pop:
+            front = tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
+            emigrants = random.sample(front, min(self.n_migrants, len(front)))
+            payload = [(list(ind), tuple(ind.fitness.values)) for ind in emigrants]
+            for target, box in self.outboxes:
+                box.put((self.island_id, gen, payload))
+                self.log.append((gen, self.island_id, target, len(payload)))
+
+        # 迁入: 非阻塞读取, 各岛代数不同也不会互相等待
+        immigrants = []
+        while True:
+            try:
+                source, _, payload = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            for genes, fit in payload:
+                ind = ind_class(genes)
+                ind.fitness.values = fit
+                immigrants.append(ind)
+            self.log.append((gen, source, self.island_id, len(payload)))
+        return immigrants
+
+
+def _island_worker(island_id, algo_name, case, seed, inbox, outboxes, interval, n_migrants, result_queue):
+    random.seed(seed)
+    np.random.seed(seed)
+    # 目标岛可能已提前结束, 不等待未被读取的迁移数据写完
+    for _, box in outboxes:
+        box.cancel_join_thread()
+
+    channel = MigrationChannel(island_id, inbox, outboxes, interval, n_migrants)
+    start_t = time.time()
+    try:
+        _, population = get_runner(algo_name)(migration=channel, case=case)
+    except Exception:
+        # 异常也要回报, 否则主进程会一直等待本岛结果
+        result_queue.put({'island': island_id, 'algorithm': algo_name, 'error': traceback.format_exc()})
+        return
+    duration = time.time() - start_t
+
+    result_queue.put({
+        'island': island_id,
+        'algorithm': algo_name,
+        'time': duration,
+        'population': [list(ind) for ind in population],
+        'migrations': channel.log,
+    })
+
+
+def run_islands(island_algos=None, case=DEFAULT_CASE, topology=ISLAND_TOPOLOGY, interval=ISLAND_INTERVAL,
+                n_migrants=ISLAND_MIGRANTS, seed=SEED):
+    """并行运行全部岛, 返回按岛编号排序的结果列表。"""
+    island_algos = list(island_algos or ISLAND_ALGOS)
+    for name in island_algos:
+        if name not in ALGORITHMS:
+            raise ValueError(f"未知算法: {name}")
+
+    n = len(island_algos)
+    targets = migration_targets(n, topology)
+    inboxes = [mp.Queue() for _ in range(n)]
+    result_queue = mp.Queue()
+
+    procs = []
+    for i, name in enumerate(island_algos):
+        outboxes = [(t, inboxes[t]) for t in targets[i]]
+        p = mp.Process(
+            target=_island_worker,
+            args=(i, name, case, seed + i, inboxes[i], outboxes, interval, n_migrants, result_queue),
+        )
+        p.start()
+        procs.append(p)
+
+    # 先取结果再 join, 避免结果队列未清空导致子进程无法退出;
+    # 轮询等待并检查子进程状态, 岛抛出异常或异常退出 (被杀、崩溃) 时终止其余岛并报错
+    results = {}
+    try:
+        while len(results) < n:
+            try:
+                res = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                dead = [i for i, p in enumerate(procs) if i not in results and p.exitcode is not None]
+                if not dead:
+                    continue
+                # 子进程退出前写入的结果可能还在管道中
+                try:
+                    res = result_queue.get(timeout=1.0)
+                except queue.Empty:
+                    i = dead[0]
+                    raise RuntimeError(f"岛 {i} ({island_algos[i]}) 异常退出, 退出码 {procs[i].exitcode}")
+            if 'error' in res:
+                raise RuntimeError(f"岛 {res['island']} ({res['algorithm']}) 运行失败:\n{res['error']}")
+            results[res['island']] = res
+    finally:
+        if len(results) < n:
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+        for p in procs:
+            p.join()
+    return [results[i] for i in range(n)]
+
+
+def island_contributions(results, case=DEFAULT_CASE):
+    """
+    汇总各岛最终种群的可行解, 提取全局前沿。
+    返回 (全局前沿记录列表, 每岛统计列表)。
+    """
+    pool = []
+    stats = []
+    for res in results:
+        feasible = 0
+        for idx, genes in enumerate(res['population']):
+            if check_constraints(genes, case=case) > 0:
+                continue
+            feasible += 1
+            pool.append({
+                'island': res['island'],
+                'algorithm': res['algorithm'],
+                'solution_idx': idx,
+                'objectives': calculate_objectives(genes, case),
+                'decoded': decode_variables(genes, case),
+            })
+        sent = sum(m[3] for m in res['migrations'] if m[1] == res['island'])
+        received = sum(m[3] for m in res['migrations'] if m[2] == res['island'])
+        stats.append({
+            'island': res['island'],
+            'algorithm': res['algorithm'],
+            'time': res['time'],
+            'pop_size': len(res['population']),
+            'feasible_count': feasible,
+            'sent': sent,
+            'received': received,
+            'front_count': 0,
+        })
+
+    front = [pool[i] for i in _pareto_indices([r['objectives'] for r in pool])]
+    for rec in front:
+        stats[rec['island']]['front_count'] += 1
+    for row in stats:
+        row['front_share'] = row['front_count'] / len(front) if front else 0.0
+    return front, stats
+
+
+def main():
+    print("=== 岛屿模型并行优化 ===")
+    print(f"岛: {ISLAND_ALGOS}, 拓扑: {ISLAND_TOPOLOGY}, "
+          f"迁移间隔: {ISLAND_INTERVAL} 代, 迁移个体数: {ISLAND_MIGRANTS}")
+
+    output_dir = _create_unique_output_dir(os.path.join(os.getcwd(), "outputs"), "island_results")
+    print(f"输出目录: {output_dir}")
+
+    start_t = time.time()
+    results = run_islands()
+    print(f"全部岛运行完成, 用时 {time.time() - start_t:.1f}s")
+
+    front, stats = island_contributions(results)
+
+    with open(os.path.join(output_dir, "island_front_global.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Island', 'Algorithm', 'SolutionIdx', 'Cost', 'Moment', 'Stiffness'] + DECODED_VAR_NAMES)
+        for rec in front:
+            c, m, s = rec['objectives']
+            writer.writerow([rec['island'], rec['algorithm'], rec['solution_idx'], c, m, s] + list(rec['decoded']))
+
+    with open(os.path.join(output_dir, "island_contribution.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            'Island', 'Algorithm', 'Time(s)', 'PopulationSize', 'FeasibleCount',
+            'GlobalFrontCount', 'GlobalFrontShare', 'MigrantsSent', 'MigrantsReceived'
+        ])
+        for row in stats:
+            writer.writerow([
+                row['island'], row['algorithm'], row['time'], row['pop_size'], row['feasible_count'],
+                row['front_count'], row['front_share'], row['sent'], row['received']
+            ])
+
+    with open(os.path.join(output_dir, "island_migration_log.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ReceiverGen', 'Source', 'Target', 'Count'])
+        for res in results:
+            # 只记录接收端条目, 避免同一次迁移重复出现
+            for gen, source, target, count in res['migrations']:
+                if target == res['island']:
+                    writer.writerow([gen + 1, source, target, count])
+
+    print(f"全局前沿解数: {len(front)}")
+    for row in stats:
+        print(f"  - 岛 {row['island']} ({row['algorithm']}): 用时 {row['time']:.1f}s, "
+              f"可行 {row['feasible_count']}/{row['pop_size']}, "
+              f"全局前沿贡献 {row['front_count']} ({row['front_share']:.2%}), "
+              f"迁出 {row['sent']}, 迁入 {row['received']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,47 @@
-import numpy as np
-import csv
 import time
+_T_START = time.perf_counter()  # 模块开始导入的时刻, 用于统计启动/导入耗时
+
+import argparse
+import csv
 import os
 import random
+import numpy as np
 from case_config import *
 from evaluation import calculate_phi
-from constraints import check_constraints
-from objectives import decode_variables, calculate_objectives
-from visualization import plot_box_phi, plot_best_run_3d, plot_best_run_surface
-
-# 导入算法
-from algorithms.nsga2 import run_nsga2
-from algorithms.nsga3 import run_nsga3
-from algorithms.gde3 import run_gde3
-from algorithms.mopso import run_mopso
-
-
-DECODED_VAR_NAMES = [
-    'l_seg', 'lbot', 'h', 'ttop', 'tbot', 'tw', 'p_slope',
-    'x1', 'x2', 'x3', 'y1', 'y2',
-    'fc', 'fy', 'dr', 'dp', 'npb', 'npw', 'sigma', 'hp_ratio'
+from constraints import evaluation_of
+from objectives import DECODED_VAR_NAMES
+from seeding import load_front_designs
+from sampling import INIT_METHODS
+from results_store import ResultStore, pareto_mask, objective_bounds, phi_values
+# 算法模块 (DEAP) 与绘图模块 (matplotlib) 均在对应阶段按需导入
+from algorithms import ALGORITHMS, get_runner
+
+
+CSV_RESULT = "optimization_results.csv"
+CSV_SUMMARY = "feasibility_summary.csv"
+CSV_DETAIL = "solution_audit_details.csv"
+CSV_GLOBAL_PF = "pareto_front_global.csv"
+CSV_BEST_DETAIL = "best_phi_samples_detailed.csv"
+CSV_LEADERBOARD = "phi_leaderboard.csv"
+TXT_LEADERBOARD = "phi_leaderboard.txt"
+CSV_OUTPUT_INDEX = "output_file_index.csv"
+
+SUMMARY_HEADER = [
+    'Algorithm', 'Run', 'Time(s)', 'PopulationSize', 'FrontSize',
+    'FeasibleCount', 'InfeasibleCount', 'FeasibleRatio',
+    'Fail_Eq24', 'Fail_Eq25', 'Fail_Eq26', 'Fail_Eq29', 'Fail_Eq28',
+    'Fail_fc', 'Fail_fy',
+    'Evaluations', 'Generations', 'EvalsToTarget', 'TimeToTarget(s)'
 ]
 
 
-def _dominates(a, b):
-    """目标支配关系: Min C, Min M, Max S。"""
-    ta = (a[0], a[1], -a[2])
-    tb = (b[0], b[1], -b[2])
-    no_worse = (ta[0] <= tb[0]) and (ta[1] <= tb[1]) and (ta[2] <= tb[2])
-    strictly_better = (ta[0] < tb[0]) or (ta[1] < tb[1]) or (ta[2] < tb[2])
-    return no_worse and strictly_better
-
-
 def _pareto_indices(obj_list):
     """返回非支配前沿索引（第一前沿）。"""
-    n = len(obj_list)
-    if n == 0:
-        return []
-    dominated = [False] * n
-    for i in range(n):
-        if dominated[i]:
-            continue
-        for j in range(n):
-            if i == j:
-                continue
-            if _dominates(obj_list[j], obj_list[i]):
-                dominated[i] = True
-                break
-    return [i for i, d in enumerate(dominated) if not d]
+    return np.flatnonzero(pareto_mask(obj_list)).tolist()
 
 
 def _safe_name(algo_name):
-    return algo_name.lower().replace('-', '_').replace(' ', '_')
+    return algo_name.lower().replace('-', '_').replace(' ', '_').replace('/', '_')
 
 
 def _create_unique_output_dir(root_dir, base_name):
@@ -87,37 +77,38 @@ def _phi_value(obj, bounds):
     val = 0.3125 * (norm_c ** 2) + 0.3125 * (norm_m ** 2) + 0.375 * (norm_s ** 2)
     return float(np.sqrt(val))
 
-def main():
-    print("=== PCS 预制拼装箱梁桥多目标优化系统启动 ===")
-    print(f"跨径: {L_SPAN}m, 桥宽: {B_TOP}m")
-    print(f"优化目标: Min Cost, Min Safety(M), Max Structural")
-    print("-" * 50)
-    
-    # 设置随机种子
-    random.seed(SEED)
-    np.random.seed(SEED)
-
-    # 每次运行创建独立输出目录，避免文件覆盖
-    project_root = os.getcwd()
-    output_dir = _create_unique_output_dir(os.path.join(project_root, "outputs"), "run_results")
-    os.chdir(output_dir)
-    print(f"输出目录: {output_dir}")
-    
-    algorithms = {
-        'NSGA-II': run_nsga2,
-        'NSGA-III': run_nsga3,
-        'GDE3': run_gde3,
-        'MOPSO': run_mopso
-    }
 
-    csv_result = "optimization_results.csv"
-    csv_summary = "feasibility_summary.csv"
-    csv_detail = "solution_audit_details.csv"
-    csv_global_pf = "pareto_front_global.csv"
-    csv_best_detail = "best_phi_samples_detailed.csv"
-    csv_leaderboard = "phi_leaderboard.csv"
-    txt_leaderboard = "phi_leaderboard.txt"
-    csv_output_index = "output_file_index.csv"
+def _algorithms_in_output(output_dir):
+    """从 feasibility_summary.csv 中按出现顺序读取已运行的算法名。"""
+    names = []
+    with open(os.path.join(output_dir, CSV_SUMMARY), newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            if row['Algorithm'] not in names:
+                names.append(row['Algorithm'])
+    return names
+
+
+def _budget_columns(stats):
+    """评估次数、代数、首次到达目标的评估数与用时 (未到达时留空)。"""
+    def blank(v):
+        return '' if v is None else v
+    return [stats.get('evaluations', ''), stats.get('generations', ''),
+            blank(stats.get('evals_to_target')), blank(stats.get('time_to_target'))]
+
+
+def stage_run(output_dir, algo_names, case=DEFAULT_CASE, n_runs=N_RUNS, seed_designs=None,
+              max_evals=MAX_EVALS, time_limit=TIME_LIMIT, refine_every=REFINE_INTERVAL, refine_at_end=REFINE_AT_END,
+              gde3_adapt=GDE3_ADAPT, init_method=INIT_METHOD, evaluate=None):
+    """
+    阶段一: 运行所选算法, 写出逐解核查、可行性汇总、各算法前沿与运行汇总。
+    设置 max_evals / time_limit 时各算法以相同评估次数或墙钟时间为预算, 代替固定代数。
+    refine_every / refine_at_end 启用梯度局部精修 (每 k 代 / 运行结束时), 精修评估计入预算。
+    gde3_adapt 选择 GDE3 的 F/CR 控制方式, 每代参数轨迹写入 de_trajectory_gde3.csv。
+    init_method 为各算法初始种群的采样方式 (uniform / lhs / sobol / halton)。
+    evaluate 替换各算法的评估函数 (如 cluster.Coordinator.evaluate_candidates), 默认在当前进程中评估。
+    """
+    csv_detail = os.path.join(output_dir, CSV_DETAIL)
+    csv_summary = os.path.join(output_dir, CSV_SUMMARY)
 
     with open(csv_detail, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
@@ -138,35 +129,33 @@ def main():
 
     with open(csv_summary, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
-        writer.writerow([
-            'Algorithm', 'Run', 'Time(s)', 'PopulationSize', 'FrontSize',
-            'FeasibleCount', 'InfeasibleCount', 'FeasibleRatio',
-            'Fail_Eq24', 'Fail_Eq25', 'Fail_Eq26', 'Fail_Eq29', 'Fail_Eq28',
-            'Fail_fc', 'Fail_fy'
-        ])
-
-    with open(csv_best_detail, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            'Algorithm', 'SourceRun', 'SourceSolutionIdx',
-            'Phi', 'Cost', 'Moment', 'Stiffness'
-        ] + DECODED_VAR_NAMES)
+        writer.writerow(SUMMARY_HEADER)
 
-    run_cache = {name: [] for name in algorithms}
-    algo_feasible_records = {name: [] for name in algorithms}
-    algo_front_records = {name: [] for name in algorithms}
+    run_cache = {name: [] for name in algo_names}
+    feasible_store = ResultStore(algorithm_names=algo_names)
 
     # ==========================================
     # 阶段一：运行所有算法，探索解空间并收集数据
     # ==========================================
     print(">>> 阶段一：执行多目标优化算法，探索解空间...")
-    for name, algo_func in algorithms.items():
+    for name in algo_names:
+        algo_func = get_runner(name)
+        algo_kwargs = {'adapt': gde3_adapt} if name == 'GDE3' else {}
+        de_rows = []
         print(f"\n[开始运行算法: {name}]")
 
-        for run in range(N_RUNS):
+        for run in range(n_runs):
             start_t = time.time()
-            pareto_front, population = algo_func()
+            budget_stats = {}
+            refiner = None
+            if refine_every or refine_at_end:
+                from algorithms.refine import MemeticRefiner
+                refiner = MemeticRefiner(case, interval=refine_every, at_end=refine_at_end)
+            pareto_front, population = algo_func(seeds=seed_designs, case=case, max_evals=max_evals,
+                                                 time_limit=time_limit, stats=budget_stats, refine=refiner,
+                                                 init=init_method, evaluate=evaluate, **algo_kwargs)
             duration = time.time() - start_t
+            de_rows.extend([run + 1] + list(row) for row in budget_stats.get('de_trajectory', []))
 
             feasible_count = 0
             pop_size = len(population) if population is not None else 0
@@ -180,7 +169,9 @@ def main():
                 with open(csv_detail, 'a', newline='', encoding='utf-8-sig') as f:
                     writer = csv.writer(f)
                     for idx, ind in enumerate(population):
-                        penalty, detail = check_constraints(ind, return_details=True)
+                        # 评估时附带的记录 (EVAL_DETAILS), 没有或已失效时重新计算
+                        rec = evaluation_of(ind, case)
+                        penalty, detail, decoded = rec.penalty, rec.details, rec.decoded
                         is_feasible = detail['is_feasible']
                         if is_feasible:
                             feasible_count += 1
@@ -205,7 +196,7 @@ def main():
                                 'idx': idx,
                                 'violated': violated,
                                 'detail': detail,
-                                'decoded': decode_variables(ind)
+                                'decoded': decoded
                             }
 
                         if not detail['Eq24_width_ok']:
@@ -223,19 +214,11 @@ def main():
                         if not detail['Material_fy_ok']:
                             fail_counts['fy'] += 1
 
-                        decoded = decode_variables(ind)
-                        obj_c, obj_m, obj_s = calculate_objectives(ind)
+                        obj_c, obj_m, obj_s = rec.objectives
                         fit_vals = ind.fitness.values if hasattr(ind, 'fitness') and ind.fitness.valid else ('', '', '')
 
                         if is_feasible:
-                            rec = {
-                                'algorithm': name,
-                                'run': run + 1,
-                                'solution_idx': idx,
-                                'objectives': (obj_c, obj_m, obj_s),
-                                'decoded': decoded
-                            }
-                            algo_feasible_records[name].append(rec)
+                            feasible_store.append(name, run + 1, idx, (obj_c, obj_m, obj_s), decoded)
 
                         writer.writerow([
                             name, run + 1, idx, int(is_feasible), penalty,
@@ -269,13 +252,14 @@ def main():
                 'feasible_count': feasible_count,
                 'infeasible_count': infeasible_count,
                 'feasible_ratio': feasible_ratio,
-                'fail_counts': fail_counts
+                'fail_counts': fail_counts,
+                'budget': budget_stats
             })
 
             if front_size > 0:
-                print(f"  - 第 {run+1}/{N_RUNS} 次运行完成. 用时: {duration:.1f}s, 前沿解: {front_size}, 可行/总数: {feasible_count}/{pop_size} ({feasible_ratio:.2%})")
+                print(f"  - 第 {run+1}/{n_runs} 次运行完成. 用时: {duration:.1f}s, 前沿解: {front_size}, 可行/总数: {feasible_count}/{pop_size} ({feasible_ratio:.2%})")
             else:
-                print(f"  - 第 {run+1}/{N_RUNS} 次运行失败. 未找到可行解. 可行/总数: {feasible_count}/{pop_size} ({feasible_ratio:.2%})")
+                print(f"  - 第 {run+1}/{n_runs} 次运行失败. 未找到可行解. 可行/总数: {feasible_count}/{pop_size} ({feasible_ratio:.2%})")
 
             # 详细违规打印已关闭，仅保留CSV审计输出
 
@@ -286,67 +270,93 @@ def main():
                     name, run + 1, duration, pop_size, front_size,
                     feasible_count, infeasible_count, feasible_ratio,
                     fc['Eq24'], fc['Eq25'], fc['Eq26'], fc['Eq29'], fc['Eq28'], fc['fc'], fc['fy']
-                ])
+                ] + _budget_columns(budget_stats))
 
-        feasible_recs = algo_feasible_records[name]
-        if feasible_recs:
-            pf_idx = _pareto_indices([r['objectives'] for r in feasible_recs])
-            algo_front_records[name] = [feasible_recs[i] for i in pf_idx]
+        if de_rows:
+            with open(os.path.join(output_dir, f"de_trajectory_{_safe_name(name)}.csv"), 'w',
+                      newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Run', 'Generation', 'MeanF', 'StdF', 'MeanCR', 'StdCR', 'Trials', 'Successes'])
+                writer.writerows(de_rows)
+
+        feasible_recs = feasible_store.by_algorithm(name)
+        if len(feasible_recs):
+            algo_front = feasible_recs.pareto_front()
             print(
                 f"[算法汇总: {name}] 可行解总数={len(feasible_recs)}, "
-                f"算法统一前沿解数={len(algo_front_records[name])}"
+                f"算法统一前沿解数={len(algo_front)}"
             )
 
-            algo_front_file = f"pareto_front_{_safe_name(name)}.csv"
-            with open(algo_front_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'Algorithm', 'Run', 'SolutionIdx', 'Cost', 'Moment', 'Stiffness'
-                ] + DECODED_VAR_NAMES)
-                for rec in algo_front_records[name]:
-                    c, m, s = rec['objectives']
-                    writer.writerow([
-                        rec['algorithm'], rec['run'], rec['solution_idx'], c, m, s
-                    ] + list(rec['decoded']))
+            algo_front_file = os.path.join(output_dir, f"pareto_front_{_safe_name(name)}.csv")
+            algo_front.write_front(algo_front_file)
             print(f"  已导出该算法前沿: {algo_front_file}")
         else:
             print(f"[算法汇总: {name}] 未找到可行解，无法生成算法前沿文件")
 
-    # ==========================================
-    # 阶段二：四算法前沿池 -> 全局唯一 Pareto Front -> 全局基准
-    # ==========================================
-    print("\n>>> 阶段二：四算法前沿池统一非支配排序与基准计算...")
-    global_front_pool = []
+    for name in algo_names:
+        run_summary_file = os.path.join(output_dir, f"run_summary_{_safe_name(name)}.csv")
+        with open(run_summary_file, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                'Algorithm', 'Run', 'Time(s)', 'FrontSize', 'PopulationSize',
+                'FeasibleCount', 'InfeasibleCount', 'FeasibleRatio',
+                'Fail_Eq24', 'Fail_Eq25', 'Fail_Eq26', 'Fail_Eq29', 'Fail_Eq28', 'Fail_fc', 'Fail_fy',
+                'Evaluations', 'Generations', 'EvalsToTarget', 'TimeToTarget(s)'
+            ])
+            for row in run_cache[name]:
+                fc = row['fail_counts']
+                writer.writerow([
+                    name, row['run'] + 1, row['time'], row['front_size'], row['pop_size'],
+                    row['feasible_count'], row['infeasible_count'], row['feasible_ratio'],
+                    fc['Eq24'], fc['Eq25'], fc['Eq26'], fc['Eq29'], fc['Eq28'], fc['fc'], fc['fy']
+                ] + _budget_columns(row['budget']))
+
+
+def stage_aggregate(output_dir):
+    """
+    阶段二/三: 读取已有输出目录中的各算法前沿与可行性汇总,
+    生成全局前沿、phi 评分、排行榜与输出文件索引。
+    """
+    csv_result = os.path.join(output_dir, CSV_RESULT)
+    csv_global_pf = os.path.join(output_dir, CSV_GLOBAL_PF)
+    csv_best_detail = os.path.join(output_dir, CSV_BEST_DETAIL)
+    csv_leaderboard = os.path.join(output_dir, CSV_LEADERBOARD)
+    txt_leaderboard = os.path.join(output_dir, TXT_LEADERBOARD)
+    csv_output_index = os.path.join(output_dir, CSV_OUTPUT_INDEX)
+
+    algorithms = _algorithms_in_output(output_dir)
+    # 各算法前沿依次读入同一个列式存储, 行顺序即前沿池顺序
+    global_front_pool = ResultStore(algorithm_names=algorithms)
     for name in algorithms:
-        global_front_pool.extend(algo_front_records[name])
-
-    if not global_front_pool:
-        print("严重错误：四个算法均未得到可行前沿解！程序终止。")
-        return
-
-    global_pf_idx = _pareto_indices([r['objectives'] for r in global_front_pool])
-    global_pf_records = [global_front_pool[i] for i in global_pf_idx]
-    global_arr = np.array([r['objectives'] for r in global_pf_records])
+        global_front_pool.extend(
+            ResultStore.from_csv(os.path.join(output_dir, f"pareto_front_{_safe_name(name)}.csv")))
+    feasible_totals = {name: 0 for name in algorithms}
+    with open(os.path.join(output_dir, CSV_SUMMARY), newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            feasible_totals[row['Algorithm']] += int(row['FeasibleCount'])
 
-    with open(csv_global_pf, 'w', newline='', encoding='utf-8-sig') as f:
+    with open(csv_best_detail, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
         writer.writerow([
-            'Algorithm', 'Run', 'SolutionIdx', 'Cost', 'Moment', 'Stiffness'
+            'Algorithm', 'SourceRun', 'SourceSolutionIdx',
+            'Phi', 'Cost', 'Moment', 'Stiffness'
         ] + DECODED_VAR_NAMES)
-        for rec in global_pf_records:
-            c, m, s = rec['objectives']
-            writer.writerow([
-                rec['algorithm'], rec['run'], rec['solution_idx'], c, m, s
-            ] + list(rec['decoded']))
 
-    print(f"  四算法前沿池样本总数: {len(global_front_pool)}")
-    print(f"  全局唯一 Pareto Front 数量: {len(global_pf_records)}")
+    # ==========================================
+    # 阶段二：各算法前沿池 -> 全局唯一 Pareto Front -> 全局基准
+    # ==========================================
+    print(f"\n>>> 阶段二：{len(algorithms)} 个算法的前沿池统一非支配排序与基准计算...")
+    if not len(global_front_pool):
+        print(f"严重错误：{len(algorithms)} 个算法均未得到可行前沿解！程序终止。")
+        return False
+
+    global_pf = global_front_pool.pareto_front()
+    global_pf.write_front(csv_global_pf)
 
-    GLOBAL_BOUNDS = {
-        'C_star': np.min(global_arr[:, 0]), 'C_nadir': np.max(global_arr[:, 0]),
-        'M_star': np.min(global_arr[:, 1]), 'M_nadir': np.max(global_arr[:, 1]),
-        'S_star': np.max(global_arr[:, 2]), 'S_nadir': np.min(global_arr[:, 2])
-    }
+    print(f"  各算法前沿池样本总数: {len(global_front_pool)}")
+    print(f"  全局唯一 Pareto Front 数量: {len(global_pf)}")
+
+    GLOBAL_BOUNDS = objective_bounds(global_pf.objectives)
     print(f"  全局极值基准已锁定:")
     print(f"  - Cost (C):    理想基准 {GLOBAL_BOUNDS['C_star']:.2f}, 最差基准 {GLOBAL_BOUNDS['C_nadir']:.2f}")
     print(f"  - Moment (M):  理想基准 {GLOBAL_BOUNDS['M_star']:.2f}, 最差基准 {GLOBAL_BOUNDS['M_nadir']:.2f}")
@@ -356,56 +366,51 @@ def main():
     # 阶段三：使用全局统一基准计算各算法前沿的 phi
     # ==========================================
     print("\n>>> 阶段三：计算公平评价指标 phi 并输出结果...")
-    all_phis = {name: [] for name in algorithms}
     best_results = {
         name: {
             'phi': float('inf'),
-            'front': [],
-            'best_record': None,
+            'best_row': None,
             'best_solution': None,
             'feasible_total': 0,
             'algo_front_size': 0,
         }
         for name in algorithms
     }
+    # 前沿池中全部解的 phi 一次算出, 各算法按掩码取最小值
+    pool_phi = phi_values(global_front_pool.objectives, GLOBAL_BOUNDS)
 
     with open(csv_result, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
         writer.writerow(['Algorithm', 'FeasibleTotal', 'AlgoFrontSize', 'BestCost', 'BestMoment', 'BestStiffness', 'BestPhi'])
 
     for name in algorithms:
-        front_records = algo_front_records[name]
-        front_objs = [r['objectives'] for r in front_records]
-        feasible_total = len(algo_feasible_records[name])
-
-        if front_objs:
-            phi_vals = [_phi_value(obj, GLOBAL_BOUNDS) for obj in front_objs]
-            best_idx = int(np.argmin(phi_vals))
-            best_phi = float(phi_vals[best_idx])
-            best_rec = front_records[best_idx]
-            best_sol = best_rec['objectives']
-
-            all_phis[name].append(best_phi)
+        rows = np.flatnonzero(global_front_pool.mask(name))
+        feasible_total = feasible_totals[name]
+
+        if len(rows):
+            best_row = int(rows[np.argmin(pool_phi[rows])])
+            best_phi = float(pool_phi[best_row])
+            best_sol = global_front_pool.objectives[best_row].tolist()
+
             best_results[name]['phi'] = best_phi
-            best_results[name]['front'] = front_objs
-            best_results[name]['best_record'] = best_rec
+            best_results[name]['best_row'] = best_row
             best_results[name]['best_solution'] = best_sol
             best_results[name]['feasible_total'] = feasible_total
-            best_results[name]['algo_front_size'] = len(front_objs)
+            best_results[name]['algo_front_size'] = len(rows)
 
             with open(csv_result, 'a', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
                 writer.writerow([
-                    name, feasible_total, len(front_objs),
+                    name, feasible_total, len(rows),
                     best_sol[0], best_sol[1], best_sol[2], best_phi
                 ])
 
             with open(csv_best_detail, 'a', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
                 writer.writerow([
-                    name, best_rec['run'], best_rec['solution_idx'],
+                    name, int(global_front_pool.run[best_row]), int(global_front_pool.solution_idx[best_row]),
                     best_phi, best_sol[0], best_sol[1], best_sol[2]
-                ] + list(best_rec['decoded']))
+                ] + global_front_pool.decoded_rows([best_row])[0])
         else:
             with open(csv_result, 'a', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
@@ -426,7 +431,7 @@ def main():
         if res['best_solution'] is None:
             continue
         c, m, s = res['best_solution']
-        rec = res['best_record']
+        row = res['best_row']
         ranking_rows.append({
             'Algorithm': name,
             'BestPhi': res['phi'],
@@ -435,8 +440,8 @@ def main():
             'BestStiffness': s,
             'FeasibleTotal': res['feasible_total'],
             'AlgoFrontSize': res['algo_front_size'],
-            'SourceRun': rec['run'],
-            'SourceSolutionIdx': rec['solution_idx'],
+            'SourceRun': int(global_front_pool.run[row]),
+            'SourceSolutionIdx': int(global_front_pool.solution_idx[row]),
         })
 
     ranking_rows.sort(key=lambda x: x['BestPhi'])
@@ -477,61 +482,200 @@ def main():
                 f"Source(run={row['SourceRun']}, idx={row['SourceSolutionIdx']})"
             )
 
+    # 输出文件索引只列出目录中实际存在的文件 (假设分析等只重跑本阶段的目录没有运行汇总与逐解核查)
+    outputs = [
+        ('BestPhiSummary', '数据(最佳Phi)', CSV_RESULT),
+        ('BestPhiDetailedSample', '数据(最佳样本详情)', CSV_BEST_DETAIL),
+        ('PhiLeaderboardCsv', '数据(Phi排行榜)', CSV_LEADERBOARD),
+        ('PhiLeaderboardText', '报告(Phi排行榜文本)', TXT_LEADERBOARD),
+        ('FeasibilitySummary', '数据(可行性汇总)', CSV_SUMMARY),
+        ('SolutionAuditDetails', '数据(逐解核查)', CSV_DETAIL),
+        ('GlobalParetoFront', '数据(全局前沿)', CSV_GLOBAL_PF),
+    ]
     for name in algorithms:
-        run_summary_file = f"run_summary_{_safe_name(name)}.csv"
-        with open(run_summary_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'Algorithm', 'Run', 'Time(s)', 'FrontSize', 'PopulationSize',
-                'FeasibleCount', 'InfeasibleCount', 'FeasibleRatio',
-                'Fail_Eq24', 'Fail_Eq25', 'Fail_Eq26', 'Fail_Eq29', 'Fail_Eq28', 'Fail_fc', 'Fail_fy'
-            ])
-            for row in run_cache[name]:
-                fc = row['fail_counts']
-                writer.writerow([
-                    name, row['run'] + 1, row['time'], row['front_size'], row['pop_size'],
-                    row['feasible_count'], row['infeasible_count'], row['feasible_ratio'],
-                    fc['Eq24'], fc['Eq25'], fc['Eq26'], fc['Eq29'], fc['Eq28'], fc['fc'], fc['fy']
-                ])
+        outputs += [
+            (f'{name}ParetoFront', f'数据({name}前沿)', f"pareto_front_{_safe_name(name)}.csv"),
+            (f'{name}RunSummary', f'数据({name}运行汇总)', f"run_summary_{_safe_name(name)}.csv"),
+            (f'{name}ParameterTrajectory', f'数据({name}参数轨迹)', f"de_trajectory_{_safe_name(name)}.csv"),
+        ]
+    outputs = [row for row in outputs if os.path.exists(os.path.join(output_dir, row[2]))]
 
-    # ==========================================
-    # 阶段四：调用可视化制图
-    # ==========================================
-    print("\n>>> 阶段四：正在生成统计图表...")
-    plot_box_phi(all_phis)
-
-    for name, res in best_results.items():
-        if res['front']:
-            print(f"生成 {name} 最佳结果图表 (Phi={res['phi']:.4f})...")
-            plot_best_run_3d(name, res['front'])
-            plot_best_run_surface(name, res['front'])
-    print(f"\n所有结果已保存至 {os.getcwd()}")
-    print(f"- 数据(最佳Phi): {csv_result}")
-    print(f"- 数据(最佳样本详情): {csv_best_detail}")
-    print(f"- 数据(Phi排行榜): {csv_leaderboard}")
-    print(f"- 报告(Phi排行榜文本): {txt_leaderboard}")
-    print(f"- 数据(可行性汇总): {csv_summary}")
-    print(f"- 数据(逐解核查): {csv_detail}")
-    print(f"- 数据(全局前沿): {csv_global_pf}")
-    for name in algorithms:
-        print(f"- 数据({name}运行汇总): run_summary_{_safe_name(name)}.csv")
-        print(f"- 数据({name}前沿): pareto_front_{_safe_name(name)}.csv")
-    print(f"- 图表: boxplot_phi.png, best_3d_*.png, best_surface_*.png")
+    print(f"\n所有结果已保存至 {output_dir}")
+    for _, label, file in outputs:
+        print(f"- {label}: {file}")
 
     with open(csv_output_index, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
         writer.writerow(['Category', 'File'])
-        writer.writerow(['BestPhiSummary', csv_result])
-        writer.writerow(['BestPhiDetailedSample', csv_best_detail])
-        writer.writerow(['PhiLeaderboardCsv', csv_leaderboard])
-        writer.writerow(['PhiLeaderboardText', txt_leaderboard])
-        writer.writerow(['FeasibilitySummary', csv_summary])
-        writer.writerow(['SolutionAuditDetails', csv_detail])
-        writer.writerow(['GlobalParetoFront', csv_global_pf])
-        for name in algorithms:
-            writer.writerow([f'{name}ParetoFront', f"pareto_front_{_safe_name(name)}.csv"])
-            writer.writerow([f'{name}RunSummary', f"run_summary_{_safe_name(name)}.csv"])
+        writer.writerows([category, file] for category, _, file in outputs)
+    return True
+
+
+def stage_plot(output_dir, max_points=PLOT_MAX_POINTS, dpi=PLOT_DPI, fmt=PLOT_FORMAT, workers=PLOT_WORKERS):
+    """
+    阶段四: 读取已有输出目录中的 phi 结果与各算法前沿并绘图。
+    前沿先抽稀到 max_points 个点, 各图表在进程池中并行生成。
+    """
+    # 绘图依赖仅在本阶段导入 (visualization 内部强制使用非交互后端)
+    from visualization import plot_box_phi, plot_best_run_3d, plot_best_run_surface, render_figures
+
+    print("\n>>> 阶段四：正在生成统计图表...")
+    best_phis = {}
+    with open(os.path.join(output_dir, CSV_RESULT), newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            if row['BestPhi'] != '':
+                best_phis[row['Algorithm']] = float(row['BestPhi'])
+    style = {'output_dir': output_dir, 'dpi': dpi, 'fmt': fmt}
+    tasks = [(plot_box_phi, ({name: [phi] for name, phi in best_phis.items()},), style)]
+
+    for name, phi in best_phis.items():
+        front = ResultStore.from_csv(os.path.join(output_dir, f"pareto_front_{_safe_name(name)}.csv")).objectives
+        if len(front):
+            print(f"生成 {name} 最佳结果图表 (Phi={phi:.4f}, 前沿解 {len(front)}, 绘图上限 {max_points})...")
+            tasks.append((plot_best_run_3d, (name, front), dict(style, max_points=max_points)))
+            tasks.append((plot_best_run_surface, (name, front), dict(style, max_points=max_points)))
+
+    start_t = time.time()
+    saved = [f for f in render_figures(tasks, workers=workers) if f]
+    print(f"- 图表 ({len(saved)} 张, 用时 {time.time() - start_t:.1f}s): {', '.join(saved)}")
+
+
+def run_campaign(algo_names=None, case=DEFAULT_CASE, n_runs=N_RUNS, output_dir=None, aggregate=True, plot=True,
+                 max_evals=MAX_EVALS, time_limit=TIME_LIMIT, plot_options=None,
+                 refine_every=REFINE_INTERVAL, refine_at_end=REFINE_AT_END, gde3_adapt=GDE3_ADAPT,
+                 init_method=INIT_METHOD, catalog=CATALOG_DB, cluster=None):
+    """
+    完整流程: 阶段一运行 (+ 阶段二/三汇总) (+ 阶段四绘图)。返回输出目录。
+    plot_options 为传给 stage_plot 的关键字参数 (max_points / dpi / fmt / workers)。
+    catalog 为结果目录数据库路径, 设置时运行结束后将输出目录登记到其中。
+    cluster 为 cluster.Coordinator 时, 各代候选交给已连接的工作进程评估 (结果与单机相同)。
+    """
+    algo_names = list(algo_names or ALGORITHMS)
+    print("=== PCS 预制拼装箱梁桥多目标优化系统启动 ===")
+    print(f"跨径: {case.l_span}m, 桥宽: {case.b_top}m")
+    print(f"优化目标: Min Cost, Min Safety(M), Max Structural")
+    if max_evals is not None or time_limit is not None:
+        print(f"预算模式: 最大评估次数={max_evals}, 时间上限={time_limit}s (代替固定代数)")
+    if refine_every or refine_at_end:
+        print(f"梯度局部精修: 每 {refine_every or '-'} 代, 结束时 {'是' if refine_at_end else '否'}, "
+              f"每次 {REFINE_SIZE} 个前沿个体, 标量化 {REFINE_SCALARIZATION}")
+    if cluster is not None:
+        print(f"分布式评估: {cluster.address[0]}:{cluster.address[1]}, 工作进程 {cluster.n_workers} 个")
+    print(f"启动与模块导入耗时: {time.perf_counter() - _T_START:.3f}s")
+    print("-" * 50)
+    
+    # 设置随机种子
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+    # 热启动: 读取历史前沿
+    seed_designs = load_front_designs(SEED_FRONTS, case) if SEED_FRONTS else None
+    if seed_designs:
+        print(f"热启动: 从 {len(SEED_FRONTS)} 个前沿文件载入 {len(seed_designs)} 个设计, "
+              f"初始种群热启动比例 {SEED_FRACTION:.0%}")
+
+    # 每次运行创建独立输出目录，避免文件覆盖
+    if output_dir is None:
+        output_dir = _create_unique_output_dir(os.path.join(os.getcwd(), "outputs"), "run_results")
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+    print(f"输出目录: {output_dir}")
+
+    stage_run(output_dir, algo_names, case=case, n_runs=n_runs, seed_designs=seed_designs,
+              max_evals=max_evals, time_limit=time_limit, refine_every=refine_every, refine_at_end=refine_at_end,
+              gde3_adapt=gde3_adapt, init_method=init_method,
+              evaluate=cluster.evaluate_candidates if cluster is not None else None)
+    if aggregate and stage_aggregate(output_dir) and plot:
+        stage_plot(output_dir, **(plot_options or {}))
+    if catalog:
+        from catalog import record_campaign
+        record_campaign(catalog, output_dir, case)
+    return output_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCS 预制拼装箱梁桥多目标优化")
+    sub = parser.add_subparsers(dest='command')
+
+    p_all = sub.add_parser('all', help="运行全部阶段 (默认)")
+    p_run = sub.add_parser('run', help="运行所选算法 (默认同时汇总, 不绘图)")
+    for p in (p_all, p_run):
+        p.add_argument('--algos', nargs='+', choices=list(ALGORITHMS), default=list(ALGORITHMS),
+                       help="要运行的算法")
+        p.add_argument('--runs', type=int, default=N_RUNS, help="每个算法的重复运行次数")
+        p.add_argument('--output-dir', default=None, help="输出目录 (默认 outputs/run_results_N)")
+        p.add_argument('--max-evals', type=int, default=MAX_EVALS, help="每次运行的最大评估次数 (代替固定代数)")
+        p.add_argument('--time-limit', type=float, default=TIME_LIMIT, help="每次运行的墙钟时间上限 (秒)")
+        p.add_argument('--refine-every', type=int, default=REFINE_INTERVAL, help="每 k 代做一次梯度局部精修")
+        p.add_argument('--refine-at-end', action='store_true', default=REFINE_AT_END, help="运行结束时做一次梯度局部精修")
+        p.add_argument('--gde3-adapt', choices=['fixed', 'jde', 'shade'], default=GDE3_ADAPT,
+                       help="GDE3 的 F/CR 控制方式")
+        p.add_argument('--init', dest='init_method', choices=list(INIT_METHODS), default=INIT_METHOD,
+                       help="初始种群采样方式")
+        p.add_argument('--catalog', default=CATALOG_DB, help="结果目录数据库 (SQLite), 设置时登记本次输出")
+        p.add_argument('--cluster', default=None, metavar='HOST:PORT',
+                       help="监听该地址, 评估交给连接的工作进程 (python cluster.py worker HOST:PORT)")
+        p.add_argument('--cluster-workers', type=int, default=1, help="开始前等待连接的工作进程数")
+    p_run.add_argument('--no-aggregate', action='store_true', help="只运行阶段一")
+    p_run.add_argument('--plot', action='store_true', help="运行结束后绘图")
+
+    p_agg = sub.add_parser('aggregate', help="汇总已有输出目录 (阶段二/三)")
+    p_agg.add_argument('output_dir')
+    p_plot = sub.add_parser('plot', help="为已有输出目录绘图 (阶段四)")
+    p_plot.add_argument('output_dir')
+    for p in (p_all, p_run, p_plot):
+        p.add_argument('--max-points', type=int, default=PLOT_MAX_POINTS, help="每张图的最大点数 (超出时抽稀)")
+        p.add_argument('--dpi', type=int, default=PLOT_DPI, help="位图分辨率 (预览可用 72~100)")
+        p.add_argument('--format', dest='fmt', choices=['png', 'svg', 'pdf'], default=PLOT_FORMAT,
+                       help="图表格式 (svg/pdf 为矢量图)")
+        p.add_argument('--plot-workers', type=int, default=PLOT_WORKERS, help="绘图进程数")
+
+    args = parser.parse_args(argv)
+    command = args.command or 'all'
+    plot_options = {
+        'max_points': getattr(args, 'max_points', PLOT_MAX_POINTS),
+        'dpi': getattr(args, 'dpi', PLOT_DPI),
+        'fmt': getattr(args, 'fmt', PLOT_FORMAT),
+        'workers': getattr(args, 'plot_workers', PLOT_WORKERS),
+    }
+
+    coordinator = None
+    if getattr(args, 'cluster', None):
+        from cluster import Coordinator
+        coordinator = Coordinator(args.cluster)
+        print(f"等待 {args.cluster_workers} 个工作进程连接 {coordinator.address[0]}:{coordinator.address[1]}...")
+        coordinator.wait_for_workers(args.cluster_workers)
+
+    try:
+        _dispatch(command, args, plot_options, coordinator)
+    finally:
+        if coordinator is not None:
+            coordinator.close()
+
+
+def _dispatch(command, args, plot_options, coordinator):
+    if command == 'all':
+        algos = getattr(args, 'algos', None)
+        runs = getattr(args, 'runs', N_RUNS)
+        run_campaign(algos, n_runs=runs, output_dir=getattr(args, 'output_dir', None),
+                     max_evals=getattr(args, 'max_evals', MAX_EVALS),
+                     time_limit=getattr(args, 'time_limit', TIME_LIMIT), plot_options=plot_options,
+                     refine_every=getattr(args, 'refine_every', REFINE_INTERVAL),
+                     refine_at_end=getattr(args, 'refine_at_end', REFINE_AT_END),
+                     gde3_adapt=getattr(args, 'gde3_adapt', GDE3_ADAPT),
+                     init_method=getattr(args, 'init_method', INIT_METHOD),
+                     catalog=getattr(args, 'catalog', CATALOG_DB), cluster=coordinator)
+    elif command == 'run':
+        run_campaign(args.algos, n_runs=args.runs, output_dir=args.output_dir,
+                     aggregate=not args.no_aggregate, plot=args.plot,
+                     max_evals=args.max_evals, time_limit=args.time_limit, plot_options=plot_options,
+                     refine_every=args.refine_every, refine_at_end=args.refine_at_end, gde3_adapt=args.gde3_adapt,
+                     init_method=args.init_method, catalog=args.catalog, cluster=coordinator)
+    elif command == 'aggregate':
+        stage_aggregate(args.output_dir)
+    elif command == 'plot':
+        stage_plot(args.output_dir, **plot_options)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -61,28 +61,25 @@ class SectionProperties:
         
         self.Iz = I_top + I_bot + I_webs
 
-def decode_variables(x_continuous):
+# decode_variables 输出的物理变量名 (CSV 列名)
+DECODED_VAR_NAMES = [
+    'l_seg', 'lbot', 'h', 'ttop', 'tbot', 'tw', 'p_slope',
+    'x1', 'x2', 'x3', 'y1', 'y2',
+    'fc', 'fy', 'dr', 'dp', 'npb', 'npw', 'sigma', 'hp_ratio'
+]
+
+def decode_variables(x_continuous, case=DEFAULT_CASE):
     """
-    将连续优化变量解码为物理变量 (处理离散变量映射)
+    将优化变量解码为物理变量 (离散变量由整数索引映射为取值)
     """
     x = list(x_continuous)
     
-    # 映射离散变量索引
-    # 12: fc
-    idx_fc = int(np.clip(round(x[12]), 0, len(VAL_FC)-1))
-    fc = VAL_FC[idx_fc]
-    
-    # 13: fy
-    idx_fy = int(np.clip(round(x[13]), 0, len(VAL_FY)-1))
-    fy = VAL_FY[idx_fy]
-    
-    # 16: npb
-    idx_npb = int(np.clip(round(x[16]), 0, len(VAL_NPB)-1))
-    npb = VAL_NPB[idx_npb]
-    
-    # 17: npw
-    idx_npw = int(np.clip(round(x[17]), 0, len(VAL_NPW)-1))
-    npw = VAL_NPW[idx_npw]
+    # 映射离散变量索引 12: fc, 13: fy, 16: npb, 17: npw
+    idx_fc, idx_fy, idx_npb, idx_npw = case.discrete_index(x)
+    fc = case.val_fc[idx_fc]
+    fy = case.val_fy[idx_fy]
+    npb = case.val_npb[idx_npb]
+    npw = case.val_npw[idx_npw]
     
     # 其他为连续变量
     dr = x[14]
@@ -94,14 +91,49 @@ def decode_variables(x_continuous):
     # 前12个是几何变量，后面是解码后的物理参数
     return x[:12] + [fc, fy, dr, dp, npb, npw, sigma, hp_ratio]
 
-def calculate_objectives(x_continuous):
+def encode_variables(decoded, case=DEFAULT_CASE):
+    """
+    decode_variables 的逆映射: 将物理变量还原为优化基因
+    离散变量取最接近档位的索引 (兼容来自其他工况/表格的取值)
+    """
+    x = [float(v) for v in decoded]
+    x[12] = int(np.argmin(np.abs(case.fc_table - x[12])))
+    x[13] = int(np.argmin(np.abs(case.fy_table - x[13])))
+    x[16] = int(np.argmin(np.abs(case.npb_table - x[16])))
+    x[17] = int(np.argmin(np.abs(case.npw_table - x[17])))
+    return x
+
+def decode_matrix(X, case=DEFAULT_CASE):
+    """
+    decode_variables 的向量化版本: (N, 20) 基因矩阵 -> (N, 20) 物理变量矩阵
+    离散基因按整数索引查表
+    """
+    P = np.array(X, dtype=float, ndmin=2)
+    for j, table in zip(INT_GENES, (case.fc_table, case.fy_table, case.npb_table, case.npw_table)):
+        idx = np.clip(np.rint(P[:, j]), 0, len(table) - 1).astype(int)
+        P[:, j] = table[idx]
+    return P
+
+def encode_matrix(P, case=DEFAULT_CASE):
+    """
+    encode_variables 的向量化版本: (N, 20) 物理变量矩阵 -> (N, 20) 基因矩阵
+    离散变量取最接近档位的索引
+    """
+    X = np.array(P, dtype=float, ndmin=2)
+    for j, table in zip(INT_GENES, (case.fc_table, case.fy_table, case.npb_table, case.npw_table)):
+        X[:, j] = np.argmin(np.abs(X[:, j, None] - table[None, :]), axis=1)
+    return X
+
+def calculate_objectives(x_continuous, case=DEFAULT_CASE, ec_scale=1.0):
     """
     计算三个目标函数
     返回: (Cost, Safety, Structural)
     注意: 优化器默认最小化，因此需要最大化的目标在返回给优化器前需取负，
     但在本函数中返回原始物理值。
+    ec_scale 为混凝土弹性模量 Ec 的倍数 (可为数组, 用于蒙特卡洛离散性分析)。
     """
-    params = decode_variables(x_continuous)
+    params = decode_variables(x_continuous, case)
+    i_fc, i_fy, _, _ = case.discrete_index(x_continuous)
 
     geo_params = params[:12]
     sec = SectionProperties(geo_params)
@@ -122,19 +154,19 @@ def calculate_objectives(x_continuous):
     theta = np.arctan(sec.p_slope) + np.pi / 2.0
 
     # 论文 Eq(11): 混凝土密度
-    rho_c = fc + 2320
+    rho_c = case.rho_c_table[i_fc]
 
     # 论文 Eq(12): 单节段普通钢筋总长度 lr
     lr = (sec.ltop + sec.lbot + (4 * sec.h) / np.sin(np.pi - theta)) * (2 * sec.l_seg / sr_assumed)
 
     # 论文 Eq(13): 普通钢筋质量 mr
     rho_r = 6170 * (dr / 1000.0)
-    n_segments = L_SPAN / sec.l_seg
+    n_segments = case.l_span / sec.l_seg
     mr = n_segments * lr * rho_r
 
     # 论文 Eq(14): 预应力钢筋质量 mp
     rho_p = 6170 * (dp / 1000.0)
-    mp = (npb + npw) * L_SPAN * rho_p
+    mp = (npb + npw) * case.l_span * rho_p
 
     # 论文 Eq(9): 修正倒角面积和截面总面积 A
     A_chamfers = sec.x1 * sec.y1 + sec.x2 * sec.y1 + sec.x3 * sec.y2
@@ -145,10 +177,10 @@ def calculate_objectives(x_continuous):
     sec.Ac = Ac
 
     # 论文 Eq(15): 成本 C
-    cc = 3 * fc + 255
-    cr = (fy * 0.1 + 15) / 11.0
-    cp = (fy * 0.1 + 15) / 11.0
-    Cost = L_SPAN * Ac * cc + mr * cr + mp * cp
+    cc = case.cc_table[i_fc]
+    cr = case.cr_table[i_fy]
+    cp = case.cp_table[i_fy]
+    Cost = case.l_span * Ac * cc + mr * cr + mp * cp
 
     # 论文 Eq(20): 形心高度 h0
     numerator = sec.ltop * (sec.h ** 2 - (sec.h - sec.ttop) ** 2) + sec.lbot * sec.tbot ** 2 + 2 * sec.tw * ((sec.h - sec.ttop) ** 2 - sec.tbot ** 2)
@@ -156,18 +188,18 @@ def calculate_objectives(x_continuous):
     h0 = numerator / (denominator + 1e-12)
 
     # 论文 Eq(16, 17, 18): 极限弯矩 Mu 与 目标弯矩 M
-    mc = rho_c * Ac * L_SPAN
-    Mu = (mc + mr + mp) * G * L_SPAN
+    mc = rho_c * Ac * case.l_span
+    Mu = (mc + mr + mp) * G * case.l_span
     hp_val = hp_ratio * sec.h
 
     term_p = 0.25 * np.pi * (dp / 1000.0) ** 2 * (sigma * 1e6)
     Mp = term_p * (npb * h0 + npw * (h0 - hp_val))
 
-    alpha = 0.514
+    alpha = case.alpha
     M_val = alpha * Mu - Mp
 
     # 论文 Eq(19, 21, 22): 刚度 S
-    Ec = (-4.375 * fc ** 2 + 612.5 * fc + 15000) * 1e6
+    Ec = case.ec_table[i_fc] * ec_scale
     Er = 2.0e11
 
     # 论文 Eq(19): 等效弹性模量 E (Ar 为单根钢筋面积)
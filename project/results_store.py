@@ -0,0 +1,257 @@
+"""
+列式结果存储 (阶段一 ~ 三的后处理)。
+
+每个可行解占一行: 目标矩阵 (N, 3)、解码变量矩阵 (N, 20) 与算法/运行/解编号整数列。
+矩阵预分配并按倍增扩容; 过滤、非支配排序、phi 计算与导出均为向量化操作,
+不为每个解构造 Python 对象。
+"""
+import csv
+import os
+
+import numpy as np
+
+from case_config import INT_GENES
+from objectives import DECODED_VAR_NAMES
+
+OBJECTIVE_NAMES = ['Cost', 'Moment', 'Stiffness']
+FRONT_HEADER = ['Algorithm', 'Run', 'SolutionIdx'] + OBJECTIVE_NAMES + DECODED_VAR_NAMES
+
+# 支配比较分块的元素上限 (块行数 x N x 3), 控制临时布尔数组的内存
+_PARETO_BLOCK_ELEMS = 1 << 22
+
+
+def pareto_mask(objectives):
+    """
+    第一非支配前沿掩码 (Min Cost, Min Moment, Max Stiffness)。
+    与逐对比较的定义一致: 目标完全相同的解互不支配, 均保留。
+    """
+    obj = np.asarray(objectives, dtype=float).reshape(-1, 3)
+    n = len(obj)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    t = obj * np.array([1.0, 1.0, -1.0])
+    dominated = np.zeros(n, dtype=bool)
+    block = max(1, _PARETO_BLOCK_ELEMS // (3 * n))
+    for start in range(0, n, block):
+        tb = t[start:start + block, None, :]
+        no_worse = (t[None, :, :] <= tb).all(axis=2)
+        better = (t[None, :, :] < tb).any(axis=2)
+        dominated[start:start + block] = (no_worse & better).any(axis=1)
+    return ~dominated
+
+
+def crowding_distance(norm):
+    """NSGA-II 拥挤度距离 (输入为归一化目标矩阵), 各目标边界点为 inf。"""
+    n, m = norm.shape
+    dist = np.zeros(n)
+    for j in range(m):
+        order = np.argsort(norm[:, j], kind='stable')
+        dist[order[0]] = dist[order[-1]] = np.inf
+        dist[order[1:-1]] += norm[order[2:], j] - norm[order[:-2], j]
+    return dist
+
+
+def objective_bounds(objectives):
+    """全局理想点 / 最差点基准 (phi 计算所用的 C/M/S star 与 nadir)。"""
+    arr = np.asarray(objectives, dtype=float)
+    return {
+        'C_star': np.min(arr[:, 0]), 'C_nadir': np.max(arr[:, 0]),
+        'M_star': np.min(arr[:, 1]), 'M_nadir': np.max(arr[:, 1]),
+        'S_star': np.max(arr[:, 2]), 'S_nadir': np.min(arr[:, 2])
+    }
+
+
+def phi_values(objectives, bounds):
+    """main._phi_value 的向量化版本, 逐元素结果与其一致。"""
+    arr = np.asarray(objectives, dtype=float).reshape(-1, 3)
+    range_c = bounds['C_nadir'] - bounds['C_star']
+    range_m = bounds['M_nadir'] - bounds['M_star']
+    range_s = bounds['S_star'] - bounds['S_nadir']
+    range_c = range_c if range_c > 1e-9 else 1.0
+    range_m = range_m if range_m > 1e-9 else 1.0
+    range_s = range_s if range_s > 1e-9 else 1.0
+
+    norm_c = np.maximum(0.0, (arr[:, 0] - bounds['C_star']) / range_c)
+    norm_m = np.maximum(0.0, (arr[:, 1] - bounds['M_star']) / range_m)
+    norm_s = np.maximum(0.0, (bounds['S_star'] - arr[:, 2]) / range_s)
+    return np.sqrt(0.3125 * (norm_c ** 2) + 0.3125 * (norm_m ** 2) + 0.375 * (norm_s ** 2))
+
+
+class ResultStore:
+    def __init__(self, capacity=1024, algorithm_names=()):
+        self.algorithm_names = list(algorithm_names)
+        self._n = 0
+        self._objectives = np.empty((capacity, len(OBJECTIVE_NAMES)))
+        self._decoded = np.empty((capacity, len(DECODED_VAR_NAMES)))
+        self._algorithm = np.empty(capacity, dtype=np.int16)
+        self._run = np.empty(capacity, dtype=np.int32)
+        self._solution_idx = np.empty(capacity, dtype=np.int32)
+
+    def __len__(self):
+        return self._n
+
+    # ---------- 列视图 (只含已写入的行) ----------
+    @property
+    def objectives(self):
+        return self._objectives[:self._n]
+
+    @property
+    def decoded(self):
+        return self._decoded[:self._n]
+
+    @property
+    def algorithm_codes(self):
+        return self._algorithm[:self._n]
+
+    @property
+    def run(self):
+        return self._run[:self._n]
+
+    @property
+    def solution_idx(self):
+        return self._solution_idx[:self._n]
+
+    # ---------- 写入 ----------
+    def _reserve(self, n_new):
+        need = self._n + n_new
+        cap = len(self._objectives)
+        if need <= cap:
+            return
+        cap = max(need, 2 * cap)
+        for name in ('_objectives', '_decoded', '_algorithm', '_run', '_solution_idx'):
+            old = getattr(self, name)
+            new = np.empty((cap,) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def algorithm_code(self, name):
+        if name not in self.algorithm_names:
+            self.algorithm_names.append(name)
+        return self.algorithm_names.index(name)
+
+    def append(self, algorithm, run, solution_idx, objectives, decoded):
+        self._reserve(1)
+        i = self._n
+        self._objectives[i] = objectives
+        self._decoded[i] = decoded
+        self._algorithm[i] = self.algorithm_code(algorithm)
+        self._run[i] = run
+        self._solution_idx[i] = solution_idx
+        self._n += 1
+
+    def extend(self, other):
+        """整块追加另一个存储的全部行 (算法编号按名称重新映射)。"""
+        n = len(other)
+        if n == 0:
+            return
+        self._reserve(n)
+        remap = np.array([self.algorithm_code(name) for name in other.algorithm_names], dtype=np.int16)
+        sl = slice(self._n, self._n + n)
+        self._objectives[sl] = other.objectives
+        self._decoded[sl] = other.decoded
+        self._algorithm[sl] = remap[other.algorithm_codes]
+        self._run[sl] = other.run
+        self._solution_idx[sl] = other.solution_idx
+        self._n += n
+
+    @classmethod
+    def concat(cls, stores):
+        out = cls(capacity=max(1, sum(len(s) for s in stores)))
+        for s in stores:
+            out.extend(s)
+        return out
+
+    # ---------- 过滤 / 排序 ----------
+    def take(self, idx):
+        """按行号 (或布尔掩码) 取子集, 返回新的存储。"""
+        idx = np.flatnonzero(idx) if np.asarray(idx).dtype == bool else np.asarray(idx, dtype=int)
+        out = ResultStore(capacity=max(1, len(idx)), algorithm_names=self.algorithm_names)
+        n = len(idx)
+        out._objectives[:n] = self._objectives[idx]
+        out._decoded[:n] = self._decoded[idx]
+        out._algorithm[:n] = self._algorithm[idx]
+        out._run[:n] = self._run[idx]
+        out._solution_idx[:n] = self._solution_idx[idx]
+        out._n = n
+        return out
+
+    def mask(self, algorithm):
+        if algorithm not in self.algorithm_names:
+            return np.zeros(self._n, dtype=bool)
+        return self.algorithm_codes == self.algorithm_names.index(algorithm)
+
+    def by_algorithm(self, algorithm):
+        return self.take(self.mask(algorithm))
+
+    def pareto_front(self):
+        """第一非支配前沿 (保持原有行顺序)。"""
+        return self.take(pareto_mask(self.objectives))
+
+    def counts(self):
+        """{算法名: 行数}。"""
+        n = np.bincount(self.algorithm_codes, minlength=len(self.algorithm_names))
+        return {name: int(n[i]) for i, name in enumerate(self.algorithm_names)}
+
+    # ---------- 读写 ----------
+    def decoded_rows(self, idx=None):
+        """解码变量转为 CSV 行 (离散档位列保持整数写出)。"""
+        dec = self.decoded if idx is None else self._decoded[:self._n][idx]
+        rows = dec.tolist()
+        for row in rows:
+            for j in INT_GENES:
+                if row[j].is_integer():
+                    row[j] = int(row[j])
+        return rows
+
+    def write_front(self, path):
+        """按 pareto_front_*.csv 的列格式写出全部行。"""
+        names = self.algorithm_names
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(FRONT_HEADER)
+            writer.writerows(
+                [names[a], r, s] + obj + dec
+                for a, r, s, obj, dec in zip(self.algorithm_codes.tolist(), self.run.tolist(),
+                                             self.solution_idx.tolist(), self.objectives.tolist(),
+                                             self.decoded_rows())
+            )
+
+    @classmethod
+    def from_csv(cls, paths, objective_columns=OBJECTIVE_NAMES, decoded_columns=DECODED_VAR_NAMES):
+        """
+        读取一个或多个前沿 CSV (pareto_front_*.csv 格式)。不存在的文件视为空;
+        缺少 Run 列的文件 (如岛屿模型输出) 运行编号记为 0。
+        objective_columns / decoded_columns 为目标与解码变量的列名 (如逐解核查文件的 ObjCost / decoded_*)。
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        store = cls()
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is None:
+                    continue
+                col = {name: i for i, name in enumerate(header)}
+                rows = list(reader)
+            if not rows:
+                continue
+            table = np.array(rows, dtype=object)
+            n = len(rows)
+            store._reserve(n)
+            sl = slice(store._n, store._n + n)
+            store._objectives[sl] = table[:, [col[c] for c in objective_columns]].astype(float)
+            store._decoded[sl] = table[:, [col[c] for c in decoded_columns]].astype(float)
+            names = table[:, col['Algorithm']]
+            uniq, first, inverse = np.unique(names, return_index=True, return_inverse=True)
+            # 新算法名按在文件中首次出现的顺序登记
+            for k in np.argsort(first):
+                store.algorithm_code(str(uniq[k]))
+            remap = np.array([store.algorithm_code(str(u)) for u in uniq], dtype=np.int16)
+            store._algorithm[sl] = remap[inverse]
+            store._run[sl] = table[:, col['Run']].astype(int) if 'Run' in col else 0
+            store._solution_idx[sl] = table[:, col['SolutionIdx']].astype(int)
+            store._n += n
+        return store
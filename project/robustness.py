@@ -0,0 +1,221 @@
+"""
+蒙特卡洛稳健性分析。
+
+前沿设计在名义材料参数下评估。本模块对每个设计抽取大量样本, 考虑:
+- 混凝土弹性模量 Ec 的离散 (乘以 1 + ROBUST_EC_COV * z)
+- 张拉控制应力 sigma、钢筋直径 dr / dp 的离散 (乘性, 变异系数见 case_config)
+- 截面尺寸施工偏差 (长度量加 N(0, ROBUST_GEO_TOL), 腹板斜率比与离散档位不变)
+样本按块 (ROBUST_CHUNK) 送入向量化的 calculate_objectives / constraint_terms,
+统计各目标的均值、标准差、分位数与 Eq28 / Eq29 失效概率。
+
+所有设计使用同一组标准正态样本 (公共随机数), 设计之间的差异不受抽样噪声影响;
+样本总量不大时标准正态块只生成一次并复用。设计按批分配到进程池 (ROBUST_WORKERS),
+由于样本只取决于 (seed, 块号), 并行与串行结果一致。
+
+用法:
+    python robustness.py outputs/run_results --samples 100000
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+from case_config import *
+from constraints import constraint_terms
+from objectives import calculate_objectives, encode_variables
+from results_store import ResultStore, OBJECTIVE_NAMES
+
+DEFAULT_FRONT_FILE = "pareto_front_global.csv"
+DEFAULT_OUTPUT_FILE = "robustness_summary.csv"
+
+# 施加尺寸偏差的长度量基因 (p_slope 为比值, 不加偏差)
+GEO_TOL_GENES = [0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11]
+BAR_GENES = [14, 15]   # dr, dp
+SIGMA_GENE = 18
+# 每个样本的标准正态维数: 尺寸偏差 + 钢筋直径 + sigma + Ec
+N_DRAWS = len(GEO_TOL_GENES) + len(BAR_GENES) + 2
+FAILURE_NAMES = ['Eq28', 'Eq29']
+
+# 乘性因子的下限, 避免极端样本出现非正的模量 / 应力 / 直径
+_MIN_FACTOR = 1e-3
+# 标准正态块缓存的字节数上限; 超出时每个设计重新生成 (结果相同)
+_DRAW_CACHE_BYTES = 1 << 28
+
+
+def scatter_columns(x, Z, ec_cov=ROBUST_EC_COV, sigma_cov=ROBUST_SIGMA_COV,
+                    bar_cov=ROBUST_BAR_COV, geo_tol=ROBUST_GEO_TOL):
+    """
+    单个设计的基因 x 与标准正态块 Z (n, N_DRAWS) -> 逐基因列 (受扰动的基因为长度 n 的数组,
+    离散基因为 int) 与 Ec 倍数数组, 可直接传给 calculate_objectives / constraint_terms。
+    """
+    cols = [float(v) for v in x]
+    k = 0
+    for j in GEO_TOL_GENES:
+        cols[j] = x[j] + geo_tol * Z[:, k]
+        k += 1
+    for j in BAR_GENES:
+        cols[j] = x[j] * np.maximum(1.0 + bar_cov * Z[:, k], _MIN_FACTOR)
+        k += 1
+    cols[SIGMA_GENE] = x[SIGMA_GENE] * np.maximum(1.0 + sigma_cov * Z[:, k], _MIN_FACTOR)
+    ec_scale = np.maximum(1.0 + ec_cov * Z[:, k + 1], _MIN_FACTOR)
+    for j in INT_GENES:
+        cols[j] = int(round(x[j]))
+    return cols, ec_scale
+
+
+def evaluate_block(cols, ec_scale, case=DEFAULT_CASE):
+    """一块样本的目标 (n, 3) 与失效标志 (2, n), 行顺序同 FAILURE_NAMES。"""
+    n = len(ec_scale)
+    c, m, s = calculate_objectives(cols, case, ec_scale=ec_scale)
+    t = constraint_terms(cols, case, ec_scale=ec_scale)
+    F = np.empty((n, 3))
+    F[:, 0], F[:, 1], F[:, 2] = c, m, s
+    fail = np.empty((2, n), dtype=bool)
+    fail[0] = t['deflection'] > t['eq28_limit_deflection']
+    fail[1] = t['Mp'] > t['eq29_limit_Mp']
+    return F, fail
+
+
+def robustness_analysis(genes, case=DEFAULT_CASE, n_samples=ROBUST_SAMPLES, chunk=ROBUST_CHUNK,
+                        seed=SEED, quantiles=ROBUST_QUANTILES, workers=ROBUST_WORKERS, **scatter):
+    """
+    对 genes (D, 20) 中每个设计做 n_samples 次抽样评估。scatter 为 scatter_columns 的离散参数。
+    返回 dict:
+        nominal (D, 3), mean (D, 3), std (D, 3), quantiles (D, Q, 3),
+        p_fail (D, 2) [Eq28, Eq29], p_fail_any (D,)
+    内存占用与设计数无关: 每个设计只保留 (n_samples, 3) 的目标值, 块内临时数组由 chunk 控制。
+    workers=1 或只有一个设计时在当前进程中串行计算。
+    """
+    genes = np.asarray(genes, dtype=float).reshape(-1, NDIM)
+    args = (case, n_samples, chunk, seed, quantiles, scatter)
+    n_proc = min(len(genes), workers or mp.cpu_count())
+    if n_proc <= 1:
+        return _analyse(genes, *args)
+    # 每个进程分到若干批, 批间负载大致均衡
+    batches = np.array_split(genes, min(len(genes), 4 * n_proc))
+    with mp.Pool(processes=n_proc) as pool:
+        parts = pool.starmap(_analyse, [(batch,) + args for batch in batches])
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def _analyse(genes, case, n_samples, chunk, seed, quantiles, scatter):
+    n_designs = len(genes)
+    q = np.asarray(quantiles, dtype=float)
+    blocks = [(start, min(chunk, n_samples - start)) for start in range(0, n_samples, chunk)]
+
+    cache = {} if n_samples * N_DRAWS * 8 <= _DRAW_CACHE_BYTES else None
+
+    def draws(k, n):
+        if cache is not None and k in cache:
+            return cache[k]
+        Z = np.random.default_rng([seed, k]).standard_normal((n, N_DRAWS))
+        if cache is not None:
+            cache[k] = Z
+        return Z
+
+    out = {
+        'nominal': np.empty((n_designs, 3)),
+        'mean': np.empty((n_designs, 3)),
+        'std': np.empty((n_designs, 3)),
+        'quantiles': np.empty((n_designs, len(q), 3)),
+        'p_fail': np.empty((n_designs, len(FAILURE_NAMES))),
+        'p_fail_any': np.empty(n_designs),
+    }
+    values = np.empty((n_samples, 3))
+    for d, x in enumerate(genes):
+        nominal = x.tolist()
+        for j in INT_GENES:
+            nominal[j] = int(round(nominal[j]))
+        out['nominal'][d] = calculate_objectives(nominal, case)
+
+        n_fail = np.zeros(len(FAILURE_NAMES), dtype=np.int64)
+        n_any = 0
+        for k, (start, n) in enumerate(blocks):
+            cols, ec_scale = scatter_columns(x, draws(k, n), **scatter)
+            F, fail = evaluate_block(cols, ec_scale, case)
+            values[start:start + n] = F
+            n_fail += fail.sum(axis=1)
+            n_any += int(fail.any(axis=0).sum())
+
+        out['mean'][d] = values.mean(axis=0)
+        out['std'][d] = values.std(axis=0, ddof=1) if n_samples > 1 else 0.0
+        out['quantiles'][d] = np.quantile(values, q, axis=0)
+        out['p_fail'][d] = n_fail / n_samples
+        out['p_fail_any'][d] = n_any / n_samples
+    return out
+
+
+def _quantile_label(p):
+    return f"Q{100 * p:g}".replace('.', '_')
+
+
+def write_robustness_csv(path, store, result, quantiles=ROBUST_QUANTILES):
+    """每个设计一行: 来源 (Algorithm/Run/SolutionIdx)、各目标的名义值/均值/标准差/分位数与失效概率。"""
+    header = ['Algorithm', 'Run', 'SolutionIdx']
+    stats = ['Nominal', 'Mean', 'Std'] + [_quantile_label(p) for p in quantiles]
+    for name in OBJECTIVE_NAMES:
+        header += [f"{name}_{s}" for s in stats]
+    header += [f"PFail_{name}" for name in FAILURE_NAMES] + ['PFail_Any']
+
+    table = [result['nominal'], result['mean'], result['std']] + \
+        [result['quantiles'][:, i, :] for i in range(len(quantiles))]
+    # (D, 3 目标, 统计量) -> 按目标展开
+    body = np.stack(table, axis=2).reshape(len(store), -1)
+    body = np.hstack([body, result['p_fail'], result['p_fail_any'][:, None]])
+
+    names = store.algorithm_names
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(
+            [names[a], r, s] + row
+            for a, r, s, row in zip(store.algorithm_codes.tolist(), store.run.tolist(),
+                                    store.solution_idx.tolist(), body.tolist())
+        )
+
+
+def store_genes(store, case=DEFAULT_CASE):
+    """前沿存储的解码变量 -> 当前工况下的基因矩阵 (离散取值映射为最接近的档位索引)。"""
+    return np.array([encode_variables(row, case) for row in store.decoded.tolist()], dtype=float)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="前沿设计的蒙特卡洛稳健性分析")
+    parser.add_argument('source', nargs='+', help="前沿 CSV 或含 pareto_front_global.csv 的输出目录")
+    parser.add_argument('--samples', type=int, default=ROBUST_SAMPLES, help="每个设计的样本数")
+    parser.add_argument('--chunk', type=int, default=ROBUST_CHUNK, help="每块样本数")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--workers', type=int, default=ROBUST_WORKERS, help="进程数")
+    parser.add_argument('--limit', type=int, default=None, help="只分析前 N 个设计")
+    parser.add_argument('--ec-cov', type=float, default=ROBUST_EC_COV)
+    parser.add_argument('--sigma-cov', type=float, default=ROBUST_SIGMA_COV)
+    parser.add_argument('--bar-cov', type=float, default=ROBUST_BAR_COV)
+    parser.add_argument('--geo-tol', type=float, default=ROBUST_GEO_TOL)
+    parser.add_argument('-o', '--output', default=None, help=f"输出 CSV (默认写入来源目录的 {DEFAULT_OUTPUT_FILE})")
+    args = parser.parse_args(argv)
+
+    paths = [os.path.join(p, DEFAULT_FRONT_FILE) if os.path.isdir(p) else p for p in args.source]
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        raise FileNotFoundError(f"前沿文件不存在: {', '.join(missing)}")
+    store = ResultStore.from_csv(paths)
+    if args.limit is not None:
+        store = store.take(np.arange(min(args.limit, len(store))))
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(paths[0])), DEFAULT_OUTPUT_FILE)
+
+    print(f"稳健性分析: {len(store)} 个设计 x {args.samples} 个样本", file=sys.stderr)
+    t0 = time.perf_counter()
+    result = robustness_analysis(store_genes(store), n_samples=args.samples, chunk=args.chunk,
+                                 seed=args.seed, workers=args.workers, ec_cov=args.ec_cov, sigma_cov=args.sigma_cov,
+                                 bar_cov=args.bar_cov, geo_tol=args.geo_tol)
+    print(f"完成, 用时 {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    write_robustness_csv(output, store, result)
+    print(f"结果已保存: {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+初始种群采样: 一次调用生成 (N, 20) 基因矩阵。
+
+- uniform: 各基因独立均匀采样
+- lhs:     拉丁超立方, 每个基因的区间等分为 N 层, 每层恰有一个个体
+- sobol:   加扰 Sobol 序列 (按 2 的幂生成后取前 N 个)
+- halton:  加扰 Halton 序列
+
+离散基因 (fc, fy, npb, npw) 由同一单位超立方样本按档位数等分映射为整数索引,
+因此 lhs / sobol / halton 下各档位出现次数也近乎均衡。
+"""
+import random
+
+import numpy as np
+
+from case_config import *
+
+INIT_METHODS = ('uniform', 'lhs', 'sobol', 'halton')
+
+
+def unit_samples(n, d, method=INIT_METHOD, rng=None):
+    """[0, 1)^d 中的 n 个样本 (rng 为 None 时由全局 random 状态派生)。"""
+    if method not in INIT_METHODS:
+        raise ValueError(f"未知初始化方式: {method} (可选 {', '.join(INIT_METHODS)})")
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    if method == 'uniform':
+        return rng.random((n, d))
+    if method == 'lhs':
+        strata = rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T
+        return (strata + rng.random((n, d))) / n
+    # scipy.stats 导入较慢, 只在使用准随机序列时加载
+    from scipy.stats import qmc
+    if method == 'sobol':
+        m = int(np.ceil(np.log2(max(n, 1))))
+        return qmc.Sobol(d, scramble=True, seed=rng).random_base2(m)[:n]
+    return qmc.Halton(d, scramble=True, seed=rng).random(n)
+
+
+def unit_to_genes(U, case=DEFAULT_CASE):
+    """单位超立方样本 (n, NDIM) -> 基因矩阵: 连续基因线性映射, 离散基因按档位数等分取整。"""
+    U = np.asarray(U, dtype=float)
+    low, up = np.array(case.low, dtype=float), np.array(case.up, dtype=float)
+    X = low + U * (up - low)
+    for j in INT_GENES:
+        levels = up[j] - low[j] + 1
+        X[:, j] = low[j] + np.minimum(np.floor(U[:, j] * levels), levels - 1)
+    return X
+
+
+def initial_population(n, case=DEFAULT_CASE, method=INIT_METHOD, rng=None):
+    """
+    生成 n 个个体的基因矩阵 (n, NDIM), 连续基因位于 [low, up], 离散基因为整数档位索引。
+    rng 为 numpy Generator; 为 None 时由全局 random 状态派生, 使 random.seed(SEED) 可复现。
+    """
+    return unit_to_genes(unit_samples(n, NDIM, method, rng), case)
+
+
+def gene_lists(X):
+    """基因矩阵 -> 基因列表 (离散基因转为 int), 供构造 DEAP 个体。"""
+    rows = np.asarray(X, dtype=float).tolist()
+    for row in rows:
+        for j in INT_GENES:
+            row[j] = int(row[j])
+    return rows
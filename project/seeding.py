@@ -0,0 +1,63 @@
+"""
+热启动: 从已有 Pareto 前沿 CSV (pareto_front_global.csv 等, 含 DECODED_VAR_NAMES 列)
+读取解码后的设计，编码回基因后填充初始种群的一部分。
+"""
+import csv
+import random
+
+from case_config import *
+from objectives import encode_variables, DECODED_VAR_NAMES
+
+
+def load_front_designs(paths, case=DEFAULT_CASE):
+    """
+    读取一个或多个前沿 CSV, 返回去重后的基因列表。
+    基因被截断到当前工况的变量范围内 (来源工况的范围可能不同)。
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    low, up = case.low, case.up
+
+    designs = []
+    seen = set()
+    for path in paths:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                try:
+                    decoded = [float(row[name]) for name in DECODED_VAR_NAMES]
+                except (KeyError, ValueError):
+                    continue
+                genes = encode_variables(decoded, case)
+                genes = [min(max(g, lo), hi) for g, lo, hi in zip(genes, low, up)]
+                key = tuple(round(g, 9) for g in genes)
+                if key not in seen:
+                    seen.add(key)
+                    designs.append(genes)
+    return designs
+
+
+def warm_start_genes(pop_size, seeds, case=DEFAULT_CASE, fraction=SEED_FRACTION, jitter=SEED_JITTER):
+    """
+    生成用于替换初始种群前若干个体的基因列表 (长度 <= fraction * pop_size)。
+    每个历史设计先原样使用一次; 名额多于设计数时, 重复使用的副本对连续变量加高斯扰动。
+    seeds 为空时返回空列表, 即完全随机初始化。
+    """
+    if not seeds or fraction <= 0:
+        return []
+    n_seed = min(pop_size, int(round(fraction * pop_size)))
+    if n_seed == 0:
+        return []
+
+    low, up = case.low, case.up
+    chosen = random.sample(seeds, min(n_seed, len(seeds)))
+    out = [list(g) for g in chosen]
+    while len(out) < n_seed:
+        base_genes = random.choice(chosen)
+        genes = list(base_genes)
+        for j in range(NDIM):
+            if j in INT_GENES:
+                continue
+            genes[j] += random.gauss(0.0, jitter * (up[j] - low[j]))
+            genes[j] = min(max(genes[j], low[j]), up[j])
+        out.append(genes)
+    return out
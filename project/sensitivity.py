@@ -0,0 +1,211 @@
+"""
+全局敏感性分析: 20 个设计变量对三个目标与各连续约束裕度的影响。
+
+- Sobol 指数: Saltelli 采样 (加扰 Sobol 序列生成 A / B 两组基样本, 第 i 个矩阵 AB_i 取 A 并以 B 的第 i 列替换),
+  一阶指数用 Saltelli (2010) 估计量, 总效应指数用 Jansen 估计量; 置信区间为逐样本项的 1.96 倍标准误。
+- Morris 筛选: R 条 p 层网格上的一次一因子轨迹, 输出初等效应的 mu、mu* (绝对值均值) 与 sigma。
+
+变量在 case_config 的取值范围 (case.low / case.up) 内均匀取值, 离散基因按档位数等分映射 (同 sampling.unit_to_genes)。
+评估使用 refine.batch_objectives (按离散组合分组的向量化目标/约束计算), 基因矩阵按 SENS_CHUNK 行分块送入进程池。
+
+用法:
+    python sensitivity.py --method both -o sensitivity_indices.csv
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import sys
+import time
+
+import numpy as np
+
+from case_config import *
+from constraints import MARGIN_NAMES
+from objectives import DECODED_VAR_NAMES
+from results_store import OBJECTIVE_NAMES
+from sampling import unit_samples, unit_to_genes
+from algorithms.refine import batch_objectives
+
+# 输出列: 三个目标 (刚度取原值, 不取负) + 各约束裕度
+OUTPUT_NAMES = OBJECTIVE_NAMES + MARGIN_NAMES
+INDEX_HEADER = ['Output', 'Rank', 'Variable', 'S1', 'S1Conf', 'ST', 'STConf', 'MuStar', 'Mu', 'Sigma']
+
+
+def evaluate_outputs(X, case=DEFAULT_CASE):
+    """基因矩阵 (N, 20) -> 输出矩阵 (N, len(OUTPUT_NAMES))。"""
+    F, G = batch_objectives(X, case)
+    F[:, 2] = -F[:, 2]
+    return np.hstack([F, G])
+
+
+class BatchEvaluator:
+    """
+    分块评估基因矩阵, 多进程时各块在进程池中并行计算 (结果顺序不变)。
+    以上下文管理器使用, 进程池在整个分析期间复用。
+    """
+    def __init__(self, case=DEFAULT_CASE, chunk=SENS_CHUNK, workers=SENS_WORKERS):
+        self.case = case
+        self.chunk = chunk
+        self.workers = workers or mp.cpu_count()
+        self.evaluations = 0
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = mp.Pool(processes=self.workers)
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __call__(self, X):
+        X = np.asarray(X, dtype=float)
+        self.evaluations += len(X)
+        # 并行时块数至少为进程数, 避免只用到部分进程
+        size = self.chunk if self._pool is None else \
+            max(1, min(self.chunk, -(-len(X) // self.workers)))
+        tasks = [(X[start:start + size], self.case) for start in range(0, len(X), size)]
+        if self._pool is None or len(tasks) == 1:
+            parts = [evaluate_outputs(*task) for task in tasks]
+        else:
+            parts = self._pool.starmap(evaluate_outputs, tasks)
+        return np.vstack(parts)
+
+
+def sobol_indices(evaluator, case=DEFAULT_CASE, n=SENS_SOBOL_N, seed=SEED):
+    """
+    Saltelli 采样估计一阶 / 总效应 Sobol 指数, 共 n * (NDIM + 2) 次评估。
+    返回 dict: S1, S1_conf, ST, ST_conf, 形状均为 (NDIM, len(OUTPUT_NAMES))。
+    方差为 0 的输出 (如常数约束) 指数记为 nan。
+    """
+    U = unit_samples(n, 2 * NDIM, 'sobol', np.random.default_rng(seed))
+    UA, UB = U[:, :NDIM], U[:, NDIM:]
+    YA = evaluator(unit_to_genes(UA, case))
+    YB = evaluator(unit_to_genes(UB, case))
+    var = np.var(np.vstack([YA, YB]), axis=0)
+    var = np.where(var > 0, var, np.nan)
+
+    shape = (NDIM, len(OUTPUT_NAMES))
+    out = {key: np.empty(shape) for key in ('S1', 'S1_conf', 'ST', 'ST_conf')}
+    for i in range(NDIM):
+        UABi = UA.copy()
+        UABi[:, i] = UB[:, i]
+        YABi = evaluator(unit_to_genes(UABi, case))
+        first = YB * (YABi - YA) / var
+        total = 0.5 * (YA - YABi) ** 2 / var
+        out['S1'][i] = first.mean(axis=0)
+        out['ST'][i] = total.mean(axis=0)
+        out['S1_conf'][i] = 1.96 * first.std(axis=0, ddof=1) / np.sqrt(n)
+        out['ST_conf'][i] = 1.96 * total.std(axis=0, ddof=1) / np.sqrt(n)
+    return out
+
+
+def morris_screening(evaluator, case=DEFAULT_CASE, r=SENS_MORRIS_R, levels=SENS_MORRIS_LEVELS, seed=SEED):
+    """
+    Morris 初等效应筛选, 共 r * (NDIM + 1) 次评估。
+    每条轨迹从 p 层网格上的随机基点出发, 按随机顺序每次改变一个变量 ±delta (向区间内侧)。
+    返回 dict: mu, mu_star, sigma, 形状均为 (NDIM, len(OUTPUT_NAMES))。
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+    base = rng.integers(0, levels, size=(r, NDIM)) / (levels - 1)
+    step = np.where(base + delta <= 1.0, delta, -delta)
+    order = np.argsort(rng.random((r, NDIM)), axis=1)
+    rows = np.arange(r)
+
+    T = np.empty((r, NDIM + 1, NDIM))
+    T[:, 0] = base
+    for k in range(NDIM):
+        T[:, k + 1] = T[:, k]
+        T[rows, k + 1, order[:, k]] += step[rows, order[:, k]]
+    Y = evaluator(unit_to_genes(T.reshape(-1, NDIM), case)).reshape(r, NDIM + 1, -1)
+
+    # 第 k 步改变的是变量 order[:, k]
+    dY = (Y[:, 1:] - Y[:, :-1]) / np.take_along_axis(step, order, axis=1)[:, :, None]
+    EE = np.empty_like(dY)
+    EE[rows[:, None], order] = dY
+    return {
+        'mu': EE.mean(axis=0),
+        'mu_star': np.abs(EE).mean(axis=0),
+        'sigma': EE.std(axis=0, ddof=1) if r > 1 else np.zeros(EE.shape[1:]),
+    }
+
+
+def ranked_tables(sobol=None, morris=None):
+    """
+    每个输出一张按重要性降序排列的表 (有 Sobol 结果时按 ST, 否则按 Morris mu*)。
+    返回 {输出名: [INDEX_HEADER 行, ...]}; 缺少的指数列留空。
+    """
+    nan = np.full((NDIM, len(OUTPUT_NAMES)), np.nan)
+    s = sobol or {key: nan for key in ('S1', 'S1_conf', 'ST', 'ST_conf')}
+    m = morris or {key: nan for key in ('mu', 'mu_star', 'sigma')}
+    key = s['ST'] if sobol is not None else m['mu_star']
+
+    tables = {}
+    for o, name in enumerate(OUTPUT_NAMES):
+        # nan (零方差输出) 排在最后
+        order = np.argsort(np.where(np.isnan(key[:, o]), -np.inf, key[:, o]), kind='stable')[::-1]
+        rows = []
+        for rank, i in enumerate(order, start=1):
+            vals = [s['S1'][i, o], s['S1_conf'][i, o], s['ST'][i, o], s['ST_conf'][i, o],
+                    m['mu_star'][i, o], m['mu'][i, o], m['sigma'][i, o]]
+            rows.append([name, rank, DECODED_VAR_NAMES[i]] + ['' if np.isnan(v) else float(v) for v in vals])
+        tables[name] = rows
+    return tables
+
+
+def write_tables(path, tables):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(INDEX_HEADER)
+        for rows in tables.values():
+            writer.writerows(rows)
+
+
+def _cell(value, width, spec):
+    return f"{'-':>{width}}" if value == '' else f"{value:>{width}{spec}}"
+
+
+def print_tables(tables, top=5, file=sys.stdout):
+    """打印每个输出的前 top 个变量。"""
+    for name, rows in tables.items():
+        print(f"\n[{name}]", file=file)
+        print(f"{'Rank':>4}  {'Variable':<10}{'S1':>9}{'ST':>9}{'MuStar':>12}", file=file)
+        for row in rows[:top]:
+            print(f"{row[1]:>4}  {row[2]:<10}{_cell(row[3], 9, '.3f')}{_cell(row[5], 9, '.3f')}"
+                  f"{_cell(row[7], 12, '.3g')}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="设计变量全局敏感性分析 (Sobol / Morris)")
+    parser.add_argument('--method', choices=['sobol', 'morris', 'both'], default='both')
+    parser.add_argument('-n', type=int, default=SENS_SOBOL_N, help="Saltelli 基样本数 N")
+    parser.add_argument('--trajectories', type=int, default=SENS_MORRIS_R, help="Morris 轨迹数 R")
+    parser.add_argument('--levels', type=int, default=SENS_MORRIS_LEVELS, help="Morris 网格层数 p")
+    parser.add_argument('--chunk', type=int, default=SENS_CHUNK)
+    parser.add_argument('--workers', type=int, default=SENS_WORKERS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--top', type=int, default=5, help="每个输出打印的变量数")
+    parser.add_argument('-o', '--output', default='sensitivity_indices.csv')
+    args = parser.parse_args(argv)
+
+    sobol = morris = None
+    t0 = time.perf_counter()
+    with BatchEvaluator(DEFAULT_CASE, chunk=args.chunk, workers=args.workers) as evaluator:
+        if args.method in ('sobol', 'both'):
+            sobol = sobol_indices(evaluator, n=args.n, seed=args.seed)
+        if args.method in ('morris', 'both'):
+            morris = morris_screening(evaluator, r=args.trajectories, levels=args.levels, seed=args.seed)
+    print(f"完成 {evaluator.evaluations} 次评估, 用时 {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+
+    tables = ranked_tables(sobol, morris)
+    print_tables(tables, top=args.top)
+    write_tables(args.output, tables)
+    print(f"\n结果已保存: {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+本地优化服务: 常驻进程在 localhost HTTP 端口上接收作业规格, 排队后交给预热的工作进程执行。
+
+工作进程启动时导入全部算法模块 (DEAP) 与绘图模块 (matplotlib), 之后的作业不再付出解释器启动与导入开销。
+每个作业在一个工作进程中调用 main.run_campaign, 输出目录在提交时以绝对路径确定并显式传入,
+不改变任何进程的当前目录, 多个作业可在同一服务中并行。作业的控制台输出按行转为进度事件。
+
+接口 (JSON):
+    POST /jobs               提交作业, 返回作业状态 (含 id 与输出目录)
+    GET  /jobs               全部作业状态
+    GET  /jobs/<id>          单个作业状态; 完成后含输出文件列表
+    GET  /jobs/<id>/events   逐行 (NDJSON) 推送进度事件, 作业结束后关闭连接; ?since=k 跳过前 k 个事件
+
+作业规格 (字段均可省略, 默认值同 main.py):
+    {"algos": ["NSGA-II", "GDE3"], "runs": 3, "case": {"l_span": 90.0}, "max_evals": 20000,
+     "time_limit": null, "init": "lhs", "gde3_adapt": "fixed", "refine_every": null,
+     "refine_at_end": false, "aggregate": true, "plot": false, "output_dir": null}
+
+用法:
+    python service.py serve --port 8765 --workers 2
+    python service.py submit --algos NSGA-II GDE3 --runs 3 --case l_span=90 --follow
+    python service.py status [job_id]
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from case_config import *
+from sampling import INIT_METHODS
+from algorithms import ALGORITHMS, get_runner
+from algorithms.de_control import DE_CONTROLS
+
+JOB_DEFAULTS = {
+    'algos': None,
+    'runs': N_RUNS,
+    'case': {},
+    'max_evals': MAX_EVALS,
+    'time_limit': TIME_LIMIT,
+    'init': INIT_METHOD,
+    'gde3_adapt': GDE3_ADAPT,
+    'refine_every': REFINE_INTERVAL,
+    'refine_at_end': REFINE_AT_END,
+    'aggregate': True,
+    'plot': False,
+    'output_dir': None,
+}
+FINISHED = ('done', 'failed')
+
+
+def campaign_kwargs(spec, output_dir):
+    """校验作业规格并转换为 main.run_campaign 的关键字参数。"""
+    unknown = sorted(set(spec) - set(JOB_DEFAULTS))
+    if unknown:
+        raise ValueError(f"未知作业字段: {', '.join(unknown)}")
+    s = dict(JOB_DEFAULTS, **spec)
+    algos = list(s['algos'] or ALGORITHMS)
+    for name in algos:
+        if name not in ALGORITHMS:
+            raise ValueError(f"未知算法: {name} (可选 {', '.join(ALGORITHMS)})")
+    if s['init'] not in INIT_METHODS:
+        raise ValueError(f"未知初始化方式: {s['init']} (可选 {', '.join(INIT_METHODS)})")
+    if s['gde3_adapt'] not in DE_CONTROLS:
+        raise ValueError(f"未知 DE 参数控制方式: {s['gde3_adapt']} (可选 {', '.join(DE_CONTROLS)})")
+    return {
+        'algo_names': algos,
+        'case': make_case(s['case']),
+        'n_runs': int(s['runs']),
+        'output_dir': output_dir,
+        'aggregate': bool(s['aggregate']),
+        'plot': bool(s['plot']),
+        'max_evals': s['max_evals'],
+        'time_limit': s['time_limit'],
+        'refine_every': s['refine_every'],
+        'refine_at_end': bool(s['refine_at_end']),
+        'gde3_adapt': s['gde3_adapt'],
+        'init_method': s['init'],
+    }
+
+
+# ---------- 工作进程 ----------
+class _EventStream(io.TextIOBase):
+    """把作业的控制台输出按行转为 'log' 事件。"""
+    def __init__(self, job_id, events):
+        self.job_id = job_id
+        self.events = events
+        self._buf = ''
+
+    def write(self, text):
+        self._buf += text
+        *lines, self._buf = self._buf.split('\n')
+        for line in lines:
+            self.events.put((self.job_id, 'log', {'line': line}))
+        return len(text)
+
+    def flush(self):
+        if self._buf:
+            self.events.put((self.job_id, 'log', {'line': self._buf}))
+            self._buf = ''
+
+
+def _worker_loop(tasks, events):
+    # Ctrl-C 只由服务进程处理, 工作进程完成已排队作业后按停止标记退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # 预热: 导入全部算法与绘图依赖
+    import main
+    for name in ALGORITHMS:
+        get_runner(name)
+    import visualization
+    events.put((None, 'ready', {'pid': os.getpid()}))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, kwargs = task
+        events.put((job_id, 'started', {'pid': os.getpid()}))
+        stream = _EventStream(job_id, events)
+        try:
+            with contextlib.redirect_stdout(stream):
+                output_dir = main.run_campaign(**kwargs)
+            stream.flush()
+            events.put((job_id, 'done', {'files': sorted(os.listdir(output_dir))}))
+        except Exception:
+            stream.flush()
+            events.put((job_id, 'failed', {'error': traceback.format_exc()}))
+
+
+# ---------- 服务 ----------
+class OptimizationService:
+    """
+    作业表、任务队列与常驻工作进程。
+    作业按提交顺序排队, 空闲的工作进程依次领取; 事件由监听线程汇总到作业记录中。
+    监听线程同时每 SERVICE_POLL 秒检查工作进程存活: 未抛出异常而退出的进程 (OOM、崩溃、被杀)
+    其正在执行的作业记为失败, 并启动新的工作进程替代。
+    """
+    def __init__(self, workers=SERVICE_WORKERS, output_root=None):
+        self.output_root = os.path.abspath(output_root or os.path.join(os.getcwd(), "outputs"))
+        self.jobs = {}
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._tasks = mp.Queue()
+        self._events = mp.Queue()
+        self._running = {}      # 工作进程 pid -> 正在执行的作业 id
+        self._closing = False
+        self._workers = [self._start_worker() for _ in range(workers or mp.cpu_count())]
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def _start_worker(self):
+        # 非守护进程: 作业中的绘图阶段还需创建自己的进程池
+        p = mp.Process(target=_worker_loop, args=(self._tasks, self._events))
+        p.start()
+        return p
+
+    def _listen(self):
+        while True:
+            try:
+                item = self._events.get(timeout=SERVICE_POLL)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            with self._cond:
+                if item:
+                    self._record(*item)
+                self._check_workers()
+                self._cond.notify_all()
+
+    def _record(self, job_id, kind, data):
+        if job_id is None:
+            print(f"工作进程 {data['pid']} 已就绪", file=sys.stderr)
+            return
+        job = self.jobs[job_id]
+        # 工作进程异常退出后作业已记为失败, 其管道中残留的事件不再记录
+        if job['status'] in FINISHED:
+            return
+        event = dict(data, seq=len(job['events']), type=kind, time=time.time())
+        job['events'].append(event)
+        if kind == 'started':
+            self._running[data['pid']] = job_id
+        if kind in ('started',) + FINISHED:
+            job['status'] = 'running' if kind == 'started' else kind
+            job[kind if kind == 'started' else 'finished'] = event['time']
+            if kind == 'done':
+                job['files'] = data['files']
+            elif kind == 'failed':
+                job['error'] = data['error']
+        if kind in FINISHED:
+            self._running = {pid: j for pid, j in self._running.items() if j != job_id}
+
+    def _check_workers(self):
+        """异常退出的工作进程: 其作业记为失败, 并启动新进程替代 (服务停止期间正常退出的除外)。"""
+        if self._closing or all(p.is_alive() for p in self._workers):
+            return
+        # 先记录已到达的事件, 以便得知退出的进程当时正在执行哪个作业
+        while True:
+            try:
+                item = self._events.get_nowait()
+            except queue.Empty:
+                break
+            self._record(*item)
+        for i, p in enumerate(self._workers):
+            if p.is_alive():
+                continue
+            p.join()
+            job_id = self._running.pop(p.pid, None)
+            message = f"工作进程 {p.pid} 异常退出 (退出码 {p.exitcode})"
+            print(message + (f", 作业 {job_id} 记为失败" if job_id is not None else "") + ", 正在重启",
+                  file=sys.stderr)
+            if job_id is not None:
+                self._record(job_id, 'failed', {'error': message})
+            self._workers[i] = self._start_worker()
+
+    def submit(self, spec):
+        """校验规格、确定输出目录并入队, 返回作业状态。规格无效或输出目录正被未结束的作业使用时抛出 ValueError。"""
+        with self._cond:
+            job_id = self._next_id
+            kwargs = campaign_kwargs(spec, None)
+            if spec.get('output_dir'):
+                output_dir = self._output_dir(spec['output_dir'])
+            else:
+                from main import _create_unique_output_dir
+                output_dir = _create_unique_output_dir(self.output_root, f"job_{job_id}")
+            kwargs['output_dir'] = os.path.abspath(output_dir)
+            # 同一目录上并行的作业会互相覆盖输出文件
+            for job in self.jobs.values():
+                if job['output_dir'] == kwargs['output_dir'] and job['status'] not in FINISHED:
+                    raise ValueError(f"output_dir 正被作业 {job['id']} 使用: {spec['output_dir']}")
+            self._next_id += 1
+            self.jobs[job_id] = {
+                'id': job_id, 'status': 'queued', 'spec': spec, 'output_dir': kwargs['output_dir'],
+                'submitted': time.time(), 'started': None, 'finished': None,
+                'files': None, 'error': None, 'events': [],
+            }
+            self._tasks.put((job_id, kwargs))
+            return self.status(job_id)
+
+    def _output_dir(self, relative):
+        """规格中的 output_dir (相对输出根目录) -> 绝对路径; 绝对路径或经 .. 跳出根目录时抛出 ValueError。"""
+        root = os.path.realpath(self.output_root)
+        path = os.path.realpath(os.path.join(root, str(relative)))
+        if os.path.isabs(str(relative)) or os.path.commonpath([root, path]) != root or path == root:
+            raise ValueError(f"output_dir 必须是输出根目录下的相对路径: {relative}")
+        return path
+
+    def status(self, job_id=None):
+        with self._cond:
+            if job_id is None:
+                return [self.status(i) for i in self.jobs]
+            if job_id not in self.jobs:
+                raise KeyError(job_id)
+            job = self.jobs[job_id]
+            return dict({k: v for k, v in job.items() if k != 'events'}, n_events=len(job['events']))
+
+    def events(self, job_id, since=0):
+        """
+        作业事件的迭代器: 依次产出事件, 阻塞等待新事件, 作业结束后停止。
+        作业不存在时立即抛出 KeyError (在发送响应头之前)。
+        """
+        with self._cond:
+            if job_id not in self.jobs:
+                raise KeyError(job_id)
+            job = self.jobs[job_id]
+        return self._follow(job, since)
+
+    def _follow(self, job, since):
+        k = since
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(job['events']) > k or job['status'] in FINISHED)
+                batch = job['events'][k:]
+                finished = job['status'] in FINISHED
+            yield from batch
+            k += len(batch)
+            if finished and k >= len(job['events']):
+                return
+
+    def close(self):
+        """等待已排队作业完成后停止工作进程。"""
+        with self._cond:
+            self._closing = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._tasks.put(None)
+        for p in workers:
+            p.join()
+        self._events.put(None)
+        self._listener.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _send_json(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        if not parts or parts[0] != 'jobs' or len(parts) > 3:
+            return None, None, url
+        job_id = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        if len(parts) > 1 and job_id is None:
+            return None, None, url
+        return job_id, parts[2] if len(parts) == 3 else '', url
+
+    def do_GET(self):
+        service = self.server.service
+        job_id, action, url = self._route()
+        try:
+            if action is None or action not in ('', 'events'):
+                self._send_json(404, {'error': f"未知路径: {url.path}"})
+            elif job_id is None:
+                self._send_json(200, service.status())
+            elif action == '':
+                self._send_json(200, service.status(job_id))
+            else:
+                since = int(parse_qs(url.query).get('since', ['0'])[0])
+                events = service.events(job_id, since)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+                self.end_headers()
+                for event in events:
+                    self.wfile.write((json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8'))
+                    self.wfile.flush()
+        except KeyError:
+            self._send_json(404, {'error': f"作业不存在: {job_id}"})
+
+    def do_POST(self):
+        job_id, action, url = self._route()
+        if action != '' or job_id is not None:
+            self._send_json(404, {'error': f"未知路径: {url.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(spec, dict):
+                raise ValueError("作业规格应为 JSON 对象")
+            self._send_json(201, self.server.service.submit(spec))
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+
+    def log_message(self, fmt, *args):
+        print(f"[{self.log_date_time_string()}] {fmt % args}", file=sys.stderr)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, output_root=None):
+    service = OptimizationService(workers, output_root)
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    # SIGTERM 与 Ctrl-C 相同: 停止接收请求, 等待已排队作业完成后退出
+    signal.signal(signal.SIGTERM, _interrupt)
+    print(f"优化服务已启动: http://{host}:{server.server_port}, 工作进程 {len(service._workers)} 个, "
+          f"输出根目录 {service.output_root}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("正在停止服务 (等待已排队作业完成)...", file=sys.stderr)
+        service.close()
+
+
+# ---------- 客户端 ----------
+def _request(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        raise SystemExit(f"请求失败 ({e.code}): {json.loads(e.read()).get('error')}")
+
+
+def follow(base_url, job_id, file=sys.stdout):
+    """打印作业进度直到结束, 返回最后一个事件。"""
+    last = None
+    with urllib.request.urlopen(f"{base_url}/jobs/{job_id}/events") as resp:
+        for line in resp:
+            last = json.loads(line)
+            if last['type'] == 'log':
+                print(last['line'], file=file)
+            elif last['type'] == 'failed':
+                print(last['error'], file=file)
+    return last
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地优化服务 (常驻进程 + 预热工作进程池)")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_serve = sub.add_parser('serve', help="启动服务")
+    p_serve.add_argument('--workers', type=int, default=SERVICE_WORKERS, help="工作进程数 (可并行的作业数)")
+    p_serve.add_argument('--output-root', default=None, help="作业输出根目录 (默认 ./outputs)")
+
+    p_submit = sub.add_parser('submit', help="提交作业")
+    p_submit.add_argument('--algos', nargs='+', choices=list(ALGORITHMS), default=None)
+    p_submit.add_argument('--runs', type=int, default=N_RUNS)
+    p_submit.add_argument('--case', nargs='+', default=[], metavar='FIELD=VALUE', help="工况字段覆盖 (值按 JSON 解析)")
+    p_submit.add_argument('--max-evals', type=int, default=MAX_EVALS)
+    p_submit.add_argument('--time-limit', type=float, default=TIME_LIMIT)
+    p_submit.add_argument('--init', choices=list(INIT_METHODS), default=INIT_METHOD)
+    p_submit.add_argument('--gde3-adapt', choices=list(DE_CONTROLS), default=GDE3_ADAPT)
+    p_submit.add_argument('--refine-every', type=int, default=REFINE_INTERVAL)
+    p_submit.add_argument('--refine-at-end', action='store_true', default=REFINE_AT_END)
+    p_submit.add_argument('--no-aggregate', action='store_true')
+    p_submit.add_argument('--plot', action='store_true')
+    p_submit.add_argument('--output-dir', default=None, help="相对服务输出根目录的子目录")
+    p_submit.add_argument('--follow', action='store_true', help="提交后跟踪进度直到作业结束")
+
+    p_status = sub.add_parser('status', help="查询作业状态")
+    p_status.add_argument('job_id', nargs='?', type=int)
+
+    args = parser.parse_args(argv)
+    base_url = f"http://{args.host}:{args.port}"
+
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers, args.output_root)
+    elif args.command == 'submit':
+        spec = {
+            'algos': args.algos, 'runs': args.runs,
+            'case': dict((kv.split('=', 1)[0], _parse_value(kv.split('=', 1)[1])) for kv in args.case),
+            'max_evals': args.max_evals, 'time_limit': args.time_limit, 'init': args.init,
+            'gde3_adapt': args.gde3_adapt, 'refine_every': args.refine_every, 'refine_at_end': args.refine_at_end,
+            'aggregate': not args.no_aggregate, 'plot': args.plot, 'output_dir': args.output_dir,
+        }
+        job = _request(f"{base_url}/jobs", spec)
+        print(f"作业 {job['id']} 已提交, 输出目录: {job['output_dir']}", file=sys.stderr)
+        if args.follow:
+            last = follow(base_url, job['id'])
+            print(f"作业 {job['id']} {last['type'] if last else '?'}: {job['output_dir']}", file=sys.stderr)
+    else:
+        path = "/jobs" if args.job_id is None else f"/jobs/{args.job_id}"
+        print(json.dumps(_request(base_url + path), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
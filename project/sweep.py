@@ -0,0 +1,234 @@
+"""
+多工况参数扫描。
+
+SWEEP_GRID 中的 CaseConfig 字段 (跨径 l_span、alpha、单价、挠度限值 deflection_ratio 等) 做网格组合，
+每个组合为一个工况。桥宽 b_top 与应力限值字段未进入目标/约束计算 (case_config.UNMODELLED_FIELDS),
+不能作为扫描字段。全部 "工况 × 算法 × 运行次数" 作业提交到同一个进程池，
+工作进程常驻复用，工况对象随作业显式传入。
+每个工况输出一个子目录 (各算法前沿、全局前沿、phi 排行、运行汇总)，
+另输出跨工况汇总表 sweep_summary.csv。
+"""
+import contextlib
+import csv
+import itertools
+import os
+import random
+import time
+import multiprocessing as mp
+from dataclasses import fields, replace
+
+import numpy as np
+
+from case_config import *
+from constraints import check_constraints
+from objectives import decode_variables, calculate_objectives, DECODED_VAR_NAMES
+from algorithms import ALGORITHMS, get_runner
+from main import _pareto_indices, _phi_value, _safe_name, _create_unique_output_dir
+
+
+def case_grid(grid=None, base=DEFAULT_CASE):
+    """
+    将 {CaseConfig 字段名: [取值, ...]} 展开为 CaseConfig 工况列表。
+    未知字段或未进入模型的字段 (UNMODELLED_FIELDS) 抛出 ValueError, 以免生成结果完全相同的重复工况。
+    """
+    grid = grid or SWEEP_GRID
+    keys = list(grid)
+    names = {f.name for f in fields(base)}
+    unknown = [k for k in keys if k not in names]
+    if unknown:
+        raise ValueError(f"未知工况字段: {', '.join(unknown)}")
+    unmodelled = [k for k in keys if k in UNMODELLED_FIELDS]
+    if unmodelled:
+        raise ValueError(f"工况字段 {', '.join(unmodelled)} 未进入目标/约束计算, 扫描只会得到相同的结果")
+    return [replace(base, **dict(zip(keys, values))) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def case_overrides(case, base=DEFAULT_CASE):
+    """返回工况相对 base 改动过的字段 {字段名: 取值}。"""
+    return {f.name: getattr(case, f.name) for f in fields(case)
+            if getattr(case, f.name) != getattr(base, f.name)}
+
+
+def case_label(idx, case):
+    parts = [f"{k}{v:g}" if isinstance(v, (int, float)) else k for k, v in case_overrides(case).items()]
+    return f"case_{idx:02d}" + "".join("_" + p for p in parts)
+
+
+def _run_job(job):
+    """工作进程入口: 运行单个 (工况, 算法, 运行) 作业并返回可行解记录。"""
+    case_idx, case, algo_name, run, seed = job
+
+    algo_func = get_runner(algo_name)
+
+    random.seed(seed)
+    np.random.seed(seed)
+    start_t = time.time()
+    _, population = algo_func(case=case)
+    duration = time.time() - start_t
+
+    feasible = []
+    for idx, ind in enumerate(population):
+        if check_constraints(ind, case=case) > 0:
+            continue
+        feasible.append({
+            'algorithm': algo_name,
+            'run': run + 1,
+            'solution_idx': idx,
+            'objectives': calculate_objectives(ind, case),
+            'decoded': decode_variables(ind, case),
+        })
+
+    return {
+        'case_idx': case_idx,
+        'algorithm': algo_name,
+        'run': run + 1,
+        'time': duration,
+        'pop_size': len(population),
+        'feasible': feasible,
+    }
+
+
+def _write_front(path, records):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Algorithm', 'Run', 'SolutionIdx', 'Cost', 'Moment', 'Stiffness'] + DECODED_VAR_NAMES)
+        for rec in records:
+            c, m, s = rec['objectives']
+            writer.writerow([rec['algorithm'], rec['run'], rec['solution_idx'], c, m, s] + list(rec['decoded']))
+
+
+def summarize_case(case_dir, algo_names, job_results):
+    """
+    单工况汇总: 各算法前沿 -> 全局前沿 -> 全局基准下的 phi。
+    返回跨工况汇总表的行列表。
+    """
+    os.makedirs(case_dir, exist_ok=True)
+    # 作业按完成顺序到达 (进程池 / 工作进程), 先按 (算法, 运行) 排序, 使输出与完成顺序无关
+    job_results = sorted(job_results, key=lambda r: (algo_names.index(r['algorithm']), r['run']))
+
+    algo_fronts = {}
+    for name in algo_names:
+        recs = [r for res in job_results if res['algorithm'] == name for r in res['feasible']]
+        algo_fronts[name] = [recs[i] for i in _pareto_indices([r['objectives'] for r in recs])]
+        _write_front(os.path.join(case_dir, f"pareto_front_{_safe_name(name)}.csv"), algo_fronts[name])
+
+    with open(os.path.join(case_dir, "run_summary.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Algorithm', 'Run', 'Time(s)', 'PopulationSize', 'FeasibleCount'])
+        for res in job_results:
+            writer.writerow([res['algorithm'], res['run'], res['time'], res['pop_size'], len(res['feasible'])])
+
+    pool = [r for name in algo_names for r in algo_fronts[name]]
+    global_front = [pool[i] for i in _pareto_indices([r['objectives'] for r in pool])]
+    _write_front(os.path.join(case_dir, "pareto_front_global.csv"), global_front)
+
+    rows = []
+    if not global_front:
+        return rows
+
+    arr = np.array([r['objectives'] for r in global_front])
+    bounds = {
+        'C_star': np.min(arr[:, 0]), 'C_nadir': np.max(arr[:, 0]),
+        'M_star': np.min(arr[:, 1]), 'M_nadir': np.max(arr[:, 1]),
+        'S_star': np.max(arr[:, 2]), 'S_nadir': np.min(arr[:, 2])
+    }
+    for name in algo_names:
+        front = algo_fronts[name]
+        row = {
+            'algorithm': name,
+            'feasible_total': sum(len(res['feasible']) for res in job_results if res['algorithm'] == name),
+            'front_size': len(front),
+            'global_front_size': len(global_front),
+            'global_front_count': sum(1 for r in global_front if r['algorithm'] == name),
+            'time': sum(res['time'] for res in job_results if res['algorithm'] == name),
+            'best_phi': None,
+            'best': None,
+        }
+        if front:
+            phis = [_phi_value(r['objectives'], bounds) for r in front]
+            best_idx = int(np.argmin(phis))
+            row['best_phi'] = phis[best_idx]
+            row['best'] = front[best_idx]
+        rows.append(row)
+
+    ranked = sorted([r for r in rows if r['best'] is not None], key=lambda r: r['best_phi'])
+    with open(os.path.join(case_dir, "phi_leaderboard.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Rank', 'Algorithm', 'BestPhi', 'BestCost', 'BestMoment', 'BestStiffness',
+                         'FeasibleTotal', 'AlgoFrontSize', 'SourceRun', 'SourceSolutionIdx'])
+        for rank, row in enumerate(ranked, start=1):
+            c, m, s = row['best']['objectives']
+            writer.writerow([rank, row['algorithm'], row['best_phi'], c, m, s,
+                             row['feasible_total'], row['front_size'],
+                             row['best']['run'], row['best']['solution_idx']])
+    return rows
+
+
+def run_sweep(cases=None, algo_names=None, n_runs=SWEEP_RUNS, workers=SWEEP_WORKERS, output_root=None,
+              cluster=None):
+    """
+    执行参数扫描。cases 为 CaseConfig 列表 (默认由 SWEEP_GRID 展开),
+    所有作业共用一个进程池, 工作进程在作业之间常驻复用。
+    cluster 为 cluster.Coordinator 时作业改由已连接的 (多节点) 工作进程执行, workers 不起作用。
+    """
+    cases = cases if cases is not None else case_grid()
+    algo_names = list(algo_names or SWEEP_ALGOS)
+    for name in algo_names:
+        if name not in ALGORITHMS:
+            raise ValueError(f"未知算法: {name}")
+
+    output_root = output_root or _create_unique_output_dir(os.path.join(os.getcwd(), "outputs"), "sweep_results")
+    jobs = [
+        (case_idx, case, name, run, SEED + run)
+        for case_idx, case in enumerate(cases)
+        for name in algo_names
+        for run in range(n_runs)
+    ]
+    print(f"工况数: {len(cases)}, 算法: {algo_names}, 每算法运行 {n_runs} 次, 作业总数: {len(jobs)}")
+
+    results = {i: [] for i in range(len(cases))}
+    start_t = time.time()
+    with contextlib.ExitStack() as stack:
+        if cluster is None:
+            completed = stack.enter_context(mp.Pool(processes=workers)).imap_unordered(_run_job, jobs)
+        else:
+            from cluster import remote_jobs
+            completed = remote_jobs(cluster, jobs)
+        for done, res in enumerate(completed, start=1):
+            results[res['case_idx']].append(res)
+            print(f"  [{done}/{len(jobs)}] {case_label(res['case_idx'], cases[res['case_idx']])} "
+                  f"{res['algorithm']} run {res['run']}: {res['time']:.1f}s, 可行 {len(res['feasible'])}/{res['pop_size']}")
+    print(f"全部作业完成, 用时 {time.time() - start_t:.1f}s")
+
+    keys = sorted({k for case in cases for k in case_overrides(case)})
+    summary_path = os.path.join(output_root, "sweep_summary.csv")
+    with open(summary_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Case'] + keys + [
+            'Algorithm', 'FeasibleTotal', 'AlgoFrontSize', 'GlobalFrontSize', 'GlobalFrontCount',
+            'BestPhi', 'BestCost', 'BestMoment', 'BestStiffness', 'TotalTime(s)'
+        ])
+        for case_idx, case in enumerate(cases):
+            label = case_label(case_idx, case)
+            rows = summarize_case(os.path.join(output_root, label), algo_names, results[case_idx])
+            if not rows:
+                print(f"  {label}: 未找到可行前沿解")
+            for row in rows:
+                best = row['best']['objectives'] if row['best'] is not None else ('', '', '')
+                writer.writerow([label] + [getattr(case, k) for k in keys] + [
+                    row['algorithm'], row['feasible_total'], row['front_size'],
+                    row['global_front_size'], row['global_front_count'],
+                    row['best_phi'] if row['best_phi'] is not None else '',
+                    best[0], best[1], best[2], row['time']
+                ])
+    print(f"跨工况汇总: {summary_path}")
+    return results
+
+
+def main():
+    print("=== 多工况参数扫描 ===")
+    run_sweep()
+
+
+if __name__ == "__main__":
+    main()
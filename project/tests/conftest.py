@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 各模块以 project 目录为工作目录运行 (from case_config import *), 测试同样从该目录导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,125 @@
+"""
+cluster.py 协议测试: 在 127.0.0.1 上启动协调进程与若干 run_worker 进程,
+检查远程结果与单机执行逐位一致, 以及失联工作进程的任务被重新提交。
+"""
+import os
+import signal
+import threading
+import time
+import multiprocessing as mp
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from case_config import *
+from algorithms import ask_tell
+from algorithms.budget import EvaluationBudget
+from cluster import Coordinator, run_worker, remote_jobs
+import sweep
+
+CASE = replace(DEFAULT_CASE, l_span=75.0, deflection_ratio=800.0)
+
+
+def _candidates(n, seed=0):
+    rng = np.random.default_rng(seed)
+    low, up = np.asarray(CASE.low, dtype=float), np.asarray(CASE.up, dtype=float)
+    X = low + rng.random((n, NDIM)) * (up - low)
+    X[:, list(INT_GENES)] = np.floor(X[:, list(INT_GENES)])
+    return X
+
+
+def _start_workers(coordinator, n):
+    host, port = coordinator.address
+    procs = [mp.Process(target=run_worker, args=(f"{host}:{port}",), daemon=True) for _ in range(n)]
+    for p in procs:
+        p.start()
+    assert coordinator.wait_for_workers(n, timeout=30)
+    return procs
+
+
+def _stop(coordinator, procs):
+    coordinator.close()
+    for p in procs:
+        p.join(5)
+        if p.is_alive():
+            p.kill()
+            p.join()
+
+
+def _wait_until(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cluster():
+    coordinator = Coordinator('127.0.0.1:0', timeout=10)
+    procs = []
+    yield coordinator, procs
+    _stop(coordinator, procs)
+
+
+def test_eval_batches_match_local(cluster):
+    coordinator, procs = cluster
+    procs += _start_workers(coordinator, 3)
+    X = _candidates(500)
+
+    objectives, penalties = coordinator.evaluate_candidates(X, CASE)
+    expected_obj, expected_pen = ask_tell.evaluate_candidates(X, CASE)
+    assert np.array_equal(objectives, expected_obj)
+    assert np.array_equal(penalties, expected_pen)
+
+    # 预算只覆盖部分候选时, 只评估并计入前缀
+    budget = EvaluationBudget(max_evals=123, case=CASE)
+    objectives, penalties = coordinator.evaluate_candidates(X, CASE, budget)
+    assert budget.evals == 123
+    assert np.array_equal(objectives, expected_obj[:123])
+    assert np.array_equal(penalties, expected_pen[:123])
+
+
+def _normalise(res):
+    return {
+        'case_idx': res['case_idx'], 'algorithm': res['algorithm'], 'run': res['run'],
+        'pop_size': res['pop_size'],
+        'feasible': [(r['algorithm'], r['run'], r['solution_idx'], tuple(r['objectives']), list(r['decoded']))
+                     for r in res['feasible']],
+    }
+
+
+def test_remote_jobs_match_run_job(cluster):
+    coordinator, procs = cluster
+    procs += _start_workers(coordinator, 2)
+    jobs = [(0, CASE, 'MOEA/D', 0, SEED), (1, DEFAULT_CASE, 'MOEA/D', 1, SEED + 1)]
+
+    remote = sorted((_normalise(r) for r in remote_jobs(coordinator, jobs)), key=lambda r: r['case_idx'])
+    local = [_normalise(sweep._run_job(job)) for job in jobs]
+    assert remote == local
+    assert any(r['feasible'] for r in local)
+
+
+def test_killed_worker_task_is_resubmitted(cluster):
+    coordinator, procs = cluster
+    X = _candidates(60000, seed=1)
+
+    # 尚无工作进程时提交: 任务留在队列中, 工作进程连接后领走, 在执行中将其杀掉
+    out = {}
+    thread = threading.Thread(target=lambda: out.update(result=coordinator.evaluate_candidates(X, CASE)))
+    thread.start()
+    _wait_until(lambda: coordinator._queue)
+    procs += _start_workers(coordinator, 1)
+    _wait_until(lambda: not coordinator._queue)
+    time.sleep(0.2)
+    os.kill(procs[0].pid, signal.SIGKILL)
+    procs[0].join()
+
+    procs += _start_workers(coordinator, 1)
+    thread.join(60)
+    assert not thread.is_alive()
+    assert coordinator.resubmitted == 1
+
+    expected_obj, expected_pen = ask_tell.evaluate_candidates(X, CASE)
+    assert np.array_equal(out['result'][0], expected_obj)
+    assert np.array_equal(out['result'][1], expected_pen)
@@ -1,20 +1,105 @@
+import matplotlib
+matplotlib.use('Agg')  # 批处理节点无显示环境, 强制使用非交互后端
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import os
+import multiprocessing as mp
+
+from case_config import PLOT_MAX_POINTS, PLOT_DECIMATE, PLOT_DPI, PLOT_FORMAT, PLOT_WORKERS
+from results_store import crowding_distance
 
 # 设置中文字体 (尝试通用字体，若乱码请自行调整)
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans'] 
 plt.rcParams['axes.unicode_minus'] = False
 
-def plot_best_run_3d(alg_name, front):
-    """绘制单个算法最佳运行的 3D 散点图"""
+def _grid_representatives(norm, budget):
+    """
+    在目标空间划分 k^3 网格, 每个非空网格保留一个点。
+    二分搜索最大的 k, 使非空网格数不超过 budget。
+    """
+    def cells(k):
+        idx = np.minimum((norm * k).astype(np.int64), k - 1)
+        # 网格坐标编码为单个整数键, 一维 unique 比按行 unique 快得多
+        key = (idx[:, 0] * k + idx[:, 1]) * k + idx[:, 2]
+        _, first = np.unique(key, return_index=True)
+        return first
+
+    lo, hi = 1, max(1, budget)
+    best = cells(1)
+    while lo <= hi:
+        k = (lo + hi) // 2
+        keep = cells(k)
+        if len(keep) <= budget:
+            best, lo = keep, k + 1
+        else:
+            hi = k - 1
+    return best
+
+
+def decimate_front(front, max_points=PLOT_MAX_POINTS, method=PLOT_DECIMATE):
+    """
+    将前沿抽稀到不超过 max_points 个点, 始终保留每个目标的最小/最大值点。
+    method: 'grid' 目标空间网格每格取一点; 'crowding' 保留拥挤度距离最大的点。
+    max_points 为 None 或点数未超限时原样返回。
+    """
+    data = np.asarray(front, dtype=float)
+    n = len(data)
+    if max_points is None or n <= max_points:
+        return data
+
+    extremes = np.unique(np.concatenate([np.argmin(data, axis=0), np.argmax(data, axis=0)]))
+    lo, hi = data.min(axis=0), data.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    norm = (data - lo) / span
+
+    budget = max(0, max_points - len(extremes))
+    if method == 'grid':
+        chosen = _grid_representatives(norm, budget) if budget > 0 else np.array([], dtype=int)
+    elif method == 'crowding':
+        chosen = np.argsort(-crowding_distance(norm), kind='stable')[:budget]
+    else:
+        raise ValueError(f"未知抽稀方式: {method} (可选 grid / crowding)")
+
+    return data[np.union1d(extremes, chosen)]
+
+
+def render_figures(tasks, workers=PLOT_WORKERS):
+    """
+    并行生成图表。tasks 为 [(绘图函数, args, kwargs), ...], 绘图函数须为本模块顶层函数。
+    workers=1 或只有一项任务时在当前进程中串行执行。返回各任务的输出文件名。
+    """
+    tasks = list(tasks)
+    if workers == 1 or len(tasks) <= 1:
+        return [func(*args, **kwargs) for func, args, kwargs in tasks]
+    n_proc = min(len(tasks), workers or mp.cpu_count())
+    with mp.Pool(processes=n_proc) as pool:
+        return pool.starmap(_render_task, tasks)
+
+
+def _render_task(func, args, kwargs):
+    return func(*args, **kwargs)
+
+
+def _save(fig, filename, output_dir, dpi, fmt):
+    # 算法名可能含 "/" (MOEA/D), 不能直接作为文件名
+    filename = f"{filename.replace('/', '_')}.{fmt}"
+    # 矢量格式 (svg/pdf) 不受 dpi 影响
+    fig.savefig(os.path.join(output_dir, filename), dpi=dpi, format=fmt)
+    plt.close(fig)
+    print(f"图表已保存: {filename}")
+    return filename
+
+
+def plot_best_run_3d(alg_name, front, output_dir='.', max_points=PLOT_MAX_POINTS,
+                     dpi=PLOT_DPI, fmt=PLOT_FORMAT, method=PLOT_DECIMATE):
+    """绘制单个算法最佳运行的 3D 散点图 (点数超过 max_points 时先抽稀)"""
     if len(front) == 0: return
 
     fig = plt.figure(figsize=(10, 8))
     ax = fig.add_subplot(111, projection='3d')
     
-    data = np.array(front)
+    data = decimate_front(front, max_points, method)
     # Cost, Safety, Structural
     ax.scatter(data[:,0], data[:,1], data[:,2], c='b', marker='o', s=30, alpha=0.7)
     
@@ -23,22 +108,20 @@ def plot_best_run_3d(alg_name, front):
     ax.set_zlabel('Structural (Maximize)')
     plt.title(f'{alg_name} - Best Run Pareto Front (3D)')
     
-    filename = f'best_3d_{alg_name}.png'
-    plt.savefig(filename, dpi=300)
-    plt.close()
-    print(f"图表已保存: {filename}")
+    return _save(fig, f'best_3d_{alg_name}', output_dir, dpi, fmt)
 
-def plot_best_run_surface(alg_name, front):
+def plot_best_run_surface(alg_name, front, output_dir='.', max_points=PLOT_MAX_POINTS,
+                          dpi=PLOT_DPI, fmt=PLOT_FORMAT, method=PLOT_DECIMATE):
     """
     绘制单个算法最佳运行的 3D 插值曲面图 (Surface Plot)
-    使用三角剖分插值 (Trisurf) 拟合 Pareto 前沿曲面
+    使用三角剖分插值 (Trisurf) 拟合 Pareto 前沿曲面; 三角剖分前先抽稀到 max_points 个点
     """
     if len(front) < 3: return
 
     fig = plt.figure(figsize=(12, 10))
     ax = fig.add_subplot(111, projection='3d')
     
-    data = np.array(front)
+    data = decimate_front(front, max_points, method)
     x = data[:, 0]  # Cost
     y = data[:, 1]  # Safety
     z = data[:, 2]  # Structural
@@ -57,28 +140,23 @@ def plot_best_run_surface(alg_name, front):
     # 调整视角以获得更好的观察效果
     ax.view_init(elev=30, azim=45)
     
-    filename = f'best_surface_{alg_name}.png'
-    plt.savefig(filename, dpi=300)
-    plt.close()
-    print(f"图表已保存: {filename}")
+    return _save(fig, f'best_surface_{alg_name}', output_dir, dpi, fmt)
 
-def plot_box_phi(phi_results):
+def plot_box_phi(phi_results, output_dir='.', dpi=PLOT_DPI, fmt=PLOT_FORMAT):
     """绘制 Phi 值箱线图"""
     data = []
     labels = []
     # 确保顺序一致
-    for alg in ['NSGA-II', 'NSGA-III', 'GDE3', 'MOPSO']:
+    for alg in ['NSGA-II', 'NSGA-III', 'GDE3', 'MOPSO', 'MOEA/D']:
         if alg in phi_results:
             data.append(phi_results[alg])
             labels.append(alg)
         
-    plt.figure(figsize=(10, 6))
-    plt.boxplot(data, labels=labels, patch_artist=True)
+    fig = plt.figure(figsize=(10, 6))
+    plt.boxplot(data, patch_artist=True)
+    plt.xticks(range(1, len(labels) + 1), labels)
     plt.ylabel('Phi Value (Lower is Better)')
     plt.title('Algorithm Performance Comparison (10 Runs)')
     plt.grid(True, linestyle='--', alpha=0.6)
     
-    filename = 'boxplot_phi.png'
-    plt.savefig(filename, dpi=300)
-    plt.close()
-    print(f"图表已保存: {filename}")
\ No newline at end of file
+    return _save(fig, 'boxplot_phi', output_dir, dpi, fmt)
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+假设分析: 在修改后的单价 / 规范限值下重新评估已有工作流中的设计。
+
+单价 (cc_price / cr_price / cp_price)、挠度系数 k_def 与挠度限值 L / deflection_ratio 均为 CaseConfig 字段。
+客户调整价格或规范限值时无需重跑优化: 读取输出目录中全部种群的解码设计 (逐解核查文件;
+没有时取各算法前沿), 按离散档位组合分组做向量化的目标与约束计算, 重新筛选可行解,
+写出与阶段一格式相同的各算法前沿与可行性汇总, 再由 main.stage_aggregate 重算全局前沿与 phi 排行榜。
+
+输出写入原目录下的 whatif_N 子目录, 另含:
+- whatif_designs.csv:    每个设计在原参数与新参数下的目标、可行性、是否位于全局前沿及各约束组标志
+- whatif_parameters.csv: 修改的工况字段
+
+用法:
+    python whatif.py outputs/run_results_3 --set cc_price=[3.5,300] --set deflection_ratio=1000
+    python whatif.py outputs/run_results_3 --set k_def=1.2e-4 -o outputs/whatif_kdef
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from dataclasses import fields
+
+import numpy as np
+
+from case_config import *
+from constraints import constraint_terms, constraint_flags, FLAG_NAMES
+from objectives import calculate_objectives, encode_matrix, DECODED_VAR_NAMES
+from results_store import ResultStore, OBJECTIVE_NAMES, pareto_mask
+from main import (CSV_DETAIL, CSV_SUMMARY, SUMMARY_HEADER, _algorithms_in_output, _create_unique_output_dir,
+                  _safe_name, stage_aggregate)
+
+CSV_DESIGNS = "whatif_designs.csv"
+CSV_PARAMETERS = "whatif_parameters.csv"
+# 可行性汇总中各约束组失败计数的列名, 与 FLAG_NAMES 顺序一致
+FAIL_COLUMNS = ['Fail_Eq24', 'Fail_Eq25', 'Fail_Eq26', 'Fail_Eq29', 'Fail_Eq28', 'Fail_fc', 'Fail_fy']
+
+
+def load_designs(output_dir):
+    """
+    输出目录中的设计: 有逐解核查文件时为全部最终种群 (含不可行解), 否则为各算法前沿。
+    返回 (ResultStore, 是否为完整种群)。
+    """
+    audit = os.path.join(output_dir, CSV_DETAIL)
+    if os.path.exists(audit):
+        store = ResultStore.from_csv(audit, objective_columns=['ObjCost', 'ObjMoment', 'ObjStiffness'],
+                                     decoded_columns=[f'decoded_{v}' for v in DECODED_VAR_NAMES])
+        return store, True
+    fronts = sorted(p for p in glob.glob(os.path.join(output_dir, "pareto_front_*.csv"))
+                    if os.path.basename(p) != "pareto_front_global.csv")
+    return ResultStore.from_csv(fronts), False
+
+
+def evaluate_designs(decoded, case=DEFAULT_CASE):
+    """
+    解码设计矩阵 (N, 20) 在工况 case 下的目标 (N, 3) [Cost, Moment, Stiffness] 与约束组标志 (K, N),
+    标志行顺序同 constraints.FLAG_NAMES。按离散档位组合分组, 每组一次向量化计算。
+    """
+    X = encode_matrix(decoded, case)
+    n = len(X)
+    F = np.empty((n, 3))
+    ok = np.empty((len(FLAG_NAMES), n), dtype=bool)
+    if n == 0:
+        return F, ok
+    keys = X[:, list(INT_GENES)].astype(int)
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    for g in range(inverse.max() + 1):
+        rows = np.flatnonzero(inverse == g)
+        cols = [X[rows, j] for j in range(NDIM)]
+        for j in INT_GENES:
+            cols[j] = int(X[rows[0], j])
+        c, m, s = calculate_objectives(cols, case)
+        F[rows, 0], F[rows, 1], F[rows, 2] = c, m, s
+        flags = constraint_flags(constraint_terms(cols, case))
+        for k, name in enumerate(FLAG_NAMES):
+            ok[k, rows] = flags[name]
+    return F, ok
+
+
+def case_changes(case, base=DEFAULT_CASE):
+    """[(字段名, 原取值, 新取值), ...]。"""
+    return [(f.name, getattr(base, f.name), getattr(case, f.name)) for f in fields(case)
+            if getattr(case, f.name) != getattr(base, f.name)]
+
+
+def _summary_rows(output_dir, store, ok, algorithms):
+    """按 (算法, 运行) 重算可行性汇总; 时间与预算列沿用原汇总 (没有时留空)。"""
+    source = os.path.join(output_dir, CSV_SUMMARY)
+    if os.path.exists(source):
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            original = list(csv.DictReader(f))
+    else:
+        original = [{'Algorithm': name, 'Run': str(r)} for name in algorithms
+                    for r in sorted(set(store.by_algorithm(name).run.tolist()))]
+
+    rows = []
+    for rec in original:
+        mask = store.mask(rec['Algorithm']) & (store.run == int(rec['Run']))
+        n = int(mask.sum())
+        feasible = int(ok[:, mask].all(axis=0).sum())
+        counts = dict(zip(FAIL_COLUMNS, (~ok[:, mask]).sum(axis=1).tolist()))
+        rec = dict(rec, PopulationSize=n, FeasibleCount=feasible, InfeasibleCount=n - feasible,
+                   FeasibleRatio=feasible / n if n else 0.0, **counts)
+        rows.append([rec.get(col, '') for col in SUMMARY_HEADER])
+    return rows
+
+
+def what_if(output_dir, case, base_case=DEFAULT_CASE, result_dir=None):
+    """
+    在工况 case 下重新评估 output_dir 中的设计 (原工作流的工况为 base_case), 返回结果目录。
+    """
+    start_t = time.time()
+    store, full = load_designs(output_dir)
+    if not len(store):
+        raise ValueError(f"输出目录中没有设计: {output_dir}")
+    source = os.path.join(output_dir, CSV_SUMMARY)
+    algorithms = _algorithms_in_output(output_dir) if os.path.exists(source) else store.algorithm_names
+
+    F0, ok0 = evaluate_designs(store.decoded, base_case)
+    F1, ok1 = evaluate_designs(store.decoded, case)
+    feas0, feas1 = ok0.all(axis=0), ok1.all(axis=0)
+    front0 = np.zeros(len(store), dtype=bool)
+    front1 = np.zeros(len(store), dtype=bool)
+    front0[np.flatnonzero(feas0)[pareto_mask(F0[feas0])]] = True
+    front1[np.flatnonzero(feas1)[pareto_mask(F1[feas1])]] = True
+    eval_t = time.time() - start_t
+
+    result_dir = result_dir or _create_unique_output_dir(output_dir, "whatif")
+    os.makedirs(result_dir, exist_ok=True)
+
+    with open(os.path.join(result_dir, CSV_PARAMETERS), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Field', 'Base', 'WhatIf'])
+        writer.writerows(case_changes(case, base_case))
+
+    # 阶段一格式的可行性汇总与各算法前沿 (新参数下的可行解)
+    with open(os.path.join(result_dir, CSV_SUMMARY), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        writer.writerows(_summary_rows(output_dir, store, ok1, algorithms))
+    feasible = store.take(feas1)
+    feasible.objectives[:] = F1[feas1]
+    for name in algorithms:
+        feasible.by_algorithm(name).pareto_front().write_front(
+            os.path.join(result_dir, f"pareto_front_{_safe_name(name)}.csv"))
+
+    names = store.algorithm_names
+    with open(os.path.join(result_dir, CSV_DESIGNS), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Algorithm', 'Run', 'SolutionIdx', 'BaseFeasible', 'IsFeasible']
+                        + [f'Base{n}' for n in OBJECTIVE_NAMES] + OBJECTIVE_NAMES
+                        + ['BaseGlobalFront', 'GlobalFront'] + FLAG_NAMES + DECODED_VAR_NAMES)
+        writer.writerows(
+            [names[a], r, s] + feas + obj0 + obj1 + on_front + flags + dec
+            for a, r, s, feas, obj0, obj1, on_front, flags, dec in zip(
+                store.algorithm_codes.tolist(), store.run.tolist(), store.solution_idx.tolist(),
+                np.column_stack([feas0, feas1]).astype(int).tolist(), F0.tolist(), F1.tolist(),
+                np.column_stack([front0, front1]).astype(int).tolist(), ok1.T.astype(int).tolist(),
+                store.decoded_rows()))
+
+    print(f"=== 假设分析: {output_dir} ===")
+    for name, old, new in case_changes(case, base_case):
+        print(f"  {name}: {old} -> {new}")
+    print(f"设计数: {len(store)} ({'全部种群' if full else '各算法前沿'}), 重新评估用时 {eval_t:.2f}s")
+    print(f"  可行解: {int(feas0.sum())} -> {int(feas1.sum())} "
+          f"(新增可行 {int((feas1 & ~feas0).sum())}, 变为不可行 {int((feas0 & ~feas1).sum())})")
+    print(f"  全局前沿: {int(front0.sum())} -> {int(front1.sum())} (保留 {int((front0 & front1).sum())})")
+    for k, name in enumerate(FLAG_NAMES):
+        n0, n1 = int((~ok0[k]).sum()), int((~ok1[k]).sum())
+        if n0 != n1:
+            print(f"  {name} 不满足: {n0} -> {n1}")
+
+    if not stage_aggregate(result_dir):
+        print("新参数下没有可行前沿解")
+    print(f"假设分析总用时 {time.time() - start_t:.2f}s, 结果目录: {result_dir}")
+    return result_dir
+
+
+def _assignments(items):
+    """['name=value', ...] -> {name: value}; value 按 JSON 解析 (列表转为元组), 否则为字符串。"""
+    overrides = {}
+    for item in items or ():
+        name, sep, text = item.partition('=')
+        if not sep:
+            raise SystemExit(f"参数格式应为 字段=取值: {item}")
+        try:
+            overrides[name.strip()] = json.loads(text)
+        except json.JSONDecodeError:
+            overrides[name.strip()] = text
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="修改单价 / 规范限值后重新评估已有设计")
+    parser.add_argument('output_dir', help="已有工作流的输出目录")
+    parser.add_argument('--set', dest='changes', action='append', metavar='FIELD=VALUE',
+                        help="修改的 CaseConfig 字段, 如 cc_price=[3.5,300] / k_def=1.2e-4 / deflection_ratio=1000")
+    parser.add_argument('--base-set', dest='base', action='append', metavar='FIELD=VALUE',
+                        help="原工作流与 DEFAULT_CASE 不同的工况字段 (如 l_span=60)")
+    parser.add_argument('-o', '--result-dir', default=None, help="结果目录 (默认 <output_dir>/whatif_N)")
+    args = parser.parse_args(argv)
+
+    try:
+        base_case = make_case(_assignments(args.base))
+        case = make_case(_assignments(args.changes), base=base_case)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    what_if(args.output_dir, case, base_case, args.result_dir)
+
+
+if __name__ == "__main__":
+    main()